@@ -12,6 +12,9 @@ from utils.datetime_local import localize_datetime
 from utils.debug import *
 from utils.asc_mc_houses import calculate_asc_mc_and_houses
 from utils.planet_positions import calculate_planets
+from utils import approx_calendar
+from utils import ephemeris
+from utils.ephemeris import ephe_flag
 from utils.lunar_calc import (
     jd_utc, sun_moon_state, scan_phase_events, scan_perigee_apogee,
     lunar_sign_from_longitude, lunar_sign_mix, refine_sign_cusp,
@@ -26,6 +29,11 @@ except Exception:
 import traceback
 
 from ai_summary import register_ai_summary_route
+from metrics import register_metrics
+from http_cache import register_http_cache
+from jobs import register_jobs
+from profiling import register_profiling
+from slow_capture import register_slow_capture
 
 app = Flask(__name__)
 
@@ -56,34 +64,16 @@ else:
 
 # Broaden CORS to all routes so even error responses carry CORS headers for these origins
 CORS(app, resources={r"/*": {"origins": allowed_origins}}, supports_credentials=False)
+# Registered before the other hooks so it runs after them and compresses their final body
+register_http_cache(app)
 register_ai_summary_route(app)
+register_metrics(app)
+register_profiling(app)
+register_slow_capture(app)
+register_jobs(app)
 
 # --- Helpers to support extended ISO (including BCE) directly to JD ---
-import re
-def _parse_iso_to_jd(date_str: str) -> float:
-    """
-    Parse extended ISO8601 like -002971-03-25T21:24:00Z or with offset and return UT JD.
-    If timezone offset is present, convert to UTC by subtracting the offset in days.
-    """
-    # Support: YYYY-MM-DDTHH:MM[:SS[.us]](Z|±HH:MM)
-    iso_re = re.compile(r"^([+-]?\d{1,6})-(\d{2})-(\d{2})T(\d{2}):(\d{2})(?::(\d{2})(?:\.(\d{1,6}))?)?(Z|[+-]\d{2}:\d{2})?$")
-    m = iso_re.match(date_str)
-    if not m:
-        raise ValueError("unsupported ISO format")
-    y = int(m.group(1)); mo = int(m.group(2)); d = int(m.group(3))
-    hh = int(m.group(4)); mi = int(m.group(5)); ss = int(m.group(6) or 0)
-    micros = int((m.group(7) or '0').ljust(6,'0'))
-    tzpart = m.group(8) or 'Z'
-    frac = hh + mi/60.0 + ss/3600.0 + micros/3600000000.0
-    jd_local = swe.julday(y, mo, d, frac)
-    if tzpart == 'Z':
-        return jd_local
-    # tzpart like +HH:MM or -HH:MM
-    sign = 1 if tzpart[0] == '+' else -1
-    th = int(tzpart[1:3]); tm = int(tzpart[4:6])
-    offset_days = sign * (th*3600 + tm*60) / 86400.0
-    # Local time = UTC + offset ⇒ UTC = local - offset
-    return jd_local - offset_days
+from utils.jd_time_utils import parse_iso_to_jd
 
 def _jd_to_iso_utc(jd: float) -> str:
     """Format a JD as an ISO-like UTC string supporting extended years (BCE)."""
@@ -188,57 +178,10 @@ def _approx_enoch_from_jd(jd: float, latitude: float, longitude: float):
     }
 
 def _approx_start_jd_for_enoch_year(jd: float, latitude: float, longitude: float) -> float:
-    """Return the approximate START-BOUNDARY JD (UT) of the Enoch year containing the given JD.
-    Semantics:
-    - Enoch Day 1 runs from TUESDAY sunset to WEDNESDAY sunset.
-    - Here we return the TUESDAY SUNSET (start boundary) that begins Day 1,
-      chosen nearest to the March equinox anchor at the provided lat/lon.
-    If the given jd is before that start, compute from the previous year's anchor.
+    """Approximate start boundary (Tuesday sunset, UT JD) of the Enoch year containing jd.
+    Same equinox/Wednesday rule as /calcYear's approximate provider (utils.approx_calendar).
     """
-    def _dow_index_0h(jd_val: float) -> int:
-        yy, mo, dd, _h = swe.revjul(jd_val)
-        return swe.day_of_week(swe.julday(int(yy), int(mo), int(dd), 0.0))
-    WED_IDX = swe.day_of_week(swe.julday(2025, 3, 19, 0.0))
-
-    def _wed_sunset_near(anchor_jd_val: float) -> float:
-        jd_before = anchor_jd_val
-        while _dow_index_0h(jd_before) != WED_IDX:
-            jd_before -= 1.0
-        yb, mb, db, _ = swe.revjul(jd_before)
-
-        jd_after = anchor_jd_val
-        while _dow_index_0h(jd_after) != WED_IDX:
-            jd_after += 1.0
-        ya, ma, da, _ = swe.revjul(jd_after)
-
-        bh, bm, bs = _approx_sunset_ut_hms(int(yb), int(mb), int(db), latitude, longitude)
-        ah, am, a_s = _approx_sunset_ut_hms(int(ya), int(ma), int(da), latitude, longitude)
-        s_before = swe.julday(int(yb), int(mb), int(db), bh + bm/60 + bs/3600)
-        s_after  = swe.julday(int(ya), int(ma), int(da), ah + am/60 + a_s/3600)
-        return s_before if abs(s_before - anchor_jd_val) <= abs(s_after - anchor_jd_val) else s_after
-
-    def _tue_sunset_before(wed_sunset_jd: float) -> float:
-        """Given a WEDNESDAY sunset JD, return the previous civil day's (Tuesday) sunset JD
-        at the same latitude/longitude using the same NOAA-like approximation.
-        """
-        y, mo, d, _ = swe.revjul(wed_sunset_jd)
-        # Previous civil day relative to Wednesday
-        jd_prev0 = swe.julday(int(y), int(mo), int(d), 0.0) - 1.0
-        yb, mb, db, _ = swe.revjul(jd_prev0)
-        hh, mm, ss = _approx_sunset_ut_hms(int(yb), int(mb), int(db), latitude, longitude)
-        return swe.julday(int(yb), int(mb), int(db), hh + mm/60 + ss/3600)
-
-    y, _m, _d, _ = swe.revjul(jd)
-    anchor = swe.julday(int(y), 3, 20, 21 + 24/60)
-    # Find the Wednesday sunset closest to equinox, then take the Tuesday sunset before it
-    wed_end = _wed_sunset_near(anchor)
-    start = _tue_sunset_before(wed_end)
-    if jd < start:
-        py = int(y) - 1
-        anchor_prev = swe.julday(py, 3, 20, 21 + 24/60)
-        wed_end_prev = _wed_sunset_near(anchor_prev)
-        start = _tue_sunset_before(wed_end_prev)
-    return start
+    return float(approx_calendar.enoch_year_start_for_jd([jd], latitude, longitude)[0])
 
 # Approx lunar phase (no Swiss files)
 SYNODIC_DAYS = 29.530588853
@@ -271,36 +214,44 @@ def calculate():
         except Exception:
             # Try extended ISO → JD path (supports negative years if ISO has Z/offset)
             if isinstance(date_str, str):
-                jd = _parse_iso_to_jd(date_str)
+                jd = parse_iso_to_jd(date_str)
             else:
                 raise
-        # Planets (may fail if ephemeris files missing)
-        approx_flags = {'enoch': False, 'planets': False}
-        try:
-            results = calculate_planets(jd, latitude, longitude)
-        except Exception as _e:
-            traceback.print_exc()
-            results = { 'error': 'ephemeris-missing' }
-            approx_flags['planets'] = True
-        # Enoch mapping (fallback to approximate if precise fails)
-        try:
-            enoch_data = calculate_enoch_date(jd, latitude, longitude, tz_str)
-        except Exception as _e:
-            traceback.print_exc()
-            enoch_data = _approx_enoch_from_jd(jd, latitude, longitude)
-            approx_flags['enoch'] = True
-        # Houses (optional)
-        try:
-            houses_data = calculate_asc_mc_and_houses(jd, latitude, longitude)
-        except Exception:
-            houses_data = None
-        return jsonify({
-            "julian_day": jd,
-            "planets": results,
-            "enoch": enoch_data,
-            "houses_data": houses_data,
-            "quality": ("approx" if any(approx_flags.values()) else "full"),
-            "approx": approx_flags
+        # Ephemeris tier: swiss (.se1 files) or moshier (analytic, no file I/O)
+        tier = ephemeris.resolve_tier(data.get("ephemeris"), jd) or ephemeris.TIER_SWISS
+        with ephemeris.use_tier(tier):
+            # Planets (may fail if ephemeris files missing)
+            approx_flags = {'enoch': False, 'planets': False}
+            try:
+                results = calculate_planets(jd, latitude, longitude)
+            except Exception as _e:
+                traceback.print_exc()
+                results = { 'error': 'ephemeris-missing' }
+                approx_flags['planets'] = True
+            # Enoch mapping (fallback to approximate if precise fails)
+            try:
+                enoch_data = calculate_enoch_date(jd, latitude, longitude, tz_str)
+            except Exception as _e:
+                traceback.print_exc()
+                enoch_data = _approx_enoch_from_jd(jd, latitude, longitude)
+                approx_flags['enoch'] = True
+            # Houses (optional)
+            try:
+                houses_data = calculate_asc_mc_and_houses(jd, latitude, longitude)
+            except Exception:
+                houses_data = None
+        if any(approx_flags.values()):
+            quality = "approx"
+        else:
+            quality = "moshier" if tier == ephemeris.TIER_MOSHIER else "full"
+        return jsonify({
+            "julian_day": jd,
+            "planets": results,
+            "enoch": enoch_data,
+            "houses_data": houses_data,
+            "quality": quality,
+            "ephemeris": tier,
+            "approx": approx_flags
         })
     except Exception as e:
         traceback.print_exc()
@@ -326,14 +277,14 @@ def day_bounds_utc(greg_date: datetime, latitude: float, longitude: float, tz_st
             geopos = (longitude, latitude, 0)
             jd0 = swe.julday(greg_date.year, greg_date.month, greg_date.day, 0.0)
             try:
-                _, data_today = swe.rise_trans(jd0, swe.SUN, 2, geopos)  # 2 = sunset
+                _, data_today = swe.rise_trans(jd0, swe.SUN, 2, geopos, flags=ephe_flag())  # 2 = sunset
                 jd_s_today = data_today[0]
             except Exception:
                 jd_s_today = jd0 + 0.75
             jd_prev_day = jd0 - 1.0
             yb, mb, db, _ = swe.revjul(jd_prev_day)
             try:
-                _, data_prev = swe.rise_trans(swe.julday(int(yb), int(mb), int(db), 0.0), swe.SUN, 2, geopos)
+                _, data_prev = swe.rise_trans(swe.julday(int(yb), int(mb), int(db), 0.0), swe.SUN, 2, geopos, flags=ephe_flag())
                 jd_s_prev = data_prev[0]
             except Exception:
                 jd_s_prev = jd_prev_day + 0.75
@@ -356,7 +307,7 @@ def day_bounds_utc(greg_date: datetime, latitude: float, longitude: float, tz_st
             return prev_iso, today_iso
 
 
-app.add_url_rule('/calcYear', view_func=calc_year, methods=['POST'])
+app.add_url_rule('/calcYear', view_func=calc_year, methods=['GET', 'POST'])
 
 if __name__ == '__main__':
     app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 5000)), debug=True)
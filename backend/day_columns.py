@@ -0,0 +1,120 @@
+"""
+Columnar encoding of /calcYear days (`format=columns`).
+
+A year is 364-371 day objects that repeat 25-35 key names and many values
+(`moon_zodiac_mode`, `enoch_year`, sign names...). With `format=columns` the
+response carries one entry per field instead of `days`:
+
+    {"ok": true, "enoch_year": 5996, ..., "format": "columns", "n_days": 364,
+     "columns": {"enoch_month": {"t": "num", "v": [1, 1, ...]},
+                 "moon_sign":   {"t": "str", "dict": ["Aries", ...], "v": [0, 0, 1, ...]},
+                 "start_utc":   {"t": "time", "v": [1742422035, ...]},
+                 "equinox":     {"t": "str", "dict": ["march"], "i": [2], "v": [0]}, ...}}
+
+    t      num   numbers as they are          bool  0 / 1
+           str   indexes into "dict"          time  Unix seconds (ISO "...Z" strings)
+           date  days since 1970-01-01        const "v" is the value of every day
+           rows  per-day lists of objects (alignments): "v" holds the list lengths
+                 and "columns" the columns of all their items in order
+           raw   values as they are
+    v      one value per day, null where the day has null; with "i" only the
+           listed days have the field (sparse event columns)
+
+Times and dates are proleptic Gregorian with astronomical years, like the ISO
+strings they replace, so BCE years round-trip. enoch-calendar/main.js
+(decodeDayColumns) rebuilds the same day objects.
+
+year_pipeline.materialize_columns builds the core columns straight from the
+year's arrays (no day dicts); encode_days covers the sparse per-day fields.
+
+    columns = encode_days(days)                     # [{...}, ...] → {field: column}
+    column = encode_values('moon_sign', values)     # one value per day → column
+"""
+import re
+from functools import lru_cache
+
+FORMAT_ROWS = 'rows'
+FORMAT_COLUMNS = 'columns'
+FORMATS = (FORMAT_ROWS, FORMAT_COLUMNS)
+
+_TIME_RE = re.compile(r'^(-?\d{4,})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)Z$')
+_DATE_RE = re.compile(r'^(-?\d{4,})-(\d\d)-(\d\d)$')
+
+
+@lru_cache(maxsize=4096)
+def days_from_civil(y: int, m: int, d: int) -> int:
+    """Days since 1970-01-01 of a proleptic Gregorian date (any year, year 0 = 1 BCE)."""
+    y -= m <= 2
+    era = y // 400
+    yoe = y - era * 400
+    doy = (153 * (m + (-3 if m > 2 else 9)) + 2) // 5 + d - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def _epoch_seconds(value: str):
+    m = _TIME_RE.match(value)
+    if m is None:
+        return None
+    y, mo, d, hh, mi, ss = m.groups()
+    return days_from_civil(int(y), int(mo), int(d)) * 86400 + int(hh) * 3600 + int(mi) * 60 + int(ss)
+
+
+def _epoch_days(value: str):
+    m = _DATE_RE.match(value)
+    if m is None:
+        return None
+    y, mo, d = m.groups()
+    return days_from_civil(int(y), int(mo), int(d))
+
+
+def encode_values(name: str, values: list) -> dict:
+    """Column of one value per day; the type comes from the values (and *_utc / gregorian names)."""
+    present = [v for v in values if v is not None]
+    kinds = set(map(type, present))
+    if kinds <= {bool}:
+        return {'t': 'bool', 'v': [None if v is None else int(v) for v in values]}
+    if kinds <= {int, float}:
+        return {'t': 'num', 'v': values}
+    if kinds == {list}:
+        items = [e for v in present for e in v]
+        if set(map(type, items)) == {dict}:
+            # per-day lists of objects (alignments): their items flattened into nested columns
+            return {'t': 'rows', 'v': [None if v is None else len(v) for v in values], 'columns': encode_days(items)}
+    if kinds == {str}:
+        if name.endswith('_utc') or name == 'gregorian':
+            convert = _epoch_seconds if name.endswith('_utc') else _epoch_days
+            encoded = [None if v is None else convert(v) for v in values]
+            if None not in encoded or encoded.count(None) == len(values) - len(present):
+                return {'t': 'time' if name.endswith('_utc') else 'date', 'v': encoded}
+        index = {}
+        for v in present:
+            index.setdefault(v, len(index))
+        return {'t': 'str', 'dict': list(index), 'v': [None if v is None else index[v] for v in values]}
+    return {'t': 'raw', 'v': values}
+
+
+def encode_days(days: list) -> dict:
+    """Day dicts → {field: column}."""
+    fields = {}     # name → (row indexes, values), one pass over the days
+    for i, day in enumerate(days):
+        for name, value in day.items():
+            field = fields.get(name)
+            if field is None:
+                field = fields[name] = ([], [])
+            field[0].append(i)
+            field[1].append(value)
+    columns = {}
+    for name, (rows, values) in fields.items():
+        if len(rows) == len(days):
+            rows = None
+        first = values[0]
+        if rows is None and len(days) > 1 and type(first) in (str, int, float, type(None)) \
+                and values.count(first) == len(values) and set(map(type, values)) == {type(first)}:
+            columns[name] = {'t': 'const', 'v': first}
+            continue
+        column = encode_values(name, values)
+        if rows is not None:
+            column['i'] = rows
+        columns[name] = column
+    return columns
@@ -5,6 +5,7 @@ from typing import Callable, Dict, List, Optional, Tuple
 from utils.datetime_local import localize_datetime
 from utils.enoch import calculate_enoch_date
 from utils.lunar_calc import sun_moon_state, lunar_sign_from_longitude
+from utils.sunsets import sunset_jd
 
 
 def _jd_to_iso_utc(jd: float) -> str:
@@ -24,23 +25,10 @@ def _jd_to_iso_utc(jd: float) -> str:
 
 
 def default_sunsets(day_dt_utc: datetime, latitude: float, longitude: float) -> Tuple[str, str]:
-    """Compute previous and current day sunsets (UTC) using Swiss Ephemeris."""
-    geopos = (longitude, latitude, 0)
+    """Compute previous and current day sunsets (UTC) using Swiss Ephemeris (polar days per sunsets policy)."""
     jd0 = swe.julday(day_dt_utc.year, day_dt_utc.month, day_dt_utc.day, 0.0)
-    try:
-        _, data_today = swe.rise_trans(jd0, swe.SUN, 2, geopos)
-        jd_s_today = data_today[0]
-    except Exception as e:
-        print(f"[fast_enoch_calendar] rise_trans today failed for {day_dt_utc.date()}: {e}")
-        jd_s_today = jd0 + 0.75
-    jd_prev = jd0 - 1.0
-    yb, mb, db, _ = swe.revjul(jd_prev)
-    try:
-        _, data_prev = swe.rise_trans(swe.julday(int(yb), int(mb), int(db), 0.0), swe.SUN, 2, geopos)
-        jd_s_prev = data_prev[0]
-    except Exception as e:
-        print(f"[fast_enoch_calendar] rise_trans prev failed for {day_dt_utc.date()}: {e}")
-        jd_s_prev = jd_prev + 0.75
+    jd_s_today, _state = sunset_jd(jd0, latitude, longitude)
+    jd_s_prev, _state = sunset_jd(jd0 - 1.0, latitude, longitude)
     return _jd_to_iso_utc(jd_s_prev), _jd_to_iso_utc(jd_s_today)
 
 
@@ -0,0 +1,124 @@
+"""
+HTTP caching and compression for the calendar endpoints.
+
+/calcYear is deterministic for a given Enoch year, options and engine version,
+so GET /calcYear (query string = the JSON keys of the POST) is cacheable:
+
+    ETag           strong, from the canonical request (normalized params, the
+                   single-flight key) and year_pipeline.ENGINE_VERSION
+    If-None-Match  answered with 304 before anything is computed
+    Cache-Control  public, max-age=CALC_CACHE_MAX_AGE (default 86400 s) for
+                   complete results; no-store for partial/approximate ones
+
+Responses above COMPRESS_MIN_BYTES (default 1024; 0 disables) are compressed
+with brotli (when the `brotli` package is installed) or gzip, as the client's
+Accept-Encoding allows. The encoding is appended to the ETag (`"<tag>-gzip"`)
+so every representation has its own strong validator; If-None-Match accepts
+any of them. Streamed responses (job result follow) are left alone.
+
+    etag = http_cache.make_etag('calc_year', key)
+    if http_cache.not_modified(etag):
+        return http_cache.not_modified_response(etag)
+"""
+import gzip
+import hashlib
+import os
+
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:     # optional: gzip only
+    brotli = None
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+MAX_AGE_S = max(0, _env_int('CALC_CACHE_MAX_AGE', 86400))
+COMPRESS_MIN_BYTES = max(0, _env_int('COMPRESS_MIN_BYTES', 1024))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5      # close to gzip -6 in speed, noticeably smaller
+COMPRESSIBLE = ('application/json', 'application/x-ndjson', 'text/')
+ENCODINGS = ('br', 'gzip')
+
+
+def make_etag(*parts) -> str:
+    """Strong validator (without quotes) for the given JSON-able parts."""
+    return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()[:32]
+
+
+def not_modified(etag: str) -> bool:
+    """True when If-None-Match names this ETag (in any of its encodings)."""
+    if not etag:
+        return False
+    inm = request.if_none_match
+    return any(inm.contains_weak(tag) for tag in [etag] + [f"{etag}-{enc}" for enc in ENCODINGS])
+
+
+def cacheable(resp: Response, etag: str):
+    """Mark a complete GET result cacheable under `etag`."""
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = f"public, max-age={MAX_AGE_S}"
+    resp.vary.add('Accept-Encoding')
+    return resp
+
+
+def not_modified_response(etag: str) -> Response:
+    resp = Response(status=304)
+    return cacheable(resp, etag)
+
+
+def uncacheable(resp: Response):
+    resp.headers['Cache-Control'] = 'no-store'
+    return resp
+
+
+def _pick_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress(resp: Response) -> Response:
+    """Compress a buffered text/JSON body in place when it is big enough and the client accepts it."""
+    if (COMPRESS_MIN_BYTES <= 0 or resp.status_code < 200 or resp.status_code in (204, 304)
+            or resp.direct_passthrough or resp.is_streamed or 'Content-Encoding' in resp.headers
+            or not (resp.mimetype or '').startswith(COMPRESSIBLE)):
+        return resp
+    resp.vary.add('Accept-Encoding')
+    data = resp.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return resp
+    encoding = _pick_encoding()
+    if encoding is None:
+        return resp
+    if encoding == 'br':
+        body = brotli.compress(data, quality=BROTLI_QUALITY)
+    else:
+        body = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    resp.set_data(body)
+    resp.headers['Content-Encoding'] = encoding
+    etag, weak = resp.get_etag()
+    if etag:
+        resp.set_etag(f"{etag}-{encoding}", weak=weak)
+    return resp
+
+
+def register_http_cache(app):
+    """Compress responses on the way out. Register before the other hooks so it runs after them."""
+
+    @app.after_request
+    def _compress(resp):
+        try:
+            return compress(resp)
+        except Exception as e:
+            print(f"[http_cache] compression skipped for {request.path}: {e}", flush=True)
+            return resp
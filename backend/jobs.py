@@ -0,0 +1,605 @@
+"""
+Background jobs for computations that do not fit in one HTTP request.
+
+Multi-year calendars, fine-step alignment scans, the year-length survey and
+bulk charts run for minutes, far past what Render lets a request live. They are
+submitted here instead:
+
+    POST /jobs                {"type": "calendar", "params": {...}}  → 202 {"job_id", "status_url", "results_url"}
+    GET  /jobs/<id>           status, progress (0..1), row count, error
+    GET  /jobs/<id>/results   JSONL stream of the rows written so far (?follow=1 waits for the end)
+
+Job types:
+    calendar      /calcYear payload + first_year/last_year (Gregorian): one row per Enoch day
+    alignments    align_* options + start/end (ISO) or first_year/last_year: one row per event
+    year_lengths  first_year/last_year, latitude/longitude: Enoch year start and length per year
+    bulk_charts   records: [{datetime, timezone, latitude, longitude, id}, ...]: one chart per record
+
+State lives in SQLite and results in one JSONL file per job under JOBS_DIR
+(default <tmp>/astral-jobs), so nothing beyond the standard library is needed.
+Jobs run in a local process pool of JOBS_WORKERS processes (default 1). A job
+with the same type and parameters as a queued, running or finished one is not
+run again: the existing job is returned (a unique index on the dedupe key keeps
+concurrent submissions to one row). Jobs older than JOBS_RETENTION_S
+(default 7 days) are removed on submission.
+
+Submissions are priced with backend/cost.py before they are queued: a job whose
+estimate exceeds JOBS_MAX_CPU_S (default 900 s; a year of nine-body 1 h aspects
+is ~7 s) is refused with 400, and new jobs get 429 while JOBS_MAX_QUEUED
+(default 20) are already waiting. Result tails (?follow=1) end after
+JOBS_FOLLOW_MAX_S (default 600 s), or after JOBS_FOLLOW_IDLE_S (default 60 s)
+without new rows or progress.
+"""
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+import swisseph as swe
+from flask import Response, jsonify, request, stream_with_context
+
+from utils import ephemeris
+from utils import precision
+from utils import sunsets
+from utils.jd_time_utils import parse_iso_to_jd
+try:
+    import cost
+    import year_pipeline
+    from reasons import ReasonCollector
+except Exception:
+    from . import cost  # type: ignore
+    from . import year_pipeline  # type: ignore
+    from .reasons import ReasonCollector  # type: ignore
+
+EPHE_PATH = Path(__file__).resolve().parent.parent / "sweph" / "ephe"
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+FINISHED = (DONE, FAILED)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+JOBS_WORKERS = max(1, int(_env_float('JOBS_WORKERS', 1)))
+RETENTION_S = _env_float('JOBS_RETENTION_S', 7 * 86400.0)
+MAX_YEARS = int(_env_float('JOBS_MAX_YEARS', 200))
+MAX_RECORDS = int(_env_float('JOBS_MAX_RECORDS', 20000))
+MAX_CPU_S = _env_float('JOBS_MAX_CPU_S', 900.0)
+MAX_QUEUED = int(_env_float('JOBS_MAX_QUEUED', 20))
+FOLLOW_MAX_S = _env_float('JOBS_FOLLOW_MAX_S', 600.0)
+FOLLOW_IDLE_S = _env_float('JOBS_FOLLOW_IDLE_S', 60.0)
+PROGRESS_INTERVAL_S = 0.5
+STREAM_CHUNK = 64 * 1024
+
+# Per-item CPU estimates (ms) for the job types cost.estimate_cost does not cover
+YEAR_LENGTH_MS = 10.0       # Enoch anchor + next-year probe
+CHART_MS = 15.0             # one natal chart (bench: calculate_single)
+
+
+class JobError(ValueError):
+    """Invalid job submission (HTTP 400)."""
+
+
+class JobQueueFull(JobError):
+    """Too many jobs waiting (HTTP 429)."""
+
+
+def jobs_dir() -> str:
+    return os.environ.get('JOBS_DIR') or os.path.join(tempfile.gettempdir(), 'astral-jobs')
+
+
+def _db_path() -> str:
+    return os.path.join(jobs_dir(), 'jobs.sqlite')
+
+
+def _result_path(job_id: str) -> str:
+    return os.path.join(jobs_dir(), f"{job_id}.jsonl")
+
+
+def _connect() -> sqlite3.Connection:
+    os.makedirs(jobs_dir(), exist_ok=True)
+    conn = sqlite3.connect(_db_path(), timeout=30.0, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        params TEXT NOT NULL,
+        dedupe_key TEXT NOT NULL,
+        status TEXT NOT NULL,
+        progress REAL NOT NULL DEFAULT 0,
+        note TEXT,
+        rows INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        summary TEXT,
+        pid INTEGER,
+        created REAL NOT NULL,
+        started REAL,
+        finished REAL)""")
+    conn.execute("CREATE INDEX IF NOT EXISTS jobs_dedupe ON jobs (dedupe_key, status)")
+    try:
+        # one live (not failed) job per dedupe key, so concurrent identical submits insert once
+        conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS jobs_dedupe_live ON jobs (dedupe_key) "
+                     f"WHERE status != '{FAILED}'")
+    except sqlite3.IntegrityError:
+        pass    # a database written before the index: submit() still checks before inserting
+    return conn
+
+
+@contextmanager
+def _db():
+    """Autocommit connection, closed on exit (one per call: workers are separate processes)."""
+    conn = _connect()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def _iso(ts):
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(ts)) if ts else None
+
+
+def public_job(row) -> dict:
+    job = {
+        'id': row['id'],
+        'type': row['kind'],
+        'status': row['status'],
+        'progress': round(row['progress'] or 0.0, 4),
+        'rows': row['rows'],
+        'created': _iso(row['created']),
+        'started': _iso(row['started']),
+        'finished': _iso(row['finished']),
+        'status_url': f"/jobs/{row['id']}",
+        'results_url': f"/jobs/{row['id']}/results",
+    }
+    if row['note']:
+        job['note'] = row['note']
+    if row['error']:
+        job['error'] = row['error']
+    if row['summary']:
+        job['summary'] = json.loads(row['summary'])
+    return job
+
+
+def get_job(job_id: str):
+    with _db() as conn:
+        return conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+
+# --- Job types: validate(params) → normalized params; run(params, progress) yields result rows ---
+
+def _year_range(params: dict):
+    try:
+        first = int(params.get('first_year'))
+        last = int(params.get('last_year', first))
+    except (TypeError, ValueError):
+        raise JobError("first_year (and optionally last_year) must be integers")
+    if last < first:
+        raise JobError("last_year is before first_year")
+    if last - first + 1 > MAX_YEARS:
+        raise JobError(f"at most {MAX_YEARS} years per job")
+    return first, last
+
+
+def _greg_iso(year: int, month: int = 6, day: int = 1) -> str:
+    """Extended ISO datetime for a Gregorian date at 12:00 UTC (BCE as -00YYYY)."""
+    if year < 0:
+        return f"-{abs(year):06d}-{month:02d}-{day:02d}T12:00:00Z"
+    return f"{year:04d}-{month:02d}-{day:02d}T12:00:00Z"
+
+
+def _validate_calendar(params: dict) -> dict:
+    params = dict(params)
+    if params.get('first_year') is None:
+        # a single year: the one containing `datetime`, exactly like /calcYear
+        if not params.get('datetime'):
+            raise JobError("need first_year/last_year or a datetime")
+    else:
+        _year_range(params)
+        params['datetime'] = _greg_iso(int(params['first_year']))
+    try:
+        year_pipeline.parse_year_request(params)
+    except year_pipeline.RequestError as e:
+        raise JobError(str(e))
+    except (TypeError, ValueError):
+        raise JobError("latitude and longitude are required")
+    return params
+
+
+def _estimate_calendar(params: dict) -> float:
+    first, last = _year_range(params) if params.get('first_year') is not None else (0, 0)
+    years = last - first + 1
+    return years * cost.estimate_cost(year_pipeline.parse_year_request(params))['cpu_ms']
+
+
+def _run_calendar(params: dict, progress, record_reason):
+    if params.get('first_year') is None:
+        requests = [year_pipeline.parse_year_request(params)]
+    else:
+        # the Enoch year that starts in Gregorian year y (spring) contains June 1st
+        first, last = _year_range(params)
+        requests = [year_pipeline.parse_year_request(dict(params, datetime=_greg_iso(y), timezone='UTC'))
+                    for y in range(first, last + 1)]
+    for i, year_params in enumerate(requests):
+        progress(i / len(requests), f"year {i + 1}/{len(requests)}")
+        with precision.use_precision(year_params['precision']), sunsets.use_policy(year_params['polar_policy']):
+            year = year_pipeline.run_year(year_params, record_reason, deadline_ms=0)
+        yield from year['days']
+
+
+def _validate_alignments(params: dict) -> dict:
+    params = dict(params)
+    try:
+        if params.get('start') is not None:
+            start = parse_iso_to_jd(str(params['start']))
+            end = parse_iso_to_jd(str(params.get('end')))
+        else:
+            first, last = _year_range(params)
+            start, end = swe.julday(first, 1, 1, 0.0), swe.julday(last + 1, 1, 1, 0.0)
+    except (TypeError, ValueError) as e:
+        if isinstance(e, JobError):
+            raise
+        raise JobError("start/end must be ISO datetimes (or give first_year/last_year)")
+    if not end > start:
+        raise JobError("end must be after start")
+    if end - start > MAX_YEARS * 365.25:
+        raise JobError(f"at most {MAX_YEARS} years per job")
+    params['_start_jd'], params['_end_jd'] = start, end
+    # the scanners sample at most hourly: store the step they will actually use
+    step = year_pipeline.parse_align(params)['step_hours']
+    params.pop('align_step', None)
+    params['align_step_hours'] = max(1.0, min(24.0, step))
+    return params
+
+
+def _estimate_alignments(params: dict) -> float:
+    align = year_pipeline.parse_align(params)
+    est = cost.estimate_cost({'fields': ('alignments',), 'align': align})
+    return (est['cpu_ms'] - cost.BASE_MS) * (params['_end_jd'] - params['_start_jd']) / cost.DAYS
+
+
+def _run_alignments(params: dict, progress, record_reason):
+    from utils.lunar_calc import scan_alignments_simple_jd, scan_pair_aspects_jd
+    align = year_pipeline.parse_align(params)
+    start, end = params['_start_jd'], params['_end_jd']
+    names = year_pipeline._planet_names(record_reason)
+    step = max(1.0, min(24.0, align['step_hours']))
+    chunk = step / 24.0 * math.ceil(30.0 * 24.0 / step)    # ~30 days, a whole number of steps
+    jd = start
+    while jd < end:
+        progress((jd - start) / (end - start), year_pipeline._jd_to_iso_utc(jd)[:10])
+        # chunks start on the sampling grid so results do not depend on the chunk size
+        chunk_end = min(end, jd + chunk) - step / 48.0
+        events = scan_alignments_simple_jd(
+            jd, chunk_end, max_span_deg=max(1.0, min(60.0, align['span_deg'])),
+            min_count=max(0, min(10, align['min_count'])), step_hours=step, planet_mode=align['planets'],
+            include_outer=align['include_outer'], include_moon=align['include_moon'], include_sun=align['include_sun'])
+        if align['detect_aspects']:
+            events += scan_pair_aspects_jd(
+                jd, chunk_end, step_hours=step, planet_mode=align['planets'], include_outer=align['include_outer'],
+                include_moon=align['include_moon'], include_sun=align['include_sun'],
+                include_oppositions=align['include_oppositions'])
+        for ev in sorted(events, key=lambda e: e['jd']):
+            row = {
+                'type': ev.get('type'),
+                'utc': year_pipeline._jd_to_iso_utc(ev['jd']),
+                'jd': ev['jd'],
+                'count': ev.get('count'),
+                'total': ev.get('total'),
+                'planets': ','.join(names.get(pid, str(pid)) for pid in (ev.get('pids') or [])),
+                'span_deg': ev.get('span'),
+            }
+            if ev.get('offset') is not None:
+                row['offset_deg'] = ev['offset']
+            yield row
+        jd += chunk
+
+
+def _validate_year_lengths(params: dict) -> dict:
+    params = dict(params)
+    _year_range(params)
+    try:
+        params['latitude'] = float(params.get('latitude', 31.7683))
+        params['longitude'] = float(params.get('longitude', 35.2137))
+    except (TypeError, ValueError):
+        raise JobError("latitude/longitude must be numbers")
+    try:
+        params['ephemeris'] = year_pipeline.parse_ephemeris(params.get('ephemeris') or params.get('ephe'))
+    except year_pipeline.RequestError as e:
+        raise JobError(str(e))
+    return params
+
+
+def _estimate_year_lengths(params: dict) -> float:
+    first, last = _year_range(params)
+    return (last - first + 1) * YEAR_LENGTH_MS
+
+
+def _run_year_lengths(params: dict, progress, record_reason):
+    first, last = _year_range(params)
+    for y in range(first, last + 1):
+        progress((y - first) / (last - first + 1), f"year {y}")
+        jd = parse_iso_to_jd(_greg_iso(y))
+        provider, _ = year_pipeline.resolve_provider(params, jd, record_reason)
+        year = {'jd': jd, 'latitude': params['latitude'], 'longitude': params['longitude'], 'provider': provider}
+        year_pipeline.stage_anchor(year, record_reason)
+        yield {
+            'gregorian_year': y,
+            'enoch_year': year['enoch_year'],
+            'start_utc': year_pipeline._jd_to_iso_utc(year['start_jd']),
+            'days': year['n_days'],
+            'added_week': year['n_days'] > 364,
+            'provider': provider,
+        }
+
+
+def _validate_bulk_charts(params: dict) -> dict:
+    records = params.get('records')
+    if not isinstance(records, list) or not records:
+        raise JobError("records must be a non-empty list of birth records")
+    if len(records) > MAX_RECORDS:
+        raise JobError(f"at most {MAX_RECORDS} records per job")
+    return dict(params)
+
+
+def _estimate_bulk_charts(params: dict) -> float:
+    return len(params['records']) * CHART_MS
+
+
+def _run_bulk_charts(params: dict, progress, record_reason):
+    from utils.bulk_charts import compute_chart
+    records = params['records']
+    for i, rec in enumerate(records):
+        if i % 50 == 0:
+            progress(i / len(records), f"record {i + 1}")
+        yield compute_chart(i + 1, rec if isinstance(rec, dict) else {'_parse_error': 'record is not an object'})
+
+
+# type → (validate, estimate CPU ms, run)
+JOB_TYPES = {
+    'calendar': (_validate_calendar, _estimate_calendar, _run_calendar),
+    'alignments': (_validate_alignments, _estimate_alignments, _run_alignments),
+    'year_lengths': (_validate_year_lengths, _estimate_year_lengths, _run_year_lengths),
+    'bulk_charts': (_validate_bulk_charts, _estimate_bulk_charts, _run_bulk_charts),
+}
+
+
+# --- Worker side ---
+
+def _init_worker(ephe_path: str):
+    swe.set_ephe_path(ephe_path)
+
+
+def execute(job_id: str):
+    """Run one queued job to completion (in a pool process). Never raises."""
+    now = time.time()
+    with _db() as conn:
+        claimed = conn.execute("UPDATE jobs SET status = ?, started = ?, pid = ? WHERE id = ? AND status = ?",
+                               (RUNNING, now, os.getpid(), job_id, QUEUED)).rowcount
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if not claimed or row is None:
+        return
+    reasons = ReasonCollector(f"job:{row['kind']}")
+    last = [0.0]
+    rows = 0
+
+    def progress(fraction: float, note: str = None):
+        t = time.monotonic()
+        if t - last[0] < PROGRESS_INTERVAL_S:
+            return
+        last[0] = t
+        with _db() as conn:
+            conn.execute("UPDATE jobs SET progress = ?, note = ?, rows = ? WHERE id = ?",
+                         (max(0.0, min(1.0, fraction)), note, rows, job_id))
+
+    def record_reason(code, msg, exc=None, informational=False):
+        reasons.record(code, msg, exc, informational=informational)
+
+    status, error = DONE, None
+    try:
+        _, _, run = JOB_TYPES[row['kind']]
+        params = json.loads(row['params'])
+        with ephemeris.use_tier(None), sunsets.use_policy(None), precision.use_precision(None), \
+                open(_result_path(job_id), 'w', encoding='utf-8') as out:
+            for item in run(params, progress, record_reason):
+                out.write(json.dumps(item, ensure_ascii=False, default=str) + '\n')
+                rows += 1
+                if rows % 256 == 0:
+                    out.flush()
+    except Exception as e:
+        status, error = FAILED, f"{type(e).__name__}: {e}"
+        record_reason('job_failed', error, traceback.format_exc())
+    summary = {'reason_codes': reasons.codes()} if reasons else None
+    with _db() as conn:
+        conn.execute("UPDATE jobs SET status = ?, progress = ?, rows = ?, error = ?, summary = ?, finished = ?, "
+                     "note = NULL WHERE id = ?",
+                     (status, 1.0 if status == DONE else row['progress'], rows, error,
+                      json.dumps(summary) if summary else None, time.time(), job_id))
+
+
+# --- Submission side ---
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _pid_alive(pid) -> bool:
+    try:
+        os.kill(int(pid), 0)
+        return True
+    except (OSError, TypeError, ValueError):
+        return False
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Create the worker pool on first use, requeueing jobs whose worker died with the last process."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the pool is created inside a request, and a forked worker
+            # would inherit whatever locks the serving thread holds at that moment
+            _pool = ProcessPoolExecutor(max_workers=JOBS_WORKERS, initializer=_init_worker,
+                                        initargs=(str(EPHE_PATH),), mp_context=multiprocessing.get_context('spawn'))
+            with _db() as conn:
+                for row in conn.execute("SELECT id, pid FROM jobs WHERE status = ?", (RUNNING,)).fetchall():
+                    if not _pid_alive(row['pid']):
+                        conn.execute("UPDATE jobs SET status = ?, pid = NULL WHERE id = ?", (QUEUED, row['id']))
+                pending = [r['id'] for r in conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? ORDER BY created", (QUEUED,)).fetchall()]
+            for job_id in pending:
+                _pool.submit(execute, job_id)
+        return _pool
+
+
+def _dispatch(job_id: str):
+    global _pool
+    try:
+        _get_pool().submit(execute, job_id)
+    except Exception:
+        # BrokenProcessPool (a worker was killed): start a fresh pool, which also requeues
+        with _pool_lock:
+            _pool = None
+        _get_pool()
+
+
+def _cleanup(conn):
+    if RETENTION_S <= 0:
+        return
+    cutoff = time.time() - RETENTION_S
+    for row in conn.execute("SELECT id FROM jobs WHERE created < ? AND status IN (?, ?)",
+                            (cutoff, DONE, FAILED)).fetchall():
+        try:
+            os.remove(_result_path(row['id']))
+        except OSError:
+            pass
+        conn.execute("DELETE FROM jobs WHERE id = ?", (row['id'],))
+
+
+def submit(kind: str, params: dict):
+    """
+    Queue a job; returns (job row, deduplicated). A queued, running or finished job with
+    the same type and parameters is returned instead of starting another one. Raises
+    JobError for invalid or too expensive jobs and JobQueueFull when the queue is full.
+    """
+    kind = str(kind or '').strip().lower()
+    if kind not in JOB_TYPES:
+        raise JobError(f"unknown job type {kind!r} (choose from {', '.join(JOB_TYPES)})")
+    if not isinstance(params, dict):
+        raise JobError("params must be an object")
+    validate, estimate, _ = JOB_TYPES[kind]
+    params = validate(params)
+    canonical = json.dumps([kind, params], sort_keys=True, separators=(',', ':'), default=str)
+    key = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def live_job(conn):
+        return conn.execute("SELECT * FROM jobs WHERE dedupe_key = ? AND status != ? ORDER BY created DESC LIMIT 1",
+                            (key, FAILED)).fetchone()
+
+    with _db() as conn:
+        _cleanup(conn)
+        row = live_job(conn)
+        if row is not None:
+            return row, True
+        cpu_s = estimate(params) / 1000.0
+        if MAX_CPU_S > 0 and cpu_s > MAX_CPU_S:
+            raise JobError(f"job too large: ~{cpu_s:.0f} s of CPU estimated, at most {MAX_CPU_S:g} s per job "
+                           f"(split the range or use a coarser step)")
+        queued = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+        if MAX_QUEUED > 0 and queued >= MAX_QUEUED:
+            raise JobQueueFull(f"{queued} jobs already queued; try again later")
+        job_id = uuid.uuid4().hex
+        try:
+            conn.execute("INSERT INTO jobs (id, kind, params, dedupe_key, status, created) VALUES (?, ?, ?, ?, ?, ?)",
+                         (job_id, kind, json.dumps(params, default=str), key, QUEUED, time.time()))
+        except sqlite3.IntegrityError:
+            # an identical job was inserted since the check above
+            return live_job(conn), True
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    _dispatch(job_id)
+    return row, False
+
+
+def _stream_results(job_id: str, follow: bool):
+    """
+    Yield the result file in chunks; with follow, keep tailing until the job finishes,
+    FOLLOW_MAX_S passes, or FOLLOW_IDLE_S pass without new rows or progress.
+    """
+    path = _result_path(job_id)
+    pos = 0
+    started = last_change = time.monotonic()
+    state = None
+    while True:
+        row = get_job(job_id)
+        finished = row is None or row['status'] in FINISHED
+        if row is not None and (row['status'], row['progress'], row['note'], row['rows']) != state:
+            state = (row['status'], row['progress'], row['note'], row['rows'])
+            last_change = time.monotonic()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                f.seek(pos)
+                pending = ''
+                while True:
+                    data = f.read(STREAM_CHUNK)
+                    if not data:
+                        break
+                    # only whole lines: a worker may be mid-write (a long line spans several reads)
+                    data = pending + data
+                    cut = data.rfind('\n') + 1 if not finished else len(data)
+                    if cut:
+                        yield data[:cut]
+                        pos += len(data[:cut].encode('utf-8'))
+                        last_change = time.monotonic()
+                    pending = data[cut:]
+        except FileNotFoundError:
+            pass
+        now = time.monotonic()
+        if finished or not follow or now - started > FOLLOW_MAX_S or now - last_change > FOLLOW_IDLE_S:
+            return
+        time.sleep(0.5)
+
+
+def register_jobs(app):
+    @app.route('/jobs', methods=['POST'])
+    def jobs_submit():
+        data = request.get_json(silent=True) or {}
+        try:
+            row, dedup = submit(data.get('type') or data.get('kind'), data.get('params') or {})
+        except JobError as e:
+            return jsonify({'ok': False, 'error': str(e)}), (429 if isinstance(e, JobQueueFull) else 400)
+        return jsonify({'ok': True, 'job_id': row['id'], 'deduplicated': dedup, 'job': public_job(row)}), \
+            (200 if dedup else 202)
+
+    @app.route('/jobs/<job_id>', methods=['GET'])
+    def jobs_status(job_id):
+        row = get_job(job_id)
+        if row is None:
+            return jsonify({'ok': False, 'error': 'unknown job'}), 404
+        return jsonify({'ok': True, 'job': public_job(row)})
+
+    @app.route('/jobs/<job_id>/results', methods=['GET'])
+    def jobs_results(job_id):
+        row = get_job(job_id)
+        if row is None:
+            return jsonify({'ok': False, 'error': 'unknown job'}), 404
+        follow = str(request.args.get('follow') or '').strip().lower() in ('1', 'true', 'yes', 'on')
+        resp = Response(stream_with_context(_stream_results(job_id, follow)), mimetype='application/x-ndjson')
+        resp.headers['X-Job-Status'] = row['status']
+        return resp
@@ -0,0 +1,182 @@
+"""
+Request metrics for the Flask app.
+
+Every request gets a utils.timing record: handlers time their stages with
+timing.stage(...), and Swiss Ephemeris calls are counted by the wrappers from
+utils.swe_profiler. On the way out the record becomes a Server-Timing header
+and feeds in-process Prometheus histograms served at /metrics (text exposition
+format, no client library needed).
+
+Detailed call accounting (time, JD range, caller per swisseph function) is
+opt-in: SWE_PROFILE=1 for every request (log line only), or ?swe_profile=1 /
+"swe_profile": true in the JSON body to also get it back in debug.swe_profile.
+"""
+import json
+import threading
+
+from flask import Response, g, request
+
+from utils import swe_profiler
+from utils import timing
+
+# Seconds; covers cached single-day calls up to multi-second BCE years
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _Histogram:
+    __slots__ = ('buckets', 'sum', 'count')
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, le in enumerate(BUCKETS):
+            if value <= le:
+                self.buckets[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """Histograms and counters keyed by (metric name, label tuple)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hist = {}
+        self._counters = {}
+        self._help = {}
+
+    def observe(self, name: str, labels: tuple, value: float, help_text: str = ''):
+        with self._lock:
+            h = self._hist.get((name, labels))
+            if h is None:
+                h = self._hist[(name, labels)] = _Histogram()
+                self._help.setdefault(name, ('histogram', help_text))
+            h.observe(value)
+
+    def inc(self, name: str, labels: tuple, n: float = 1, help_text: str = ''):
+        with self._lock:
+            self._counters[(name, labels)] = self._counters.get((name, labels), 0) + n
+            self._help.setdefault(name, ('counter', help_text))
+
+    def render(self) -> str:
+        with self._lock:
+            hist = {k: (list(v.buckets), v.sum, v.count) for k, v in self._hist.items()}
+            counters = dict(self._counters)
+            helps = dict(self._help)
+        lines = []
+        for name in sorted(helps):
+            kind, help_text = helps[name]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == 'histogram':
+                for (n, labels), (buckets, total, cnt) in sorted(hist.items()):
+                    if n != name:
+                        continue
+                    for le, c in zip(BUCKETS, buckets):
+                        lines.append(f"{name}_bucket{_labels(labels, ('le', _fmt(le)))} {c}")
+                    lines.append(f"{name}_bucket{_labels(labels, ('le', '+Inf'))} {cnt}")
+                    lines.append(f"{name}_sum{_labels(labels)} {total:.6f}")
+                    lines.append(f"{name}_count{_labels(labels)} {cnt}")
+            else:
+                for (n, labels), val in sorted(counters.items()):
+                    if n == name:
+                        lines.append(f"{name}{_labels(labels)} {_fmt(val)}")
+        return '\n'.join(lines) + '\n'
+
+
+def _fmt(v) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+def _labels(labels: tuple, extra: tuple = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ''
+    esc = lambda s: str(s).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{k}="{esc(v)}"' for k, v in items) + '}'
+
+
+REGISTRY = Registry()
+
+
+def _profile_requested() -> bool:
+    flag = request.args.get('swe_profile')
+    if flag is None and request.is_json:
+        flag = (request.get_json(silent=True) or {}).get('swe_profile')
+    return str(flag or '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _attach_profile(resp, prof):
+    """Add debug.swe_profile to a JSON object response."""
+    if not resp.is_json:
+        return
+    body = resp.get_json(silent=True)
+    if not isinstance(body, dict):
+        return
+    debug = body.setdefault('debug', {})
+    if isinstance(debug, dict):
+        debug['swe_profile'] = prof.summary()
+        resp.set_data(json.dumps(body))
+
+
+def register_metrics(app):
+    swe_profiler.install()
+
+    @app.before_request
+    def _metrics_begin():
+        g._timing_token = timing.begin()
+        g._swe_profile_in_body = _profile_requested()
+        if g._swe_profile_in_body or swe_profiler.env_enabled():
+            g._swe_profile, g._swe_profile_token = swe_profiler.start()
+
+    @app.after_request
+    def _metrics_finish(resp):
+        rec = timing.current()
+        if rec is None:
+            return resp
+        try:
+            resp.headers['Server-Timing'] = timing.server_timing_header(rec)
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            if route != '/metrics':
+                REGISTRY.observe('astral_http_request_duration_seconds',
+                                 (('route', route), ('method', request.method), ('status', str(resp.status_code))),
+                                 rec.elapsed(), 'Request latency per route')
+                for stage_name, secs in rec.stages.items():
+                    REGISTRY.observe('astral_stage_duration_seconds', (('route', route), ('stage', stage_name)),
+                                     secs, 'Time spent per handler stage')
+                for counter, n in rec.counters.items():
+                    REGISTRY.inc('astral_ephemeris_calls_total', (('route', route), ('function', counter)),
+                                 n, 'Swiss Ephemeris calls per route')
+        except Exception:
+            pass
+        prof = g.get('_swe_profile')
+        if prof is not None:
+            try:
+                print(f"{prof.log_line()} path={request.path}", flush=True)
+                if g.get('_swe_profile_in_body'):
+                    _attach_profile(resp, prof)
+            except Exception:
+                pass
+        return resp
+
+    @app.teardown_request
+    def _metrics_end(_exc=None):
+        prof_token = g.pop('_swe_profile_token', None)
+        if prof_token is not None:
+            try:
+                swe_profiler.stop(prof_token)
+            except Exception:
+                pass
+        token = g.pop('_timing_token', None)
+        if token is not None:
+            try:
+                timing.end(token)
+            except Exception:
+                pass
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
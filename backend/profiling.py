@@ -0,0 +1,174 @@
+"""
+On-demand request profiler.
+
+Disabled unless PROFILE_ADMIN_TOKEN is set: without it no hook is registered,
+so normal requests pay nothing. With it, a request that carries
+
+    X-Profile: cprofile | sample        (or ?profile=cprofile|sample)
+    X-Admin-Token: <PROFILE_ADMIN_TOKEN>  (header only: a query string ends up in access logs)
+
+runs under a profiler and the result is written to PROFILE_DIR
+(default: <tmp>/astral-profiles):
+    cprofile → <id>.pstats (deterministic; open with pstats/snakeviz)
+    sample   → <id>.collapsed (stack samples, one "a;b;c count" line per stack,
+               ready for flamegraph.pl / speedscope)
+plus <id>.json with the route, query and JSON payload. The id comes back in the
+X-Profile-Id header and, for JSON object responses, as debug.profile_id.
+"""
+import cProfile
+import hmac
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from flask import g, request
+
+MODES = ('cprofile', 'sample')
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+SAMPLE_INTERVAL_S = max(0.001, _env_float('PROFILE_SAMPLE_MS', 5.0) / 1000.0)
+
+
+def profile_dir() -> Path:
+    return Path(os.environ.get('PROFILE_DIR') or os.path.join(tempfile.gettempdir(), 'astral-profiles'))
+
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed interval and counts collapsed stacks."""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL_S):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                names.append(f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}")
+                frame = frame.f_back
+            key = ';'.join(reversed(names))
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def collapsed(self) -> str:
+        return ''.join(f"{stack} {n}\n" for stack, n in sorted(self.counts.items()))
+
+
+def _requested_mode():
+    mode = (request.headers.get('X-Profile') or request.args.get('profile') or '').strip().lower()
+    if not mode:
+        return None
+    if mode in ('1', 'true', 'yes', 'on'):
+        mode = 'cprofile'
+    return mode if mode in MODES else None
+
+
+def _authorized(admin_token: str) -> bool:
+    supplied = request.headers.get('X-Admin-Token') or ''
+    return hmac.compare_digest(supplied.encode(), admin_token.encode())
+
+
+def _save(profile_id: str, mode: str, profiler, duration: float, status: int):
+    out = profile_dir()
+    out.mkdir(parents=True, exist_ok=True)
+    if mode == 'cprofile':
+        profiler.dump_stats(str(out / f"{profile_id}.pstats"))
+    else:
+        (out / f"{profile_id}.collapsed").write_text(profiler.collapsed(), encoding='utf-8')
+    meta = {
+        'id': profile_id,
+        'mode': mode,
+        'path': request.path,
+        'method': request.method,
+        'query': request.args.to_dict(flat=True),
+        'payload': request.get_json(silent=True),
+        'status': status,
+        'duration_s': round(duration, 4),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+    }
+    meta['query'].pop('admin_token', None)
+    (out / f"{profile_id}.json").write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding='utf-8')
+
+
+def _attach_id(resp, profile_id: str):
+    resp.headers['X-Profile-Id'] = profile_id
+    if not resp.is_json:
+        return
+    body = resp.get_json(silent=True)
+    if isinstance(body, dict):
+        debug = body.setdefault('debug', {})
+        if isinstance(debug, dict):
+            debug['profile_id'] = profile_id
+            resp.set_data(json.dumps(body))
+
+
+def register_profiling(app):
+    admin_token = os.environ.get('PROFILE_ADMIN_TOKEN', '').strip()
+    if not admin_token:
+        return
+
+    @app.before_request
+    def _profile_begin():
+        mode = _requested_mode()
+        if mode is None or not _authorized(admin_token):
+            return
+        if mode == 'cprofile':
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            profiler = StackSampler(threading.get_ident())
+            profiler.start()
+        g._profile = (mode, profiler, time.perf_counter())
+
+    @app.after_request
+    def _profile_finish(resp):
+        state = g.pop('_profile', None)
+        if state is None:
+            return resp
+        mode, profiler, t0 = state
+        if mode == 'cprofile':
+            profiler.disable()
+        else:
+            profiler.stop()
+        profile_id = time.strftime('%Y%m%d-%H%M%S') + '-' + uuid.uuid4().hex[:8]
+        try:
+            _save(profile_id, mode, profiler, time.perf_counter() - t0, resp.status_code)
+            _attach_id(resp, profile_id)
+        except Exception as e:
+            print(f"[profiling] failed to save profile {profile_id}: {e}", flush=True)
+        return resp
+
+    @app.teardown_request
+    def _profile_cleanup(_exc=None):
+        # after_request is skipped on some error paths; never leave a profiler running
+        state = g.pop('_profile', None)
+        if state is not None:
+            mode, profiler, _t0 = state
+            if mode == 'cprofile':
+                profiler.disable()
+            else:
+                profiler.stop()
@@ -0,0 +1,122 @@
+"""
+Aggregated approximation/fallback reasons for one request.
+
+calc_year used to append, log and print a full traceback for every fallback,
+which on the BCE/JD path and at polar latitudes meant hundreds of identical
+tracebacks per request. ReasonCollector keeps one entry per reason code (first
+message, count, one sample traceback). Each code is logged once per request at
+most, and once per REASON_LOG_INTERVAL_S (default 60 s) per process; repeats
+inside the window are only counted and reported on the next line that is logged.
+
+    reasons = ReasonCollector()
+    reasons.record('sunset_failed', f"rise_trans failed for {greg}", traceback.format_exc())
+    resp['quality_reason_codes'] = reasons.codes()     # {'sunset_failed': 12}
+"""
+import os
+import threading
+import time
+
+from flask import current_app, has_app_context
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+LOG_INTERVAL_S = _env_float('REASON_LOG_INTERVAL_S', 60.0)
+
+
+class _RateLimiter:
+    """Process-wide: lets one log line per key through every `interval` seconds."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._last = {}
+        self._suppressed = {}
+        self._lock = threading.Lock()
+
+    def allow(self, key):
+        """Return (allowed, suppressed_since_last_allowed)."""
+        now = time.monotonic()
+        with self._lock:
+            last = self._last.get(key)
+            if last is not None and now - last < self.interval:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return False, 0
+            self._last[key] = now
+            return True, self._suppressed.pop(key, 0)
+
+
+_limiter = _RateLimiter(LOG_INTERVAL_S)
+
+
+def _log(text: str, warning: bool = True):
+    try:
+        if has_app_context():
+            (current_app.logger.warning if warning else current_app.logger.info)(text)
+            return
+    except Exception:
+        pass
+    print(text, flush=True)
+
+
+def log_limited(route: str, code: str, message: str, tb: str = None, warning: bool = True) -> bool:
+    """Log one reason line unless `code` was already logged for `route` within the interval."""
+    allowed, suppressed = _limiter.allow((route, code))
+    if not allowed:
+        return False
+    extra = f" ({suppressed} more in the last {LOG_INTERVAL_S:g}s)" if suppressed else ''
+    text = f"[approx_reason] {route} {code}: {message}{extra}"
+    if tb:
+        text += '\n' + tb.rstrip()
+    _log(text, warning=warning)
+    return True
+
+
+class ReasonCollector:
+    """Reasons recorded while serving one request, deduplicated by code."""
+
+    def __init__(self, route: str = 'calc_year'):
+        self.route = route
+        self._entries = {}      # code → {'message', 'count', 'traceback', 'informational'}
+
+    def record(self, code: str, message: str, tb: str = None, informational: bool = False) -> bool:
+        """
+        Count one occurrence of `code`. Returns True the first time the code is
+        seen in this request. Informational reasons (e.g. "no alignments found")
+        are reported but do not mark the result as approximate.
+        """
+        entry = self._entries.get(code)
+        if entry is not None:
+            entry['count'] += 1
+            if tb and not entry['traceback']:
+                entry['traceback'] = tb
+            return False
+        self._entries[code] = {'message': message, 'count': 1, 'traceback': tb, 'informational': informational}
+        log_limited(self.route, code, message, tb, warning=not informational)
+        return True
+
+    def __bool__(self):
+        return bool(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def degraded(self) -> bool:
+        """True when at least one non-informational reason was recorded."""
+        return any(not e['informational'] for e in self._entries.values())
+
+    def codes(self) -> dict:
+        return {code: e['count'] for code, e in self._entries.items()}
+
+    def messages(self) -> list:
+        """One human-readable line per code (first message seen, with the repeat count)."""
+        return [e['message'] if e['count'] == 1 else f"{e['message']} (x{e['count']})"
+                for e in self._entries.values()]
+
+    def summary(self) -> str:
+        return ','.join(f"{code}={n}" for code, n in self.codes().items())
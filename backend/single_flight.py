@@ -0,0 +1,265 @@
+"""
+Single-flight coalescing for identical concurrent requests.
+
+When a new Enoch year starts or a calendar link is shared, many browsers ask
+for the same year at the same moment and each one used to compute it. Here
+the first request for a key (the leader) computes; requests arriving while it
+runs (followers) wait for its result instead of repeating the work.
+
+    in-process   threads of one worker wait on the leader's event
+    cross-process  workers on one host serialize on an flock()ed lock file under
+                 SINGLE_FLIGHT_DIR (default <tmp>/astral-single-flight); a
+                 worker that has to wait leaves a <key>.waiting marker, and
+                 only then does the leader write its result to <key>.json
+
+Only results finished while a follower was waiting are shared, so this never
+serves a stale result; it is not a cache. A follower whose leader fails (or
+returns something not shareable) or takes longer than SINGLE_FLIGHT_WAIT_S
+(default 30 s) computes on its own. SINGLE_FLIGHT=0 disables coalescing; the
+cross-process part needs fcntl (not on Windows).
+
+    result, role = single_flight.do(key, compute, shareable=lambda r: r[1] == 200)
+    # role: leader | follower (same process) | shared (other worker) | alone
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:     # Windows: in-process coalescing only
+    fcntl = None
+
+LEADER = 'leader'
+FOLLOWER = 'follower'
+SHARED = 'shared'
+ALONE = 'alone'
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+ENABLED = (os.environ.get('SINGLE_FLIGHT') or '1').strip().lower() not in ('0', 'false', 'no', 'off')
+WAIT_S = _env_float('SINGLE_FLIGHT_WAIT_S', 30.0)
+RESULT_TTL_S = 600.0    # result, marker and idle lock files older than this are pruned
+PRUNE_EVERY_S = 60.0    # per process
+POLL_S = 0.02
+
+
+def flight_dir() -> str:
+    return os.environ.get('SINGLE_FLIGHT_DIR') or os.path.join(tempfile.gettempdir(), 'astral-single-flight')
+
+
+def make_key(*parts) -> str:
+    """Stable key for JSON-able parts (dict order does not matter)."""
+    canonical = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'ok')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.ok = False
+
+
+_calls = {}
+_lock = threading.Lock()
+_last_prune = 0.0
+
+
+def do(key: str, compute, shareable=None):
+    """
+    compute() once per key among concurrent callers; returns (result, role).
+    `shareable(result)` decides whether waiting callers may reuse the result
+    (default: any result); exceptions from compute are never shared.
+    """
+    if not ENABLED or not key:
+        return compute(), ALONE
+    with _lock:
+        call = _calls.get(key)
+        leader = call is None
+        if leader:
+            call = _calls[key] = _Call()
+    if not leader:
+        if call.event.wait(WAIT_S) and call.ok:
+            return call.result, FOLLOWER
+        return compute(), ALONE
+    try:
+        result, role = _across_processes(key, compute, shareable)
+        call.result = result
+        call.ok = shareable is None or bool(shareable(result))
+        return result, role
+    finally:
+        with _lock:
+            _calls.pop(key, None)
+        call.event.set()
+
+
+def _across_processes(key: str, compute, shareable):
+    if fcntl is None:
+        return compute(), LEADER
+    arrived = time.time()
+    deadline = time.monotonic() + WAIT_S
+    lock_path = os.path.join(flight_dir(), f"{key}.lock")
+    fd = None
+    try:
+        waited = False
+        while True:
+            try:
+                os.makedirs(flight_dir(), exist_ok=True)
+                fd = os.open(lock_path, os.O_CREAT | os.O_RDWR, 0o644)
+                os.utime(fd)            # last use, for _prune (by fd: the path may be gone already)
+            except OSError:
+                return compute(), LEADER
+            if not _try_lock(fd):
+                # another worker is computing this key: ask for its result and wait for it
+                waited = True
+                _touch(_waiting_path(key))
+                if not _wait_lock(fd, deadline - time.monotonic()):
+                    return compute(), ALONE
+            if _is_lock_file(fd, lock_path):
+                break
+            # _prune unlinked the file between our open and flock: lock the one there now
+            os.close(fd)
+            fd = None
+        if waited:
+            result = _read_result(key, arrived)
+            if result is not None:
+                return result, SHARED
+        result = compute()
+        # nobody waiting (the common case): no result file to serialize and write
+        if os.path.exists(_waiting_path(key)) and (shareable is None or shareable(result)):
+            _write_result(key, result)
+            _remove(_waiting_path(key))
+        return result, LEADER
+    finally:
+        if fd is not None:
+            os.close(fd)    # releases the lock
+        _maybe_prune()
+
+
+def _try_lock(fd) -> bool:
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def _is_lock_file(fd, path: str) -> bool:
+    """True while `path` is still the file `fd` has open (not unlinked or replaced by _prune)."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    own = os.fstat(fd)
+    return (st.st_dev, st.st_ino) == (own.st_dev, own.st_ino)
+
+
+def _wait_lock(fd, timeout_s: float) -> bool:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        time.sleep(POLL_S)
+        if _try_lock(fd):
+            return True
+    return False
+
+
+def _result_path(key: str) -> str:
+    return os.path.join(flight_dir(), f"{key}.json")
+
+
+def _waiting_path(key: str) -> str:
+    return os.path.join(flight_dir(), f"{key}.waiting")
+
+
+def _touch(path: str):
+    try:
+        with open(path, 'a'):
+            pass
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _read_result(key: str, since: float):
+    """The leader's result if it finished after `since` (while we waited), else None."""
+    try:
+        with open(_result_path(key), 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if entry.get('finished', 0.0) < since:
+        return None
+    return entry.get('result')
+
+
+def _write_result(key: str, result):
+    path = _result_path(key)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'finished': time.time(), 'result': result}, f, separators=(',', ':'))
+        os.replace(tmp, path)
+    except (OSError, TypeError, ValueError):
+        _remove(tmp)
+
+
+def _maybe_prune():
+    global _last_prune
+    now = time.time()
+    if now - _last_prune < PRUNE_EVERY_S:
+        return
+    _last_prune = now
+    _prune(now - RESULT_TTL_S)
+
+
+def _prune(cutoff: float):
+    """Remove results, markers and lock files not used since `cutoff`."""
+    try:
+        with os.scandir(flight_dir()) as entries:
+            for entry in entries:
+                try:
+                    if entry.stat().st_mtime >= cutoff:
+                        continue
+                except OSError:
+                    continue
+                if entry.name.endswith(('.json', '.waiting', '.tmp')):
+                    _remove(entry.path)
+                elif entry.name.endswith('.lock'):
+                    _remove_idle_lock(entry.path)
+    except OSError:
+        pass
+
+
+def _remove_idle_lock(path: str):
+    """
+    Unlink a lock file only while holding it, so nobody is computing under it. A worker
+    that opened it just before locks an orphan, sees that (_is_lock_file) and reopens.
+    """
+    try:
+        fd = os.open(path, os.O_RDWR)
+    except OSError:
+        return
+    try:
+        if _try_lock(fd):
+            _remove(path)
+    finally:
+        os.close(fd)
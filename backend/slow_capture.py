@@ -0,0 +1,87 @@
+"""
+Slow-request capture.
+
+Requests slower than SLOW_REQUEST_MS (default 3000; 0 disables) are appended to
+a rotating JSONL file with everything needed to replay them offline: route,
+query, JSON payload, status, duration and the stage/counter breakdown from
+utils.timing. Replay with tools/replay_slow.py.
+
+    SLOW_CAPTURE_PATH       file to write (default <tmp>/astral-slow.jsonl)
+    SLOW_CAPTURE_MAX_BYTES  rotate after this size (default 10 MB)
+    SLOW_CAPTURE_BACKUPS    rotated files to keep (default 5)
+"""
+import json
+import logging
+import os
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+
+from flask import request
+
+from utils import timing
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def capture_path() -> str:
+    return os.environ.get('SLOW_CAPTURE_PATH') or os.path.join(tempfile.gettempdir(), 'astral-slow.jsonl')
+
+
+def _make_logger(path: str) -> logging.Logger:
+    logger = logging.getLogger('astral.slow_capture')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    if not logger.handlers:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        handler = RotatingFileHandler(
+            path,
+            maxBytes=int(_env_float('SLOW_CAPTURE_MAX_BYTES', 10 * 1024 * 1024)),
+            backupCount=int(_env_float('SLOW_CAPTURE_BACKUPS', 5)),
+            encoding='utf-8',
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+    return logger
+
+
+def build_entry(rec, status: int) -> dict:
+    """Capture record for the current request (also used by tests/tools)."""
+    return {
+        'ts': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'path': request.path,
+        'method': request.method,
+        'query': request.args.to_dict(flat=True),
+        'payload': request.get_json(silent=True),
+        'status': status,
+        'duration_ms': round(rec.elapsed() * 1000.0, 1),
+        'stages_ms': {k: round(v * 1000.0, 1) for k, v in rec.stages.items()},
+        'counters': dict(rec.counters),
+    }
+
+
+def register_slow_capture(app):
+    """Needs register_metrics (the timing record) to be registered first."""
+    threshold_ms = _env_float('SLOW_REQUEST_MS', 3000.0)
+    if threshold_ms <= 0:
+        return
+    logger = _make_logger(capture_path())
+
+    @app.after_request
+    def _capture_slow(resp):
+        rec = timing.current()
+        if rec is None or request.path == '/metrics':
+            return resp
+        if rec.elapsed() * 1000.0 >= threshold_ms:
+            try:
+                entry = build_entry(rec, resp.status_code)
+                entry['query'].pop('admin_token', None)
+                logger.info(json.dumps(entry, ensure_ascii=False))
+            except Exception as e:
+                print(f"[slow_capture] failed to record {request.path}: {e}", flush=True)
+        return resp
@@ -0,0 +1,1279 @@
+"""
+Columnar day pipeline for /calcYear.
+
+calc_year used to build its days in four near-duplicate loops (datetime path,
+JD/BCE path, the added-week extension of both, and the approximate fallback),
+each one calling the ephemeris, the sunset provider and the Enoch mapping day
+by day, and each with its own small differences. Here a year is a dict of
+columns filled stage by stage for all days at once:
+
+    anchor      Enoch year start (Tuesday sunset), year number, length (364/371)
+    boundaries  civil dates and sunset bounds (n + 1 shared sunsets), polar states
+    enoch       month / day / added-week columns
+    lunar       12h UT samples and samples at every boundary
+    enrichment  in priority order: phases, apsides/supermoons, cardinal points,
+                eclipses, Moon sign shares per day, alignments, pair aspects;
+                events are bucketed into days by bisection on the bounds
+
+A request can ask for a subset of the output with `fields` (or `include`):
+group names, presets or single day-field names, e.g. "grid" or
+"bounds,moon,phases". Stages whose outputs are not needed are skipped, and the
+response lists the groups that were computed.
+
+The core stages always run. `deadline_ms` (capped by CALC_DEADLINE_MS, default
+25 s) is a time budget for the whole year: an enrichment stage whose estimate
+(backend/cost.py, rescaled by how fast the core stages actually ran) no longer
+fits is skipped and reported, so a slow instance still returns a usable
+calendar instead of timing out.
+
+`precision` (fast / standard / precise, see utils.precision) sets the scan
+steps and refiner tolerances of the event and sign-cusp stages; the route puts
+it in a context variable next to the ephemeris tier and polar policy.
+
+`workers` (capped by YEAR_WORKERS, see year_shards) splits the sunset, Sun/Moon
+and sign-mix columns and the alignment/aspect scans across a process pool; the
+days come out the same as with the serial path. With workers the event
+scanners (phases, apsides, cardinal points, eclipses, alignments, aspects) are
+also started together at the beginning of enrichment instead of one after the
+other. Each one is collected with its own timeout (CALC_SCANNER_TIMEOUT_S,
+default 20 s, and never past the deadline): a scanner that times out is skipped
+and reported like a deadline skip, one that fails only loses its own events.
+
+The provider decides how a stage is computed: 'precise' (Swiss .se1 files),
+'moshier' (analytic Swiss) or 'approx' (vectorized approx_calendar / Meeus,
+no Swiss calls besides julday/revjul). Every provider goes through the same
+stages, so the added week, the civil dates and the boundary format no longer
+depend on which path a request happened to take.
+
+    params = parse_year_request(request.get_json())
+    year = run_year(params, record_reason)     # {'enoch_year', 'days', 'provider', 'ephe_tier', ...}
+"""
+import math
+import os
+import time
+import traceback
+from bisect import bisect_left
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from functools import lru_cache
+
+import pytz
+import swisseph as swe
+
+from utils import approx_calendar
+from utils import ephemeris
+from utils import meeus_lunar
+from utils import precision
+from utils import sunsets
+from utils import timing
+from utils.datetime_local import localize_datetime
+from utils.enoch import find_enoch_year_start
+from utils.jd_time_utils import parse_iso_to_jd
+from utils.ephemeris import ephe_flag
+from utils.lunar_calc import (
+    sun_moon_state, scan_phase_events_jd, scan_perigee_apogee_jd, lunar_sign_from_longitude,
+    scan_eclipses_global_jd,
+    scan_alignments_simple_jd, scan_pair_aspects_jd, jd_utc
+)
+try:
+    import cost
+    import day_columns
+    import year_shards
+except Exception:
+    from . import cost  # type: ignore
+    from . import day_columns  # type: ignore
+    from . import year_shards  # type: ignore
+
+PROVIDER_PRECISE = 'precise'
+PROVIDER_MOSHIER = 'moshier'
+PROVIDER_APPROX = 'approx'
+
+REFERENCE_GREG_YEAR = 2025
+REFERENCE_ENOCH_YEAR = 5996
+MONTHS = [30, 30, 31, 30, 30, 31, 30, 30, 31, 30, 30, 31]
+
+_TRUE = ('1', 'true', 'yes', 'on')
+
+# Part of the /calcYear ETag: bump when the same request would produce different days.
+# CALC_ENGINE_VERSION overrides it; on Render every deploy (RENDER_GIT_COMMIT) counts as a new version.
+ENGINE_VERSION = (os.environ.get('CALC_ENGINE_VERSION') or (os.environ.get('RENDER_GIT_COMMIT') or '')[:12]
+                  or 'year-pipeline-1')
+
+try:
+    DEADLINE_MAX_MS = float(os.environ.get('CALC_DEADLINE_MS', 25000.0))
+except (TypeError, ValueError):
+    DEADLINE_MAX_MS = 25000.0
+try:
+    # Per-scanner limit when the event scanners run concurrently in the worker pool
+    SCANNER_TIMEOUT_S = float(os.environ.get('CALC_SCANNER_TIMEOUT_S', 20.0))
+except (TypeError, ValueError):
+    SCANNER_TIMEOUT_S = 20.0
+
+
+class RequestError(ValueError):
+    """Invalid request parameter (reported to the client as HTTP 400)."""
+
+
+# Day fields per projectable group; the Enoch mapping (ALWAYS) is part of every day
+ALWAYS = ('gregorian', 'enoch_year', 'enoch_month', 'enoch_day', 'added_week', 'name', 'day_of_year')
+FIELD_GROUPS = {
+    'bounds': ('start_utc', 'end_utc', 'polar'),
+    'moon': ('moon_phase_angle_deg', 'moon_illum', 'moon_distance_km', 'moon_sign', 'moon_zodiac_mode'),
+    'sign_mix': ('moon_sign_primary', 'moon_sign_primary_pct', 'moon_long_start_deg', 'moon_long_end_deg',
+                 'moon_long_delta_deg', 'moon_sign_start', 'moon_sign_end', 'moon_phase_angle_start_deg',
+                 'moon_phase_angle_end_deg', 'moon_illum_start', 'moon_illum_end', 'moon_sign_secondary',
+                 'moon_sign_secondary_pct', 'moon_sign_crossed', 'moon_sign_cusp_utc', 'moon_sign_cusp_deg'),
+    'phases': ('moon_event', 'moon_event_utc', 'moon_icon'),
+    'apsides': ('perigee', 'perigee_utc', 'apogee', 'apogee_utc'),
+    'supermoon': ('supermoon', 'supermoon_utc'),
+    'cardinal': ('equinox', 'equinox_utc', 'solstice', 'solstice_utc'),
+    'eclipses': ('solar_eclipse', 'solar_eclipse_utc', 'solar_eclipse_kind',
+                 'lunar_eclipse', 'lunar_eclipse_utc', 'lunar_eclipse_kind'),
+    'alignments': ('alignment', 'alignment_utc', 'alignment_total', 'alignment_planets',
+                   'alignment_span_deg', 'alignment_score', 'alignments'),
+}
+ALL_GROUPS = tuple(FIELD_GROUPS)
+FIELD_PRESETS = {
+    'all': ALL_GROUPS,
+    'grid': ('bounds', 'moon', 'phases'),     # enoch-calendar month grid
+    'events': ('phases', 'apsides', 'supermoon', 'cardinal', 'eclipses', 'alignments'),
+}
+EVENT_GROUPS = FIELD_PRESETS['events']
+_FIELD_TO_GROUP = {f: g for g, fields in FIELD_GROUPS.items() for f in fields}
+
+
+def parse_fields(value) -> tuple:
+    """
+    Requested groups (in ALL_GROUPS order) from a comma-separated string or list of
+    group names, presets or day-field names. Empty → every group.
+    """
+    if value is None or value == '' or value == []:
+        return ALL_GROUPS
+    items = value.split(',') if isinstance(value, str) else list(value)
+    groups = set()
+    unknown = []
+    for item in items:
+        name = str(item).strip().lower()
+        if not name or name in ALWAYS or name == 'enoch':
+            continue
+        if name in FIELD_PRESETS:
+            groups.update(FIELD_PRESETS[name])
+        elif name in FIELD_GROUPS:
+            groups.add(name)
+        elif name in _FIELD_TO_GROUP:
+            groups.add(_FIELD_TO_GROUP[name])
+        else:
+            unknown.append(name)
+    if unknown:
+        raise RequestError(f"unknown field(s): {', '.join(unknown)} "
+                           f"(groups: {', '.join(ALL_GROUPS)}; presets: {', '.join(FIELD_PRESETS)})")
+    return tuple(g for g in ALL_GROUPS if g in groups)
+
+
+def parse_format(value) -> str:
+    """Response layout: 'rows' (one object per day, default) or 'columns' (see day_columns)."""
+    name = str(value or day_columns.FORMAT_ROWS).strip().lower()
+    if name not in day_columns.FORMATS:
+        raise RequestError(f"unknown format {value!r} (choose from {', '.join(day_columns.FORMATS)})")
+    return name
+
+
+def parse_precision(value):
+    """Canonical precision tier; None when not given (process default applies)."""
+    if value is None or str(value).strip() == '':
+        return None
+    tier = precision.normalize_precision(value)
+    if tier is None:
+        raise RequestError(f"unknown precision {value!r} (choose from {', '.join(precision.TIERS)})")
+    return tier
+
+
+def parse_ephemeris(value):
+    """Canonical ephemeris tier (swiss / moshier / auto); None when not given (process default applies)."""
+    if value is None or str(value).strip() == '':
+        return None
+    tier = ephemeris.normalize_tier(value)
+    if tier is None:
+        choices = (ephemeris.TIER_SWISS, ephemeris.TIER_MOSHIER, ephemeris.TIER_AUTO)
+        raise RequestError(f"unknown ephemeris {value!r} (choose from {', '.join(choices)})")
+    return tier
+
+
+def parse_polar_policy(value):
+    """Canonical polar sunset policy; None when not given (process default applies)."""
+    if value is None or str(value).strip() == '':
+        return None
+    policy = sunsets.normalize_policy(value)
+    if policy is None:
+        raise RequestError(f"unknown polar_policy {value!r} (choose from {', '.join(sunsets.POLICIES)})")
+    return policy
+
+
+# --- Request parameters ---
+
+def _first(data: dict, *keys):
+    for key in keys:
+        if data.get(key) is not None:
+            return data.get(key)
+    return None
+
+
+def _number(data: dict, cast, keys, default):
+    try:
+        value = _first(data, *keys)
+        return cast(value) if value is not None else default
+    except Exception:
+        return default
+
+
+def _flag(value, extra=()) -> bool:
+    return str(value or '').strip().lower() in _TRUE + tuple(extra)
+
+
+def parse_align(data: dict) -> dict:
+    """Alignment/aspect scan options (align_* keys and their aliases)."""
+    data = data or {}
+    align_planets = str(data.get('align_planets') or '').strip().lower()  # e.g., 'inner','classic5','seven','all'
+    include_moon = _flag(data.get('align_include_moon') or data.get('align_moon'), ('moon', 'seven', 'all'))
+    include_sun = _flag(data.get('align_include_sun') or data.get('align_sun'), ('sun', 'seven', 'all'))
+    if align_planets in ('seven', 'all'):
+        include_moon = True
+        include_sun = True
+    return {
+        'min_count': _number(data, int, ('align_min_count', 'align_count'), 4),
+        'span_deg': _number(data, float, ('align_span_deg', 'align_span'), 30.0),
+        'step_hours': _number(data, float, ('align_step_hours', 'align_step'), 24.0),
+        'planets': align_planets,
+        'include_outer': _flag(data.get('align_include_outer') or data.get('align_outer'), ('outer', 'all')),
+        'include_moon': include_moon,
+        'include_sun': include_sun,
+        'detect_aspects': _flag(data.get('align_detect_aspects') or data.get('align_aspects'),
+                                ('all', 'full', 'opp', 'oppositions')),
+        'include_oppositions': _flag(data.get('align_include_oppositions') or data.get('align_oppositions'),
+                                     ('opp', 'oppositions', 'all', 'full')),
+    }
+
+
+def _coordinate(data: dict, key: str, limit: float) -> float:
+    value = data.get(key)
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise RequestError(f"{key} is required and must be a number (got {value!r})")
+    if not math.isfinite(number) or abs(number) > limit:
+        raise RequestError(f"{key} must be between -{limit:g} and {limit:g} (got {value!r})")
+    return number
+
+
+def parse_year_request(data: dict) -> dict:
+    """
+    Normalize a /calcYear payload (aliases, defaults, flags) into one params dict.
+    latitude/longitude are required: a missing, non-numeric or out-of-range value
+    raises RequestError.
+    """
+    data = data or {}
+    return {
+        'datetime': data.get('datetime'),
+        'latitude': _coordinate(data, 'latitude', 90.0),
+        'longitude': _coordinate(data, 'longitude', 180.0),
+        'timezone': data.get('timezone', 'UTC'),
+        'zodiac_mode': (data.get('zodiac_mode') or 'tropical').lower(),
+        'polar_policy': parse_polar_policy(data.get('polar_policy')),
+        'precision': parse_precision(data.get('precision')),
+        # Return the cost estimate / admission decision without computing the year
+        'dry_run': _flag(data.get('dry_run') or data.get('estimate_only')),
+        # Time budget; enrichment stages that would not fit are skipped (capped by the server maximum)
+        'deadline_ms': _number(data, float, ('deadline_ms', 'deadline', 'timeout_ms'), None),
+        # Worker processes for the day columns and alignment scans (capped by YEAR_WORKERS)
+        'workers': _number(data, int, ('workers',), None),
+        'fields': parse_fields(data.get('fields') if data.get('fields') is not None else data.get('include')),
+        'ephemeris': parse_ephemeris(data.get('ephemeris') or data.get('ephe')),
+        # Force approximate mode (avoids any Swiss-dependent calls except julday/revjul)
+        'approx': _flag(data.get('approx') or data.get('mode'), ('approx',)),
+        'align': parse_align(data),
+        # Day layout of the response: rows (default) or columns
+        'format': parse_format(data.get('format')),
+    }
+
+
+# --- JD helpers (no datetime: BCE and extended years) ---
+
+def _jd_to_utc_parts(jd: float) -> tuple:
+    """(year, month, day, hour, minute, second) of a JD, rounded to the second like the ISO strings."""
+    y, mo, d, hour = swe.revjul(jd)
+    hh = int(hour)
+    mm_f = (hour - hh) * 60.0
+    mi = int(mm_f)
+    ss = int(round((mm_f - mi) * 60.0))
+    if ss == 60:
+        ss = 0; mi += 1
+    if mi == 60:
+        mi = 0; hh += 1
+    return int(y), int(mo), int(d), hh, mi, ss
+
+
+def _jd_to_iso_utc(jd: float) -> str:
+    """Format a JD as an ISO-like UTC string supporting extended years (BCE)."""
+    y, mo, d, hh, mi, ss = _jd_to_utc_parts(jd)
+    # Year can be negative; no datetime here. Pad positives to 4 digits.
+    y_str = (f"{y:04d}" if y >= 0 else f"{y}")
+    return f"{y_str}-{mo:02d}-{d:02d}T{hh:02d}:{mi:02d}:{ss:02d}Z"
+
+
+def _jd_to_epoch_s(jd: float) -> int:
+    """Unix seconds of the same instant _jd_to_iso_utc prints (format=columns)."""
+    y, mo, d, hh, mi, ss = _jd_to_utc_parts(jd)
+    return day_columns.days_from_civil(y, mo, d) * 86400 + hh * 3600 + mi * 60 + ss
+
+
+def _greg_from_jd0(jd0: float) -> str:
+    y, mo, d, _ = swe.revjul(jd0)
+    return f"{int(y):04d}-{int(mo):02d}-{int(d):02d}" if int(y) >= 0 else f"{int(y)}-{int(mo):02d}-{int(d):02d}"
+
+
+def request_jd(params: dict, record_reason):
+    """UT JD of the request datetime (local time + timezone, or extended ISO with offset)."""
+    date_str = params.get('datetime')
+    try:
+        dt_utc = localize_datetime(date_str, params.get('timezone') or 'UTC').astimezone(pytz.utc)
+        return swe.julday(
+            dt_utc.year, dt_utc.month, dt_utc.day,
+            dt_utc.hour + dt_utc.minute / 60 + dt_utc.second / 3600 + dt_utc.microsecond / 3600000000
+        )
+    except Exception:
+        pass
+    try:
+        return parse_iso_to_jd(date_str)
+    except Exception:
+        record_reason('jd_parse_failed', "Failed to parse datetime to JD", traceback.format_exc())
+        return None
+
+
+# --- Pure-python approximate fallbacks (no numpy, no Swiss ephemeris files) ---
+
+def _approx_start_jd_for_enoch_year(jd: float, latitude: float, longitude: float) -> float:
+    """Approximate start boundary (Tuesday sunset, UT JD) of the Enoch year containing jd (approx_calendar rule)."""
+    return float(approx_calendar.enoch_year_start_for_jd([jd], latitude, longitude)[0])
+
+
+# Approx lunar phase (no Swiss files)
+SYNODIC_DAYS = 29.530588853
+REF_NEW_MOON_JD = swe.julday(2000, 1, 6, 18 + 14/60)
+
+def _approx_lunar_for_jd(jd: float):
+    # True quarter instants (Meeus series) instead of a single mean lunation
+    try:
+        return meeus_lunar.phase_angle_jd(float(jd))
+    except Exception:
+        pass
+    days = jd - REF_NEW_MOON_JD
+    age = days % SYNODIC_DAYS
+    phase_frac = age / SYNODIC_DAYS  # 0=new, 0.5=full
+    illum = 0.5 * (1 - math.cos(2 * math.pi * phase_frac))
+    angle_deg = (phase_frac * 360.0) % 360.0  # 0=new, 90=first quarter, 180=full
+    return angle_deg, illum
+
+
+def build_enoch_table(start_jd: float, enoch_year: int, include_added_week: bool = True):
+    months = list(MONTHS)
+    if include_added_week:
+        months[-1] += 7
+    total_days = sum(months) if include_added_week else 364
+    table = []
+    m_idx = 0
+    day_in_month = 1
+    for i in range(total_days):
+        day_of_year = i + 1
+        added_week = include_added_week and day_of_year > 364
+        table.append(
+            {
+                "enoch_year": enoch_year,
+                "enoch_month": m_idx + 1,
+                "enoch_day": day_in_month,
+                "enoch_day_of_year": day_of_year,
+                "added_week": added_week,
+            }
+        )
+        day_in_month += 1
+        if m_idx < len(months) and day_in_month > months[m_idx]:
+            m_idx += 1
+            day_in_month = 1
+            if m_idx >= len(months):
+                break
+    return table
+
+
+# --- Providers ---
+
+def resolve_provider(params: dict, jd, record_reason):
+    """
+    (provider, ephemeris tier) for this request. Sets the ephemeris tier for every
+    Swiss call of the request; outside both Swiss ranges the year is approximated.
+    """
+    if params.get('approx'):
+        record_reason('approx_requested', "Approx mode requested by client")
+        return PROVIDER_APPROX, None
+    if jd is None:
+        return PROVIDER_APPROX, None
+    tier = ephemeris.resolve_tier(params.get('ephemeris'), jd - 400.0, jd + 400.0)
+    if tier is None:
+        record_reason('out_of_ephemeris_range', "Date outside Swiss/Moshier ephemeris range; using approximate mode")
+        return PROVIDER_APPROX, None
+    ephemeris.set_tier(tier)
+    return (PROVIDER_MOSHIER if tier == ephemeris.TIER_MOSHIER else PROVIDER_PRECISE), tier
+
+
+def _year_start_precise(jd: float, lat: float, lon: float) -> float:
+    start = find_enoch_year_start(jd, lon, lat)
+    if not start or abs(start - jd) > 400.0:
+        raise ValueError(f"implausible Enoch year start {start} for JD {jd}")
+    return float(start)
+
+
+def _year_start_approx(jd: float, lat: float, lon: float) -> float:
+    return _approx_start_jd_for_enoch_year(jd, lat, lon)
+
+
+@lru_cache(maxsize=4096)
+def _year_length(start: float, lat: float, lon: float, provider: str, flags: int) -> int:
+    """371 when the next Enoch year starts a week late, else 364 (one probe ~April next year)."""
+    probe = start + 380.0
+    finder = _year_start_approx if provider == PROVIDER_APPROX else _year_start_precise
+    next_start = finder(probe, lat, lon)
+    return 371 if round(next_start - start) > 364 else 364
+
+
+def stage_anchor(year: dict, record_reason):
+    jd = year['jd']
+    lat, lon, provider = year['latitude'], year['longitude'], year['provider']
+    start = None
+    if provider != PROVIDER_APPROX:
+        try:
+            with timing.stage('enoch_base'):
+                start = _year_start_precise(jd, lat, lon)
+                n_days = _year_length(round(start, 6), lat, lon, provider, ephe_flag())
+        except Exception:
+            record_reason('enoch_base_failed', "Enoch year start failed; switching to approximate start",
+                          traceback.format_exc())
+            start = None
+    if start is None:
+        start = _year_start_approx(jd, lat, lon)
+        n_days = _year_length(round(start, 6), lat, lon, PROVIDER_APPROX, 0)
+    year['start_jd'] = start
+    year['n_days'] = n_days
+    year['enoch_year'] = REFERENCE_ENOCH_YEAR + (int(swe.revjul(start)[0]) - REFERENCE_GREG_YEAR)
+    # Day 1 is the local (LMT) civil date after the Tuesday-sunset boundary
+    year['first_jd0'] = math.floor(start + lon / 360.0 + 0.5) - 0.5 + 1.0
+
+
+@lru_cache(maxsize=512)
+def _boundary_column(first_jd0: float, n: int, lat: float, lon: float, provider: str, flags: int, policy: str,
+                     workers: int = 1):
+    """(sunset JDs for the n + 1 civil dates from first_jd0 - 1, polar state per date)."""
+    jd0s = [first_jd0 - 1.0 + k for k in range(n + 1)]
+    if provider == PROVIDER_APPROX:
+        hours, polar = approx_calendar.sunset_ut_hours(jd0s, lat, lon, policy)
+        states = {1: sunsets.MIDNIGHT_SUN, -1: sunsets.POLAR_NIGHT}
+        return (tuple(j + h / 24.0 for j, h in zip(jd0s, hours.tolist())),
+                tuple(states.get(p, sunsets.NORMAL) for p in polar.tolist()))
+    if workers > 1:
+        out = year_shards.map_shards(year_shards.sunset_shard, jd0s, workers, lat=lat, lon=lon, policy=policy)
+    else:
+        out = [sunsets.sunset_jd(j, lat, lon, policy) for j in jd0s]
+    return tuple(o[0] for o in out), tuple(o[1] for o in out)
+
+
+def _wants(year: dict, *groups) -> bool:
+    return any(g in year['fields'] for g in groups)
+
+
+def _computed(year: dict, *groups):
+    year['computed'].update(g for g in groups if g in year['fields'])
+
+
+def stage_boundaries(year: dict, record_reason):
+    n = year['n_days']
+    first = year['first_jd0']
+    lat, lon = year['latitude'], year['longitude']
+    year['jd0'] = [first + i for i in range(n)]
+    # events are bucketed by the bounds, so they need them even when not returned
+    if not _wants(year, 'bounds', 'sign_mix', *EVENT_GROUPS):
+        year['bounds'] = None
+        year['polar'] = [None] * n
+        return
+    with timing.stage('sunsets'):
+        try:
+            sets, states = _boundary_column(first, n, lat, lon, year['provider'], ephe_flag(), sunsets.current_policy(),
+                                            year['workers'])
+        except Exception:
+            record_reason('sunset_failed', "Sunset provider failed; using approximate sunsets", traceback.format_exc())
+            sets = tuple(approx_calendar.sunset_jd([first - 1.0 + k for k in range(n + 1)], lat, lon).tolist())
+            states = (sunsets.NORMAL,) * (n + 1)
+    year['bounds'] = list(sets)            # day i runs bounds[i] → bounds[i + 1]
+    year['polar'] = list(states[1:])       # state of the sunset that ends the day
+    _computed(year, 'bounds')
+
+
+def stage_enoch(year: dict, record_reason):
+    table = build_enoch_table(year['start_jd'], year['enoch_year'], include_added_week=year['n_days'] > 364)
+    year['enoch_month'] = [t['enoch_month'] for t in table]
+    year['enoch_day'] = [t['enoch_day'] for t in table]
+    year['added_week'] = [t['added_week'] for t in table]
+
+
+def _approx_phase_column(jds):
+    phase, illum = approx_calendar.lunar_phase(jds)
+    return phase.tolist(), illum.tolist()
+
+
+def stage_lunar(year: dict, record_reason):
+    mids = [j + 0.5 for j in year['jd0']]
+    n = len(mids)
+    year['bound_state'] = [None] * (n + 1)
+    if not _wants(year, 'moon'):
+        mids = []
+    elif year['provider'] == PROVIDER_APPROX:
+        phase, illum = _approx_phase_column(mids)
+        year.update(moon_lon=[None] * n, moon_phase=phase, moon_illum=illum, moon_dist=[None] * n)
+        _computed(year, 'moon')
+        return
+    lon_moon, phase, illum, dist = [], [], [], []
+    want_bounds = _wants(year, 'sign_mix') and year['provider'] != PROVIDER_APPROX
+    with timing.stage('moon_state'):
+        sampled = None
+        if year['workers'] > 1:
+            # mids and boundaries in one sharded pass; None where a worker's sample failed
+            sampled = year_shards.map_shards(year_shards.sun_moon_shard,
+                                             mids + (year['bounds'] if want_bounds else []), year['workers'])
+        for i, jd_mid in enumerate(mids):
+            try:
+                state = sampled[i] if sampled is not None else sun_moon_state(jd_mid)
+                if state is None:
+                    raise ValueError(f"sun_moon_state failed in a worker at JD {jd_mid}")
+                _ls, lm, ph, il, dk = state
+            except Exception:
+                lm, dk = None, None
+                ph, il = _approx_lunar_for_jd(jd_mid)
+                record_reason('moon_state_failed', f"sun_moon_state failed at day {i + 1}; using approximate lunar data",
+                              traceback.format_exc())
+            lon_moon.append(lm); phase.append(ph); illum.append(il); dist.append(dk)
+        # Boundary samples feed the sign mix; adjacent days share them
+        if want_bounds and sampled is not None:
+            year['bound_state'] = sampled[len(mids):]
+        elif want_bounds:
+            bound_state = []
+            for b in year['bounds']:
+                try:
+                    bound_state.append(sun_moon_state(b))
+                except Exception:
+                    bound_state.append(None)
+            year['bound_state'] = bound_state
+    year.update(moon_lon=lon_moon, moon_phase=phase, moon_illum=illum, moon_dist=dist)
+    if mids:
+        _computed(year, 'moon')
+
+
+def stage_sign_mix(year: dict, record_reason):
+    """Sign shares per day; writes into the sparse 'extra' column (approx provider: nothing)."""
+    if year['provider'] == PROVIDER_APPROX or not _wants(year, 'sign_mix'):
+        return
+    _computed(year, 'sign_mix')
+    zodiac_mode = year['zodiac_mode']
+    bounds = year['bounds']
+    states = year['bound_state']
+    with timing.stage('lunar_sign_mix'):
+        days = [i for i in range(len(year['extra'])) if states[i] is not None and states[i + 1] is not None]
+        # Preciso: detecta cruce(s) reales y reparte por tiempo en cada signo (por lotes de días con workers)
+        spans = [(bounds[i], bounds[i + 1], states[i][1], states[i + 1][1]) for i in days]
+        mixes = year_shards.map_shards(year_shards.sign_mix_shard, spans, year['workers'], zodiac_mode=zodiac_mode)
+        for i, mix in zip(days, mixes):
+            extra = year['extra'][i]
+            s_state, e_state = states[i], states[i + 1]
+            if not mix:
+                continue
+            primary = mix.get('primary_sign')
+            if primary:
+                extra['moon_sign_primary'] = primary
+                extra['moon_sign'] = primary
+            if mix.get('primary_pct') is not None:
+                extra['moon_sign_primary_pct'] = mix.get('primary_pct')
+            lon_start, lon_end = s_state[1], e_state[1]
+            # Normalizar a 0..360 para salida estable
+            extra['moon_long_start_deg'] = round((lon_start % 360.0 + 360.0) % 360.0, 3)
+            extra['moon_long_end_deg'] = round((lon_end % 360.0 + 360.0) % 360.0, 3)
+            # Delta hacia adelante (desenrollado)
+            lon_end_unwrapped = lon_end
+            while lon_end_unwrapped < lon_start - 1e-9:
+                lon_end_unwrapped += 360.0
+            extra['moon_long_delta_deg'] = round(max(0.0, lon_end_unwrapped - lon_start), 3)
+            try:
+                extra['moon_sign_start'] = lunar_sign_from_longitude(lon_start, zodiac_mode)
+                extra['moon_sign_end'] = lunar_sign_from_longitude(lon_end, zodiac_mode)
+            except Exception:
+                record_reason('moon_sign_bounds_failed', "Failed to derive moon sign start/end for day", traceback.format_exc())
+            # Fase e iluminación al inicio/fin del día enojeano
+            extra['moon_phase_angle_start_deg'] = round(s_state[2], 3)
+            extra['moon_phase_angle_end_deg'] = round(e_state[2], 3)
+            extra['moon_illum_start'] = round(s_state[3], 6)
+            extra['moon_illum_end'] = round(e_state[3], 6)
+            # Política: 100% sólo si no hubo cruce de signo; si hubo, reportar mezcla exacta.
+            segs = mix.get('segments') or []
+            crosses = sum(1 for s in segs if (s.get('share') or 0) > 0) > 1
+            if crosses and mix.get('secondary_sign') is not None:
+                extra['moon_sign_secondary'] = mix.get('secondary_sign')
+                extra['moon_sign_secondary_pct'] = mix.get('secondary_pct')
+                extra['moon_sign_crossed'] = True
+                cusps = mix.get('cusps') or []
+                if cusps:
+                    extra['moon_sign_cusp_utc'] = _jd_to_iso_utc(cusps[0][1])
+                    extra['moon_sign_cusp_deg'] = cusps[0][0]
+            else:
+                # Día puro
+                extra['moon_sign_primary_pct'] = 1.0
+                extra['moon_sign_crossed'] = False
+
+
+# --- Events ---
+
+def _bucketer(bounds: list):
+    """Day index whose [start, end] contains a JD, by bisection on the contiguous bounds."""
+    ends = bounds[1:]
+
+    def bucket_index_jd(t_jd):
+        if t_jd is None:
+            return None
+        idx = bisect_left(ends, t_jd)
+        if idx >= len(ends) or t_jd < bounds[idx]:
+            return None
+        return idx
+    return bucket_index_jd
+
+
+_PHASE_ICONS = {'new': 'new', 'full': 'full', 'first_quarter': '1q', 'last_quarter': '3q'}
+
+
+def _event_lunar(year, bucket, record_reason):
+    extra = year['extra']
+    span_start_jd, span_end_jd = year['bounds'][0], year['bounds'][-1]
+    # supermoons need both scans
+    want_phases = _wants(year, 'phases', 'supermoon')
+    want_apsides = _wants(year, 'apsides', 'supermoon')
+    phase_events = []
+    dist_events = []
+    try:
+        if year['provider'] == PROVIDER_APPROX:
+            with timing.stage('phase_scan'):
+                if want_phases:
+                    phase_events = meeus_lunar.phase_events_jd(span_start_jd, span_end_jd)
+                if want_apsides:
+                    dist_events = meeus_lunar.perigee_apogee_events_jd(span_start_jd, span_end_jd)
+        else:
+            if want_phases:
+                with timing.stage('phase_scan'):
+                    phase_events = _scan(year, 'phase_scan', record_reason) or []
+            if want_apsides:
+                with timing.stage('perigee_scan'):
+                    dist_events = _scan(year, 'perigee_scan', record_reason) or []
+    except Exception:
+        record_reason('lunar_scan_failed', "Phase/perigee scan failed; using Meeus series for lunar events", traceback.format_exc())
+        try:
+            phase_events = meeus_lunar.phase_events_jd(span_start_jd, span_end_jd) if want_phases else []
+            dist_events = meeus_lunar.perigee_apogee_events_jd(span_start_jd, span_end_jd) if want_apsides else []
+        except Exception:
+            phase_events = []
+            dist_events = []
+    _computed(year, 'phases', 'apsides', 'supermoon')
+
+    for ev in (phase_events if _wants(year, 'phases') else []):
+        bi = bucket(ev.get('jd'))
+        if bi is None:
+            continue
+        d = extra[bi]
+        d['moon_event'] = ev.get('type')
+        d['moon_event_utc'] = ev.get('iso') or _jd_to_iso_utc(ev.get('jd'))
+        icon = _PHASE_ICONS.get(ev.get('type'))
+        if icon:
+            d['moon_icon'] = icon
+
+    for ev in (dist_events if _wants(year, 'apsides') else []):
+        bi = bucket(ev.get('jd'))
+        if bi is None:
+            continue
+        d = extra[bi]
+        if ev.get('type') == 'perigee':
+            d['perigee'] = True
+            d['perigee_utc'] = ev.get('iso') or _jd_to_iso_utc(ev.get('jd'))
+        if ev.get('type') == 'apogee':
+            d['apogee'] = True
+            d['apogee_utc'] = ev.get('iso') or _jd_to_iso_utc(ev.get('jd'))
+
+    if not _wants(year, 'supermoon'):
+        return
+    try:
+        full_times = [ev['jd'] for ev in phase_events if ev.get('type') == 'full' and ev.get('jd') is not None]
+        perigee_times = [ev['jd'] for ev in dist_events if ev.get('type') == 'perigee' and ev.get('jd') is not None]
+        for ft in full_times:
+            if not perigee_times:
+                continue
+            nearest = min(perigee_times, key=lambda t: abs(t - ft))
+            if abs(nearest - ft) <= 1.0:
+                bi = bucket(ft)
+                if bi is not None:
+                    extra[bi]['supermoon'] = True
+                    extra[bi]['supermoon_utc'] = _jd_to_iso_utc(ft)
+    except Exception:
+        record_reason('supermoon_failed', "Failed while marking supermoon events", traceback.format_exc())
+
+
+def _event_cardinal_points(year, bucket, record_reason):
+    extra = year['extra']
+    try:
+        with timing.stage('cardinal_points'):
+            sol = _scan(year, 'cardinal_points', record_reason) or []
+        for ev in sol:
+            ev_jd = ev.get('jd')
+            if ev_jd is None:
+                try:
+                    ev_jd = jd_utc(ev.get('time'))
+                except Exception:
+                    ev_jd = None
+            bi = bucket(ev_jd)
+            if bi is None:
+                continue
+            d = extra[bi]
+            if ev.get('type') == 'equinox':
+                d['equinox'] = ev.get('season') or 'equinox'
+                d['equinox_utc'] = _jd_to_iso_utc(ev_jd)
+            elif ev.get('type') == 'solstice':
+                d['solstice'] = ev.get('season') or 'solstice'
+                d['solstice_utc'] = _jd_to_iso_utc(ev_jd)
+    except Exception:
+        record_reason('cardinal_points_failed', "Failed while mapping equinox/solstice events", traceback.format_exc())
+
+
+def _event_eclipses(year, bucket, record_reason):
+    extra = year['extra']
+    try:
+        with timing.stage('eclipses'):
+            ec = _scan(year, 'eclipses', record_reason) or []
+        for ev in ec:
+            bi = bucket(ev.get('jd'))
+            if bi is None:
+                continue
+            d = extra[bi]
+            kind = ev.get('type')
+            if kind in ('solar', 'lunar'):
+                d[f'{kind}_eclipse'] = True
+                if ev.get('iso'):
+                    d[f'{kind}_eclipse_utc'] = ev['iso']
+                if ev.get('subtype'):
+                    d[f'{kind}_eclipse_kind'] = ev.get('subtype')
+    except Exception:
+        record_reason('eclipses_failed', "Failed during eclipse mapping", traceback.format_exc())
+
+
+def _planet_names(record_reason) -> dict:
+    name_map = {
+        swe.MERCURY: 'Mercury',
+        swe.VENUS: 'Venus',
+        swe.MARS: 'Mars',
+        swe.JUPITER: 'Jupiter',
+        swe.SATURN: 'Saturn',
+    }
+    try:
+        name_map[swe.URANUS] = 'Uranus'
+        name_map[swe.NEPTUNE] = 'Neptune'
+        name_map[swe.PLUTO] = 'Pluto'
+    except Exception:
+        record_reason('alignment_names_failed', "Failed to map outer planet names for alignments", traceback.format_exc())
+    try:
+        name_map[swe.SUN] = 'Sun'
+        name_map[swe.MOON] = 'Moon'
+    except Exception:
+        record_reason('alignment_names_failed', "Failed to map luminary names for alignments", traceback.format_exc())
+    return name_map
+
+
+def _alignment_score(ev: dict, cnt: int, span: float, total: int, span_limit: float):
+    try:
+        denom = float(max(1, min(7, int(total or 0))))
+        frac = max(0.0, min(1.0, cnt / denom))
+        comp = max(0.0, min(1.0, 1.0 - span / float(max(1.0, span_limit))))
+        pids = ev.get('pids') or []
+        lum_bonus = (0.06 if swe.SUN in pids else 0.0) + (0.04 if swe.MOON in pids else 0.0)
+        count_bonus = max(0.0, min(0.08, 0.02 * max(0, cnt - 2)))
+        score = 0.5 * frac + 0.5 * comp + lum_bonus + count_bonus
+        return max(0.0, min(1.0, round(score, 3)))
+    except Exception:
+        return None
+
+
+def _event_alignments(year, bucket, record_reason):
+    extra = year['extra']
+    align = year['align']
+    try:
+        with timing.stage('alignments'):
+            al = _scan(year, 'alignments', record_reason)
+        if al is None:
+            return
+        name_map = _planet_names(record_reason)
+
+        def label(pids):
+            try:
+                return ','.join([name_map.get(pid, str(pid)) for pid in pids]) if pids else None
+            except Exception:
+                return None
+
+        per_day = {}
+        for ev in al:
+            bi = bucket(ev.get('jd'))
+            if bi is None:
+                continue
+            recs = per_day.setdefault(bi, {})
+            key = tuple(sorted(ev.get('pids') or [])) or (('t', ev.get('jd')),)
+            prev = recs.get(key)
+            cnt = int(ev.get('count') or 0)
+            span = float(ev.get('span') or 1e9)
+            total = int(ev.get('total') or 0) or max(len(key), 1)
+            better = (prev is None)
+            if prev is not None:
+                if cnt > prev['count']:
+                    better = True
+                elif cnt == prev['count'] and span < prev['span']:
+                    better = True
+                elif cnt == prev['count'] and abs(span - prev['span']) < 1e-9 and (ev.get('jd') or 0) < (prev.get('jd') or 0):
+                    better = True
+            if better:
+                recs[key] = {
+                    'jd': ev.get('jd'),
+                    'count': cnt,
+                    'total': total,
+                    'planets': label(ev.get('pids')),
+                    'span': span,
+                    'score': _alignment_score(ev, cnt, span, total, align['span_deg']),
+                }
+        try:
+            if align['detect_aspects'] and _fits(year, 'aspects', (), record_reason):
+                with timing.stage('aspects'):
+                    asp = _scan(year, 'aspects', record_reason) or []
+                for ev in asp:
+                    bi = bucket(ev.get('jd'))
+                    if bi is None:
+                        continue
+                    recs = per_day.setdefault(bi, {})
+                    key = tuple(sorted(ev.get('pids') or []))
+                    prev = recs.get(key)
+                    cnt = 2
+                    span = float(ev.get('span') or 1e9)
+                    offset = ev.get('offset')
+                    if (prev is None) or (cnt > prev['count']) or (cnt == prev['count'] and span < prev['span']):
+                        recs[key] = {
+                            'jd': ev.get('jd'),
+                            'count': cnt,
+                            'total': int(ev.get('total') or 0) or 2,
+                            'planets': label(ev.get('pids')),
+                            'span': span,
+                            'score': prev['score'] if (prev and 'score' in prev) else None,
+                            'offset': float(offset) if (offset is not None) else None,
+                        }
+        except Exception:
+            record_reason('aspects_failed', "Failed while scanning pair aspects", traceback.format_exc())
+
+        for bi, recs in per_day.items():
+            d = extra[bi]
+            best = None
+            for r in recs.values():
+                if best is None or r['count'] > best['count'] or (r['count'] == best['count'] and r['span'] < best['span']):
+                    best = r
+            if best:
+                try:
+                    d['alignment'] = max(int(d.get('alignment') or 0), int(best['count']))
+                    if best.get('jd') is not None:
+                        d['alignment_utc'] = _jd_to_iso_utc(best['jd'])
+                    d['alignment_total'] = int(best['total'])
+                    if best.get('planets'):
+                        d['alignment_planets'] = best['planets']
+                    d['alignment_span_deg'] = float(best['span'])
+                    if best.get('score') is not None:
+                        d['alignment_score'] = best['score']
+                except Exception:
+                    record_reason('alignment_summary_failed', "Failed while summarizing alignments", traceback.format_exc())
+            try:
+                items = []
+                for r in sorted(recs.values(), key=lambda x: (-(x['count']), x['span'], x.get('jd') or 0)):
+                    item = {
+                        'utc': _jd_to_iso_utc(r['jd']) if r.get('jd') is not None else None,
+                        'count': r['count'],
+                        'total': r['total'],
+                        'span_deg': r['span'],
+                    }
+                    if r.get('planets'):
+                        item['planets'] = r['planets']
+                    if r.get('score') is not None:
+                        item['score'] = r['score']
+                    if r.get('offset') is not None:
+                        item['offset_deg'] = r['offset']
+                    items.append(item)
+                if items:
+                    d['alignments'] = items
+            except Exception:
+                record_reason('alignment_list_failed', "Failed while listing alignments", traceback.format_exc())
+    except Exception:
+        record_reason('alignments_failed', "Failed during alignment scan", traceback.format_exc())
+    if not any((d.get('alignments') or d.get('alignment')) for d in extra):
+        record_reason('no_alignments', "No alignments detected for given thresholds", informational=True)
+
+
+# --- Event scanners: in order here, or concurrently in the worker pool ---
+
+def _scanners(year: dict) -> dict:
+    """name → (groups, scanner, args, kwargs, shard function for time-split scans) of the Swiss scanners."""
+    specs = year.get('scanner_specs')
+    if specs is not None:
+        return specs
+    start, end = year['bounds'][0], year['bounds'][-1]
+    align = year['align']
+    step_hours = max(1.0, min(24.0, align['step_hours']))
+    bodies = dict(planet_mode=align['planets'], include_outer=align['include_outer'],
+                  include_moon=align['include_moon'], include_sun=align['include_sun'])
+    years = sorted(set([int(swe.revjul(start)[0]), int(swe.revjul(end)[0])]))
+    specs = year['scanner_specs'] = {
+        'phase_scan': (('phases', 'supermoon'), scan_phase_events_jd, (start, end), {}, None),
+        'perigee_scan': (('apsides', 'supermoon'), scan_perigee_apogee_jd, (start, end), {}, None),
+        'cardinal_points': (('cardinal',), year_shards.cardinal_points_shard, (years,), {}, None),
+        'eclipses': (('eclipses',), scan_eclipses_global_jd, (start, end), {}, None),
+        'alignments': (('alignments',), scan_alignments_simple_jd, (start, end),
+                       dict(bodies, step_hours=step_hours, max_span_deg=max(1.0, min(60.0, align['span_deg'])),
+                            min_count=max(0, min(10, align['min_count']))),
+                       year_shards.alignment_shard),
+        'aspects': ((), scan_pair_aspects_jd, (start, end),
+                    dict(bodies, step_hours=step_hours, include_oppositions=align['include_oppositions']),
+                    year_shards.aspect_shard),
+    }
+    return specs
+
+
+def _wanted_scanners(year: dict) -> list:
+    """Swiss scanners this year needs, in enrichment priority order."""
+    names = []
+    if _wants(year, 'phases', 'supermoon'):
+        names.append('phase_scan')
+    if _wants(year, 'apsides', 'supermoon'):
+        names.append('perigee_scan')
+    if _wants(year, 'cardinal'):
+        names.append('cardinal_points')
+    if _wants(year, 'eclipses'):
+        names.append('eclipses')
+    if _wants(year, 'alignments'):
+        names.append('alignments')
+        if year['align']['detect_aspects']:
+            names.append('aspects')
+    return names
+
+
+def _submit_scanners(year: dict, record_reason):
+    """
+    Start every wanted scanner that fits the deadline in the worker pool at once; the
+    event stages then collect them (_scan) with a per-scanner timeout.
+    """
+    scans = year['scans'] = {}
+    try:
+        for name in _wanted_scanners(year):
+            groups, fn, args, kwargs, shard_fn = _scanners(year)[name]
+            if not _fits(year, name, groups, record_reason):
+                continue
+            if shard_fn is not None:
+                options = {k: v for k, v in kwargs.items() if k != 'step_hours'}
+                scans[name] = year_shards.submit_shards(
+                    shard_fn, year_shards.grid_samples(*args, kwargs['step_hours']), year['workers'],
+                    step_hours=kwargs['step_hours'], **options)
+            else:
+                scans[name] = year_shards.submit_call(fn, *args, **kwargs)
+    except Exception:
+        # pool unavailable: whatever was not submitted runs in order in this process
+        record_reason('scanner_pool_failed', "Could not start the event scanners in the worker pool; running them here",
+                      traceback.format_exc(), informational=True)
+
+
+def _scan(year: dict, name: str, record_reason):
+    """
+    Events of scanner `name`: its concurrent result when it was submitted, else computed
+    here (sharded in time when it can be). None when the concurrent scan timed out: the
+    stage is then skipped and reported like a deadline skip. Scanner errors propagate.
+    """
+    groups, fn, args, kwargs, shard_fn = _scanners(year)[name]
+    pending = year.get('scans', {}).pop(name, None)
+    if pending is None:
+        if shard_fn is not None and year['workers'] > 1:
+            options = {k: v for k, v in kwargs.items() if k != 'step_hours'}
+            return year_shards.scan_grid(shard_fn, *args, kwargs['step_hours'], year['workers'], **options)
+        return fn(*args, **kwargs)
+    timeout = SCANNER_TIMEOUT_S
+    if year.get('deadline') is not None:
+        timeout = min(timeout, max(0.0, year['deadline'] - time.perf_counter()))
+    try:
+        return pending.result(timeout)
+    except FutureTimeoutError:
+        pending.cancel()
+        year['fields'] = tuple(g for g in year['fields'] if g not in groups)
+        year['skipped'].append(name)
+        record_reason(f'timeout_{name}', f"Skipped {name}: no result within {timeout * 1000:.0f} ms", informational=True)
+        return None
+
+
+def _calibrate_speed(year: dict):
+    """Actual/estimated time of the core stages, applied to the enrichment estimates."""
+    est = year['estimate']
+    core_ms = cost.BASE_MS + sum(est.get(k, {}).get('cpu_ms', 0.0) for k in ('sunsets', 'moon_state'))
+    spent_ms = (time.perf_counter() - year['started']) * 1000.0
+    year['speed'] = max(0.5, min(5.0, spent_ms / core_ms)) if core_ms > 0 else 1.0
+
+
+def _fits(year: dict, name: str, groups, record_reason) -> bool:
+    """
+    True when enrichment stage `name` is expected to finish before the deadline.
+    Otherwise drops its groups from the requested fields and reports the skip.
+    """
+    if name in year['skipped']:
+        return False
+    deadline = year.get('deadline')
+    if deadline is None or name in year.get('scans', ()):
+        return True
+    est_ms = year['estimate'].get(name, {}).get('cpu_ms', 0.0) * year.get('speed', 1.0)
+    left_ms = (deadline - time.perf_counter()) * 1000.0
+    if est_ms <= left_ms:
+        return True
+    year['fields'] = tuple(g for g in year['fields'] if g not in groups)
+    year['skipped'].append(name)
+    record_reason(f'deadline_{name}', f"Skipped {name} (~{est_ms:.0f} ms, {max(0.0, left_ms):.0f} ms left) "
+                  f"to meet the {year['deadline_ms']:.0f} ms deadline", informational=True)
+    return False
+
+
+def stage_enrichment(year: dict, record_reason):
+    """Optional stages in priority order, each one only while the deadline allows it."""
+    if year.get('deadline') is not None:
+        _calibrate_speed(year)
+    bucket = None
+    if _wants(year, *EVENT_GROUPS):
+        bounds = year['bounds']
+        if not bounds or not all(math.isfinite(b) for b in (bounds[0], bounds[-1])):
+            record_reason('span_parse_empty', "No valid day bounds; skipping event mapping")
+        else:
+            bucket = _bucketer(bounds)
+    # approx stays free of Swiss calls: Meeus phases only, no sign mix
+    swiss = year['provider'] != PROVIDER_APPROX
+    if bucket and swiss and year['workers'] > 1:
+        _submit_scanners(year, record_reason)
+    if bucket and _wants(year, 'phases', 'apsides', 'supermoon'):
+        _fits(year, 'phase_scan', ('phases', 'supermoon'), record_reason)
+        _fits(year, 'perigee_scan', ('apsides', 'supermoon'), record_reason)
+        if _wants(year, 'phases', 'apsides', 'supermoon'):
+            _event_lunar(year, bucket, record_reason)
+    if bucket and swiss and _wants(year, 'cardinal') and _fits(year, 'cardinal_points', ('cardinal',), record_reason):
+        _event_cardinal_points(year, bucket, record_reason)
+        _computed(year, 'cardinal')
+    if bucket and swiss and _wants(year, 'eclipses') and _fits(year, 'eclipses', ('eclipses',), record_reason):
+        _event_eclipses(year, bucket, record_reason)
+        _computed(year, 'eclipses')
+    if swiss and _wants(year, 'sign_mix') and _fits(year, 'lunar_sign_mix', ('sign_mix',), record_reason):
+        stage_sign_mix(year, record_reason)
+    if bucket and swiss and _wants(year, 'alignments') and _fits(year, 'alignments', ('alignments',), record_reason):
+        _event_alignments(year, bucket, record_reason)
+        _computed(year, 'alignments')
+    # scans whose stage did not run (it failed before collecting them): drop what has not started
+    for pending in year['scans'].values():
+        pending.cancel()
+    year['scans'] = {}
+
+
+# --- Assembly ---
+
+def materialize(year: dict, record_reason) -> list:
+    """Column dict → calc_year day records (same keys and order as before), projected."""
+    zodiac_mode = year['zodiac_mode']
+    with_bounds = 'bounds' in year['computed']
+    with_moon = 'moon' in year['computed']
+    bounds_iso = [_jd_to_iso_utc(b) for b in year['bounds']] if with_bounds else None
+    days = []
+    for i, jd0 in enumerate(year['jd0']):
+        day = {
+            'gregorian': _greg_from_jd0(jd0),
+            'enoch_year': year['enoch_year'],
+            'enoch_month': year['enoch_month'][i],
+            'enoch_day': year['enoch_day'][i],
+            'added_week': year['added_week'][i],
+            'name': None,
+            'day_of_year': i + 1,
+        }
+        if with_bounds:
+            day['start_utc'] = bounds_iso[i]
+            day['end_utc'] = bounds_iso[i + 1]
+        if with_moon:
+            lon_moon = year['moon_lon'][i]
+            try:
+                moon_sign = lunar_sign_from_longitude(lon_moon, zodiac_mode) if lon_moon is not None else ''
+            except Exception:
+                moon_sign = ''
+            phase, illum, dist = year['moon_phase'][i], year['moon_illum'][i], year['moon_dist'][i]
+            day['moon_phase_angle_deg'] = round(phase, 3) if phase is not None else None
+            day['moon_illum'] = round(illum, 6) if illum is not None else None
+            day['moon_distance_km'] = round(dist, 1) if dist is not None else None
+            day['moon_sign'] = moon_sign
+            day['moon_zodiac_mode'] = zodiac_mode
+        state = year['polar'][i]
+        if with_bounds and state and state != sunsets.NORMAL:
+            # No real sunset at this latitude: bounds come from the polar policy
+            day['polar'] = state
+            _polar_reason(year, record_reason)
+        day.update(year['extra'][i])
+        days.append(day)
+    return days
+
+
+def _polar_reason(year: dict, record_reason):
+    year['polar_days'] = True
+    record_reason('polar_sunset', f"No sunset on some days (midnight sun/polar night); "
+                  f"day bounds use the {sunsets.current_policy()} policy", informational=True)
+
+
+def _rounded(values, digits: int) -> list:
+    return [round(v, digits) if v is not None else None for v in values]
+
+
+def materialize_columns(year: dict, record_reason) -> dict:
+    """
+    Column dict → the format=columns encoding (day_columns) of the days materialize
+    would build, straight from the arrays: no day dicts for the core fields.
+    """
+    n = year['n_days']
+    zodiac_mode = year['zodiac_mode']
+    columns = {
+        'gregorian': {'t': 'date', 'v': [day_columns.days_from_civil(*(int(x) for x in swe.revjul(jd0)[:3]))
+                                         for jd0 in year['jd0']]},
+        'enoch_year': {'t': 'const', 'v': year['enoch_year']},
+        'name': {'t': 'const', 'v': None},
+    }
+    # one value per day, encoded at the end (after the per-day overrides from extra)
+    plain = {
+        'enoch_month': list(year['enoch_month']),
+        'enoch_day': list(year['enoch_day']),
+        'added_week': list(year['added_week']),
+        'day_of_year': list(range(1, n + 1)),
+    }
+    if 'bounds' in year['computed']:
+        seconds = [_jd_to_epoch_s(b) for b in year['bounds']]
+        columns['start_utc'] = {'t': 'time', 'v': seconds[:-1]}
+        columns['end_utc'] = {'t': 'time', 'v': seconds[1:]}
+        rows = [i for i, state in enumerate(year['polar']) if state and state != sunsets.NORMAL]
+        if rows:
+            columns['polar'] = dict(day_columns.encode_values('polar', [year['polar'][i] for i in rows]), i=rows)
+            for _ in rows:      # counted per day, like materialize
+                _polar_reason(year, record_reason)
+    if 'moon' in year['computed']:
+        signs = []
+        for lon_moon in year['moon_lon']:
+            try:
+                signs.append(lunar_sign_from_longitude(lon_moon, zodiac_mode) if lon_moon is not None else '')
+            except Exception:
+                signs.append('')
+        plain['moon_phase_angle_deg'] = _rounded(year['moon_phase'], 3)
+        plain['moon_illum'] = _rounded(year['moon_illum'], 6)
+        plain['moon_distance_km'] = _rounded(year['moon_dist'], 1)
+        plain['moon_sign'] = signs
+        columns['moon_zodiac_mode'] = {'t': 'const', 'v': zodiac_mode}
+    extra = year['extra']
+    overlap = set()
+    for fields in extra:
+        overlap.update(fields)
+    overlap &= columns.keys() | plain.keys()
+    if overlap & columns.keys():
+        # a sparse field overrides a time/date/const one: only the day dicts can express that
+        return day_columns.encode_days(materialize(year, record_reason))
+    if overlap:
+        # e.g. the sign mix replaces moon_sign with the day's primary sign
+        for i, fields in enumerate(extra):
+            for name in overlap.intersection(fields):
+                plain[name][i] = fields[name]
+        extra = [{k: v for k, v in fields.items() if k not in overlap} if overlap.intersection(fields) else fields
+                 for fields in extra]
+    for name, values in plain.items():
+        columns[name] = day_columns.encode_values(name, values)
+    columns.update(day_columns.encode_days(extra))
+    return columns
+
+
+STAGES = (stage_anchor, stage_boundaries, stage_enoch, stage_lunar, stage_enrichment)
+
+
+def effective_deadline_ms(params: dict) -> float:
+    """Requested deadline capped by the server maximum (the maximum when none was given)."""
+    requested = params.get('deadline_ms')
+    if requested is None or requested <= 0:
+        return DEADLINE_MAX_MS
+    return min(float(requested), DEADLINE_MAX_MS) if DEADLINE_MAX_MS > 0 else float(requested)
+
+
+def year_identity(params: dict) -> list:
+    """
+    [provider, ephemeris tier, Enoch year start] the request resolves to: requests
+    with different datetimes in the same Enoch year get the same days. Costs the
+    anchor stage only (~1 ms warm); reasons are left to run_year.
+    """
+    def ignore(*args, **kwargs):
+        pass
+    jd = request_jd(params, ignore)
+    if jd is None:
+        return None
+    provider, tier = resolve_provider(params, jd, ignore)
+    year = {'jd': jd, 'latitude': params['latitude'], 'longitude': params['longitude'], 'provider': provider}
+    stage_anchor(year, ignore)
+    return [provider, tier, round(year['start_jd'], 6)]
+
+
+def run_year(params: dict, record_reason, provider: str = None, deadline_ms: float = None,
+             columns: bool = False) -> dict:
+    """
+    Build the Enoch year containing the request datetime. `provider` forces one
+    (the approximate fallback); otherwise it follows approx / ephemeris / date range.
+    `deadline_ms` overrides the request deadline (0 = none, for background jobs).
+    `columns` returns year['columns'] (format=columns) instead of year['days'].
+    """
+    started = time.perf_counter()
+    if deadline_ms is None:
+        deadline_ms = effective_deadline_ms(params)
+    jd = request_jd(params, record_reason)
+    if provider is None:
+        provider, tier = resolve_provider(params, jd, record_reason)
+    else:
+        tier = None
+    if jd is None:
+        raise ValueError(f"unparseable datetime: {params.get('datetime')!r}")
+    year = {
+        'jd': jd,
+        'provider': provider,
+        'ephe_tier': tier,
+        'latitude': params['latitude'],
+        'longitude': params['longitude'],
+        'zodiac_mode': params['zodiac_mode'],
+        'align': params['align'],
+        'fields': params.get('fields') or ALL_GROUPS,
+        'computed': set(),
+        'started': started,
+        'deadline_ms': deadline_ms,
+        'deadline': started + deadline_ms / 1000.0 if deadline_ms > 0 else None,
+        'workers': 1 if provider == PROVIDER_APPROX else year_shards.effective_workers(params.get('workers')),
+        'estimate': cost.estimate_cost(params)['stages'],
+        'skipped': [],
+        'scans': {},
+    }
+    stage_anchor(year, record_reason)
+    year['extra'] = [{} for _ in range(year['n_days'])]   # sparse per-day fields (sign mix, events)
+    for stage in STAGES[1:]:
+        stage(year, record_reason)
+    if columns:
+        year['days'] = None
+        year['columns'] = materialize_columns(year, record_reason)
+    else:
+        year['days'] = materialize(year, record_reason)
+    year['computed'] = [g for g in ALL_GROUPS if g in year['computed']]
+    return year
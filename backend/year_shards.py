@@ -0,0 +1,281 @@
+"""
+Process-pool sharding for the year pipeline.
+
+A cold precise year is single-threaded Python: 365 sunsets, 730 Sun/Moon
+samples, a sign-mix refinement per day and the alignment scans, one after the
+other. With `workers` > 1 those columns are split into contiguous shards, run
+in a pool of worker processes and concatenated back in day order, so the
+result is the same as the serial one (alignment samples may differ in the last
+bits of their JD: the shards start on the same sampling grid).
+
+The pool is created on first use (spawn, like the job pool: it starts inside a
+request) with YEAR_WORKERS processes; each worker sets the ephemeris path once
+and keeps its own Swiss/lru caches warm across requests. Every shard runs under
+the caller's ephemeris tier, polar policy and precision tier.
+
+Worker calls run under their own utils.timing record (Swiss calls are counted
+by swe_profiler there too); its counters and stage times come back with the
+result and are merged into the request's record, so Server-Timing, /metrics and
+the slow capture see the work done in the pool. Worker stages are CPU seconds
+summed over workers, reported as `workers.<stage>` next to `workers` (all of
+the shards' time).
+
+YEAR_WORKERS (default 0) enables the pool and caps what a request may ask for
+with `workers`; CALC_YEAR_WORKERS (default 0) is the server default per year.
+Years built inside a pool process (background jobs) always run serially.
+
+submit_call / submit_shards start work without waiting for it (the pipeline
+runs its independent event scanners side by side that way); map_shards waits.
+
+    from year_shards import map_shards, sunset_shard
+    out = map_shards(sunset_shard, jd0s, 4, lat=lat, lon=lon)     # [(sunset JD, polar state), ...]
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import swisseph as swe
+
+from utils import ephemeris
+from utils import precision
+from utils import sunsets
+from utils import swe_profiler
+from utils import timing
+from utils.lunar_calc import (
+    lunar_sign_mix_jd,
+    scan_alignments_simple_jd,
+    scan_pair_aspects_jd,
+    solar_cardinal_points_for_year,
+    sun_moon_state,
+)
+
+EPHE_PATH = Path(__file__).resolve().parent.parent / "sweph" / "ephe"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+MAX_WORKERS = max(0, _env_int('YEAR_WORKERS', 0))
+DEFAULT_WORKERS = max(0, _env_int('CALC_YEAR_WORKERS', 0))
+MIN_SHARD = 16      # items per shard below which the IPC costs more than it saves
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def effective_workers(requested=None) -> int:
+    """Workers for one year: the request (or server default) capped by YEAR_WORKERS; 1 = serial."""
+    if MAX_WORKERS <= 1 or multiprocessing.parent_process() is not None:
+        # no pools inside pool processes (job workers): their exit would wait on ours forever,
+        # and the job pool already keeps the cores busy
+        return 1
+    n = DEFAULT_WORKERS if requested is None else requested
+    try:
+        n = int(n)
+    except (TypeError, ValueError):
+        n = 1
+    return max(1, min(n, MAX_WORKERS))
+
+
+def _init_worker(ephe_path: str):
+    swe.set_ephe_path(ephe_path)
+    swe_profiler.install()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS, initializer=_init_worker,
+                                        initargs=(str(EPHE_PATH),), mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_shard(context, fn, items, kwargs):
+    """Worker side: one shard under the caller's ephemeris tier, polar policy and precision tier."""
+    return _run_call(context, fn, (items,), kwargs)
+
+
+def _run_call(context, fn, args, kwargs):
+    """Worker side: (fn's result, the call's timing record as a dict)."""
+    tier, policy, precision_tier = context
+    token = timing.begin()
+    try:
+        with ephemeris.use_tier(tier), sunsets.use_policy(policy), precision.use_precision(precision_tier):
+            out = fn(*args, **kwargs)
+    finally:
+        rec = timing.end(token)
+    return out, rec.as_dict()
+
+
+def merge_timing(rec, worker: dict):
+    """Add a worker call's counters and stage times to the request's timing record."""
+    if rec is None:
+        return
+    for name, n in worker['counters'].items():
+        rec.counters[name] = rec.counters.get(name, 0) + n
+    rec.stages['workers'] = rec.stages.get('workers', 0.0) + worker['total']
+    for name, secs in worker['stages'].items():
+        key = f"workers.{name}"
+        rec.stages[key] = rec.stages.get(key, 0.0) + secs
+
+
+def _context():
+    return ephemeris.current_tier(), sunsets.current_policy(), precision.current_precision()
+
+
+def split(items: list, parts: int) -> list:
+    """`parts` contiguous slices of nearly equal size (fewer when there are few items)."""
+    parts = max(1, min(parts, len(items) // MIN_SHARD or 1))
+    size, extra = divmod(len(items), parts)
+    out, start = [], 0
+    for k in range(parts):
+        end = start + size + (1 if k < extra else 0)
+        out.append(items[start:end])
+        start = end
+    return out
+
+
+class Pending:
+    """
+    Futures of one call (or of its shards) in the pool; result() concatenates their lists
+    in order and merges the workers' counters into the timing record of the submitter.
+    """
+
+    def __init__(self, futures):
+        self.futures = futures
+        self.timing = timing.current()
+        self._merged = set()        # futures whose timing is already in self.timing
+
+    def result(self, timeout: float = None) -> list:
+        """Raises concurrent.futures.TimeoutError after `timeout` seconds, or the worker's exception."""
+        end = None if timeout is None else time.monotonic() + timeout
+        out = []
+        try:
+            for k, fut in enumerate(self.futures):
+                part, worker = fut.result(None if end is None else max(0.0, end - time.monotonic()))
+                out.extend(part)
+                if k not in self._merged:
+                    self._merged.add(k)
+                    merge_timing(self.timing, worker)
+        except BrokenProcessPool:
+            # a worker died: the next call starts a fresh pool
+            _reset_pool()
+            raise
+        return out
+
+    def cancel(self):
+        """Drop the shards not started yet (a running one finishes in its worker, unused)."""
+        for fut in self.futures:
+            fut.cancel()
+
+
+def submit_call(fn, *args, **kwargs) -> Pending:
+    """fn(*args, **kwargs) → list in a worker, under the caller's context."""
+    return Pending([_get_pool().submit(_run_call, _context(), fn, args, kwargs)])
+
+
+def submit_shards(fn, items, workers: int, **kwargs) -> Pending:
+    """fn(shard, **kwargs) → list over contiguous shards of items, in the pool."""
+    context = _context()
+    pool = _get_pool()
+    return Pending([pool.submit(_run_shard, context, fn, shard, kwargs) for shard in split(list(items), workers)])
+
+
+def map_shards(fn, items, workers: int, **kwargs) -> list:
+    """
+    fn(shard, **kwargs) → list, over contiguous shards of items; results concatenated
+    in order. Serial in-process when workers <= 1, the items are few or the pool breaks.
+    """
+    items = list(items)
+    if workers <= 1 or len(split(items, workers)) == 1:
+        return fn(items, **kwargs)
+    try:
+        return submit_shards(fn, items, workers, **kwargs).result()
+    except Exception:
+        # BrokenProcessPool (a worker died) or pickling trouble: the next call starts a fresh pool
+        _reset_pool()
+        return fn(items, **kwargs)
+
+
+# --- Shard functions (module level so the pool can pickle them) ---
+
+def sunset_shard(jd0s, lat: float, lon: float, policy: str = None) -> list:
+    return [sunsets.sunset_jd(j, lat, lon, policy) for j in jd0s]
+
+
+def sun_moon_shard(jds) -> list:
+    out = []
+    for jd in jds:
+        try:
+            out.append(sun_moon_state(jd))
+        except Exception:
+            out.append(None)
+    return out
+
+
+def sign_mix_shard(days, zodiac_mode: str) -> list:
+    """days: [(start_jd, end_jd, lon_start, lon_end)] → lunar_sign_mix_jd per day (None on failure)."""
+    out = []
+    for start, end, lon_start, lon_end in days:
+        try:
+            out.append(lunar_sign_mix_jd(start, end, zodiac_mode, lon_start, lon_end))
+        except Exception:
+            out.append(None)
+    return out
+
+
+def _grid_scan(scan, samples, step_hours: float, kwargs) -> list:
+    """Run `scan` over the shard's samples: from the first one to half a step past the last."""
+    if not samples:
+        return []
+    half_step = max(1.0, float(step_hours)) / 48.0
+    return scan(samples[0], samples[-1] + half_step, step_hours=step_hours, **kwargs)
+
+
+def alignment_shard(samples, step_hours: float, **kwargs) -> list:
+    return _grid_scan(scan_alignments_simple_jd, samples, step_hours, kwargs)
+
+
+def aspect_shard(samples, step_hours: float, **kwargs) -> list:
+    return _grid_scan(scan_pair_aspects_jd, samples, step_hours, kwargs)
+
+
+def cardinal_points_shard(years) -> list:
+    """Equinoxes and solstices of the given Gregorian years."""
+    out = []
+    for y in years:
+        out.extend(solar_cardinal_points_for_year(y))
+    return out
+
+
+def grid_samples(start_jd: float, end_jd: float, step_hours: float) -> list:
+    """Sample JDs of a sampling scanner (one every step_hours from start_jd to end_jd)."""
+    step = max(1.0, float(step_hours)) / 24.0
+    samples = []
+    jd = start_jd
+    while jd <= end_jd + 1e-9:
+        samples.append(jd)
+        jd += step
+    return samples
+
+
+def scan_grid(shard_fn, start_jd: float, end_jd: float, step_hours: float, workers: int, **kwargs) -> list:
+    """A sampling scanner split in time: each shard scans its own run of grid samples."""
+    return map_shards(shard_fn, grid_samples(start_jd, end_jd, step_hours), workers, step_hours=step_hours, **kwargs)
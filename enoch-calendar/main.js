@@ -1036,6 +1036,66 @@ function resolveCalcYearUrl() {
   }
 }
 
+// Canonical /calcYear locator: June 1st 12:00 UTC of the Gregorian year the Enoch year starts in
+// (spring), like the backend bulk jobs. Every date of one Enoch year gives the same query.
+function calcYearDatetime(startDate) {
+  const y = startDate.getUTCFullYear();
+  return (y < 0 ? '-' + String(-y).padStart(6, '0') : String(y).padStart(4, '0')) + '-06-01T12:00:00Z';
+}
+
+// GET /calcYear with the body as a canonical (sorted) query string, so the browser and CDN edges can
+// cache and revalidate it (ETag/304); servers without the GET variant get the old POST.
+async function fetchCalcYear(url, body) {
+  try {
+    const u = new URL(url, window.location.origin);
+    for (const key of Object.keys(body).sort()) u.searchParams.set(key, String(body[key]));
+    const res = await fetch(u.toString(), { method: 'GET' });
+    if (res.status !== 405 && res.status !== 404) return res;
+  } catch(_) { }
+  return fetch(url, { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify(body) });
+}
+
+// /calcYear format=columns -> the same day objects as the default rows format (see backend/day_columns.py)
+function isoFromEpochSeconds(sec, dateOnly) {
+  const d = new Date(sec * 1000);
+  const y = d.getUTCFullYear();
+  const pad = (n) => String(n).padStart(2, '0');
+  const ys = y >= 0 ? String(y).padStart(4, '0') : String(y);
+  const date = `${ys}-${pad(d.getUTCMonth() + 1)}-${pad(d.getUTCDate())}`;
+  if (dateOnly) return date;
+  return `${date}T${pad(d.getUTCHours())}:${pad(d.getUTCMinutes())}:${pad(d.getUTCSeconds())}Z`;
+}
+
+function decodeColumnValues(col) {
+  const v = col.v;
+  switch (col.t) {
+    case 'bool': return v.map(x => x === null ? null : x === 1);
+    case 'str': return v.map(x => x === null ? null : col.dict[x]);
+    case 'time': return v.map(x => x === null ? null : isoFromEpochSeconds(x, false));
+    case 'date': return v.map(x => x === null ? null : isoFromEpochSeconds(x * 86400, true));
+    case 'rows': {
+      const items = decodeDayColumns(col.columns, v.reduce((n, x) => n + (x || 0), 0));
+      let k = 0;
+      return v.map(x => x === null ? null : items.slice(k, k += x));
+    }
+    default: return v;
+  }
+}
+
+function decodeDayColumns(columns, n) {
+  const days = Array.from({ length: n }, () => ({}));
+  for (const [name, col] of Object.entries(columns || {})) {
+    if (col.t === 'const') {
+      for (const d of days) d[name] = col.v;
+      continue;
+    }
+    const values = decodeColumnValues(col);
+    if (col.i) col.i.forEach((row, k) => { days[row][name] = values[k]; });
+    else values.forEach((value, row) => { days[row][name] = value; });
+  }
+  return days;
+}
+
 
 // --- CSV cache/upload config helpers ---
 function getQS() {
@@ -1870,7 +1930,7 @@ async function buildCalendar(referenceDate = new Date(), tryCSV = true, base = n
     // Try new annual endpoint for precise lunar data and day bounds (unless forced to daily)
     try {
       if (backendMode === 'daily') throw new Error('backend-mode=daily');
-      const { lat: uLat, lon: uLon, tz } = getUserLatLonTz();
+      const { lat: uLat, lon: uLon } = getUserLatLonTz();
       const calcYearUrl = resolveCalcYearUrl();
       // Alignment tuning via query params (optional)
       const qs = getQS();
@@ -1881,11 +1941,12 @@ async function buildCalendar(referenceDate = new Date(), tryCSV = true, base = n
       const alignStep = parseFloat((qs.get('align_step') || qs.get('align_step_hours') || qs.get('alignStep') || '').trim());
       const alignPlanets = (qs.get('align_planets') || qs.get('alignPlanets') || '').trim();
       const alignOuter = (qs.get('align_include_outer') || qs.get('align_outer') || '').trim().toLowerCase();
+      // Canonical request: the year (not the reference instant) and coordinates rounded to ~11 m,
+      // so repeated visits hit the same URL and revalidate with a 304
       const body = {
-        datetime: referenceDate.toISOString().slice(0,19),
-        latitude: uLat,
-        longitude: uLon,
-        timezone: tz,
+        datetime: calcYearDatetime(startDate),
+        latitude: Math.round(uLat * 1e4) / 1e4,
+        longitude: Math.round(uLon * 1e4) / 1e4,
         zodiac_mode: 'tropical'
       };
       // Only attach if valid numbers provided
@@ -1915,10 +1976,17 @@ async function buildCalendar(referenceDate = new Date(), tryCSV = true, base = n
       if (typeof body.align_span_deg === 'undefined') body.align_span_deg = 35; // degrees
       if (typeof body.align_step_hours === 'undefined') body.align_step_hours = 1; // finer granularity improves detection timing
       if (typeof body.align_planets === 'undefined') body.align_planets = 'seven'; // classic 7 (Sun+Moon+Mercury..Saturn) if supported by backend
+      // Time budget: the backend skips late enrichment (alignments, aspects...) instead of timing out,
+      // so a slow instance still answers before we fall back to 364 daily calls. Override with ?deadline_ms=
+      const deadlineMs = parseInt((qs.get('deadline_ms') || qs.get('deadline') || '').trim(), 10);
+      body.deadline_ms = (Number.isFinite(deadlineMs) && deadlineMs > 0) ? deadlineMs : 20000;
+      // Columnar response (several times smaller); ?format=rows asks for the plain day objects
+      body.format = (qs.get('format') || '').trim().toLowerCase() === 'rows' ? 'rows' : 'columns';
       console.log('[buildCalendar] calling /calcYear', calcYearUrl, body);
-      const res = await fetch(calcYearUrl, { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify(body) });
+      const res = await fetchCalcYear(calcYearUrl, body);
       if (res.ok) {
         const j = await res.json();
+        if (j && j.format === 'columns') j.days = decodeDayColumns(j.columns, j.n_days);
         dbg('[calcYear] header', { ok: j?.ok, enoch_year: j?.enoch_year, days: Array.isArray(j?.days) ? j.days.length : 0 });
         try {
           if (j && Array.isArray(j.days)) {
@@ -0,0 +1,65 @@
+"""GET /calcYear as the calendar page sends it: cacheable, and revalidated with a 304."""
+from urllib.parse import urlencode
+
+import pytest
+
+# buildCalendar's default body (enoch-calendar/main.js), Santiago
+CLIENT_BODY = {
+    'datetime': '2025-06-01T12:00:00Z',
+    'latitude': -33.45,
+    'longitude': -70.6667,
+    'zodiac_mode': 'tropical',
+    'align_detect_aspects': True,
+    'align_include_oppositions': True,
+    'align_span_deg': 35,
+    'align_step_hours': 1,
+    'align_planets': 'seven',
+    'deadline_ms': 20000,
+    'format': 'columns',
+}
+
+
+def _client_query(body):
+    """fetchCalcYear's query string: sorted keys, values as JS String() prints them."""
+    def js(value):
+        return str(value).lower() if isinstance(value, bool) else str(value)
+    return urlencode([(k, js(body[k])) for k in sorted(body)])
+
+
+@pytest.fixture(scope='module')
+def client():
+    from app import app
+    return app.test_client()
+
+
+def test_client_default_request_revalidates(client):
+    url = '/calcYear?' + _client_query(CLIENT_BODY)
+    headers = {'Accept-Encoding': 'gzip, deflate, br'}
+    first = client.get(url, headers=headers)
+    assert first.status_code == 200
+    assert first.headers['Cache-Control'].startswith('public')
+    etag = first.headers['ETag']
+
+    again = client.get(url, headers=dict(headers, **{'If-None-Match': etag}))
+    assert again.status_code == 304
+    assert again.headers['ETag'].strip('"') in etag
+    assert not again.get_data()
+
+
+def test_execution_params_do_not_change_the_year_key():
+    from calc_year_route import _year_key
+    from year_pipeline import parse_year_request
+    base = {'datetime': '2025-06-01T12:00:00Z', 'latitude': -33.45, 'longitude': -70.66}
+    key = _year_key(parse_year_request(base))
+    tuned = dict(base, workers=4, deadline_ms=9000, datetime='2025-09-01T08:00:00Z', timezone='UTC')
+    assert _year_key(parse_year_request(tuned)) == key
+    assert _year_key(parse_year_request(dict(base, align_step_hours=6))) != key
+
+
+def test_revalidation_ignores_workers_and_deadline(client):
+    query = {'datetime': '2025-06-01T12:00:00Z', 'latitude': -33.45, 'longitude': -70.66}
+    first = client.get('/calcYear?' + urlencode(query))
+    assert first.status_code == 200
+    tuned = dict(query, workers=2, deadline_ms=9000)
+    again = client.get('/calcYear?' + urlencode(tuned), headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
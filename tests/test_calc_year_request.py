@@ -0,0 +1,85 @@
+"""/calcYear request validation: bad coordinates and unknown options are a 400 JSON error, never a 500."""
+import pytest
+
+from year_pipeline import RequestError, parse_year_request
+
+BASE = {'datetime': '2025-06-01T12:00', 'latitude': -33.45, 'longitude': -70.66, 'timezone': 'America/Santiago'}
+
+
+@pytest.fixture(scope='module')
+def client():
+    from app import app
+    return app.test_client()
+
+
+def _without(key):
+    return {k: v for k, v in BASE.items() if k != key}
+
+
+@pytest.mark.parametrize('payload', [
+    _without('latitude'),
+    _without('longitude'),
+    dict(BASE, latitude='north'),
+    dict(BASE, longitude=None),
+    dict(BASE, latitude=[1, 2]),
+    dict(BASE, latitude='nan'),
+    dict(BASE, latitude=91),
+    dict(BASE, longitude=-180.5),
+])
+def test_parse_rejects_bad_coordinates(payload):
+    with pytest.raises(RequestError):
+        parse_year_request(payload)
+
+
+def test_parse_accepts_numeric_strings():
+    params = parse_year_request(dict(BASE, latitude='-33.45', longitude='-70.66'))
+    assert params['latitude'] == -33.45 and params['longitude'] == -70.66
+
+
+@pytest.mark.parametrize('payload, field', [
+    (_without('latitude'), 'latitude'),
+    (_without('longitude'), 'longitude'),
+    (dict(BASE, latitude='north'), 'latitude'),
+    (dict(BASE, longitude='west'), 'longitude'),
+])
+def test_route_answers_400_json(client, payload, field):
+    r = client.post('/calcYear', json=payload)
+    assert r.status_code == 400
+    body = r.get_json()
+    assert body['ok'] is False and field in body['error']
+
+
+@pytest.mark.parametrize('value', ['moshir', 'garbage', 'approx'])
+def test_parse_rejects_unknown_ephemeris(value):
+    with pytest.raises(RequestError, match='ephemeris'):
+        parse_year_request(dict(BASE, ephemeris=value))
+
+
+@pytest.mark.parametrize('payload, tier', [
+    (BASE, None),
+    (dict(BASE, ephemeris=''), None),
+    (dict(BASE, ephemeris='SE1'), 'swiss'),
+    (dict(BASE, ephe='moseph'), 'moshier'),
+    (dict(BASE, ephemeris='auto'), 'auto'),
+])
+def test_parse_normalizes_ephemeris(payload, tier):
+    assert parse_year_request(payload)['ephemeris'] == tier
+
+
+def test_route_rejects_unknown_ephemeris(client):
+    r = client.post('/calcYear', json=dict(BASE, ephemeris='moshir'))
+    assert r.status_code == 400 and 'ephemeris' in r.get_json()['error']
+
+
+@pytest.mark.parametrize('payload, policy', [
+    (BASE, None),
+    (dict(BASE, polar_policy='midnight'), 'civil_midnight'),
+    (dict(BASE, polar_policy='Nearest'), 'nearest_latitude'),
+])
+def test_parse_normalizes_polar_policy(payload, policy):
+    assert parse_year_request(payload)['polar_policy'] == policy
+
+
+def test_route_rejects_unknown_polar_policy(client):
+    r = client.post('/calcYear', json=dict(BASE, polar_policy='noon'))
+    assert r.status_code == 400 and 'polar_policy' in r.get_json()['error']
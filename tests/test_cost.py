@@ -0,0 +1,114 @@
+"""Admission control for /calcYear: estimates, downgrades, 429 and async 202."""
+import pytest
+
+import calc_year_route
+import cost
+import jobs
+from utils import precision
+from year_pipeline import parse_year_request
+
+# All nine bodies at 1 h with pair aspects over a 60° span: ~7 s estimated, over the 6 s limit
+HEAVY = {'datetime': '2025-06-01T12:00:00Z', 'latitude': -33.45, 'longitude': -70.66,
+         'align_planets': 'all', 'align_step_hours': 1, 'align_detect_aspects': True, 'align_span_deg': 60}
+
+
+SANTIAGO = {key: HEAVY[key] for key in ('datetime', 'latitude', 'longitude')}
+
+
+@pytest.fixture(scope='module')
+def client():
+    from app import app
+    return app.test_client()
+
+
+def test_outer_fallback_keeps_the_downgrade(client, monkeypatch):
+    real_run_year = calc_year_route.run_year
+    ran = []
+
+    def failing_run_year(params, record_reason, provider=None, **kwargs):
+        ran.append((params, provider))
+        if provider is None:
+            raise RuntimeError('boom')
+        return real_run_year(params, record_reason, provider=provider, **kwargs)
+
+    monkeypatch.setattr(calc_year_route, 'run_year', failing_run_year)
+    body = client.post('/calcYear', json=HEAVY).get_json()
+    assert body['ok'] and body['quality'] == 'approx'
+    assert 'outer_exception' in body['quality_reason_codes']
+    assert body['cost']['action'] == 'downgrade' and body['precision'] == 'fast'
+    (main, _), (fallback, provider) = ran
+    assert provider == calc_year_route.PROVIDER_APPROX and fallback is main
+
+
+def test_estimate_follows_the_request():
+    light = cost.estimate_cost(parse_year_request(SANTIAGO))
+    heavy = cost.estimate_cost(parse_year_request(HEAVY))
+    assert light['cpu_ms'] < 1000 < cost.COST_LIMIT_MS < heavy['cpu_ms']
+    assert heavy['swe_calls'] == sum(stage['swe_calls'] for stage in heavy['stages'].values())
+    assert 'aspects' in heavy['stages'] and 'aspects' not in light['stages']
+    tromso = cost.estimate_cost(parse_year_request(dict(SANTIAGO, latitude=69.65, longitude=18.96)))
+    assert tromso['stages']['sunsets']['cpu_ms'] > light['stages']['sunsets']['cpu_ms']
+    fast = cost.estimate_cost(parse_year_request(dict(SANTIAGO, precision='fast')))
+    precise = cost.estimate_cost(parse_year_request(dict(SANTIAGO, precision='precise')))
+    assert fast['swe_calls'] < light['swe_calls'] < precise['swe_calls']
+    assert cost.estimate_cost(parse_year_request(dict(SANTIAGO, approx=1)))['cpu_ms'] == cost.BASE_MS + cost.APPROX_YEAR_MS
+
+
+def test_downgrades_go_precision_steps_aspects_span():
+    params = parse_year_request(HEAVY)
+    steps = [changes for changes, _ in cost._downgrades(params)]
+    assert steps == [
+        {'precision': 'fast'},
+        {'precision': 'fast', 'align_step_hours': 2.0},
+        {'precision': 'fast', 'align_step_hours': 6.0},
+        {'precision': 'fast', 'align_step_hours': 12.0},
+        {'precision': 'fast', 'align_step_hours': 24.0},
+        {'precision': 'fast', 'align_step_hours': 24.0, 'align_detect_aspects': False},
+        {'precision': 'fast', 'align_step_hours': 24.0, 'align_detect_aspects': False, 'align_span_deg': 30.0},
+    ]
+    assert params['precision'] is None and params['align']['step_hours'] == 1.0     # copies only
+    assert [c for c, _ in cost._downgrades(parse_year_request(dict(SANTIAGO, precision='fast')))] == []
+
+
+def test_admit_runs_downgrades_or_rejects():
+    light = parse_year_request(SANTIAGO)
+    assert cost.admit(light)['action'] == cost.ACTION_RUN
+    heavy = parse_year_request(HEAVY)
+    decision = cost.admit(heavy)
+    assert decision['action'] == cost.POLICY_DOWNGRADE
+    assert decision['changes'] == {'precision': precision.FAST, 'align_step_hours': 2.0}
+    assert decision['estimate']['cpu_ms'] <= cost.COST_LIMIT_MS < decision['requested_estimate']['cpu_ms']
+    assert decision['params']['align']['step_hours'] == 2.0
+    # nothing gets under 100 ms: reject
+    assert cost.admit(heavy, limit_ms=100)['action'] == cost.POLICY_REJECT
+    assert cost.admit(heavy, policy='reject')['action'] == cost.POLICY_REJECT
+    assert cost.admit(heavy, limit_ms=0)['action'] == cost.ACTION_RUN
+    public = cost.public_estimate(decision)
+    assert public['changes'] == decision['changes'] and public['estimate'] == decision['requested_estimate']
+
+
+def test_dry_run_reports_the_decision(client):
+    body = client.post('/calcYear', json=dict(HEAVY, dry_run=True)).get_json()
+    assert body['dry_run'] and body['cost']['action'] == 'downgrade'
+    assert 'days' not in body
+
+
+def test_reject_policy_answers_429(client, monkeypatch):
+    monkeypatch.setattr(cost, 'COST_POLICY', cost.POLICY_REJECT)
+    r = client.post('/calcYear', json=HEAVY)
+    body = r.get_json()
+    assert r.status_code == 429 and body['ok'] is False
+    assert body['cost']['action'] == 'reject' and body['cost']['estimate']['cpu_ms'] > cost.COST_LIMIT_MS
+
+
+def test_async_policy_queues_a_calendar_job(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(cost, 'COST_POLICY', cost.POLICY_ASYNC)
+    monkeypatch.setenv('JOBS_DIR', str(tmp_path))
+    dispatched = []
+    monkeypatch.setattr(jobs, '_dispatch', dispatched.append)
+    r = client.post('/calcYear', json=HEAVY)
+    body = r.get_json()
+    assert r.status_code == 202 and body['async'] and dispatched == [body['job_id']]
+    assert body['status_url'].endswith(body['job_id']) and body['cost']['action'] == 'async'
+    job = client.get(body['status_url']).get_json()['job']
+    assert job['type'] == 'calendar' and job['status'] == jobs.QUEUED
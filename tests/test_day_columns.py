@@ -0,0 +1,101 @@
+"""format=columns: decoded like enoch-calendar/main.js does, it gives the rows format's days."""
+import pytest
+
+import day_columns
+import year_pipeline
+
+SANTIAGO = {'datetime': '2025-06-01T12:00:00Z', 'latitude': -33.45, 'longitude': -70.66}
+
+
+def _civil_from_days(z):
+    """Inverse of day_columns.days_from_civil: (y, m, d)."""
+    z += 719468
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    d = doy - (153 * mp + 2) // 5 + 1
+    m = mp + 3 if mp < 10 else mp - 9
+    return yoe + era * 400 + (m <= 2), m, d
+
+
+def _iso(seconds, date_only):
+    y, m, d = _civil_from_days(seconds // 86400)
+    date = f"{y:04d}-{m:02d}-{d:02d}" if y >= 0 else f"{y}-{m:02d}-{d:02d}"
+    if date_only:
+        return date
+    s = seconds % 86400
+    return f"{date}T{s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}Z"
+
+
+def _values(col):
+    """decodeColumnValues."""
+    v = col['v']
+    if col['t'] == 'bool':
+        return [None if x is None else x == 1 for x in v]
+    if col['t'] == 'str':
+        return [None if x is None else col['dict'][x] for x in v]
+    if col['t'] in ('time', 'date'):
+        date_only = col['t'] == 'date'
+        return [None if x is None else _iso(x * 86400 if date_only else x, date_only) for x in v]
+    if col['t'] == 'rows':
+        items = iter(_decode(col['columns'], sum(x or 0 for x in v)))
+        return [None if x is None else [next(items) for _ in range(x)] for x in v]
+    return v
+
+
+def _decode(columns, n):
+    """decodeDayColumns."""
+    days = [{} for _ in range(n)]
+    for name, col in columns.items():
+        if col['t'] == 'const':
+            for day in days:
+                day[name] = col['v']
+            continue
+        rows = col.get('i') or range(n)
+        for row, value in zip(rows, _values(col)):
+            days[row][name] = value
+    return days
+
+
+def _ignore(*args, **kwargs):
+    pass
+
+
+@pytest.mark.parametrize('query', [
+    SANTIAGO,
+    dict(SANTIAGO, align_planets='seven', align_step_hours=6, align_detect_aspects=True),
+    dict(SANTIAGO, datetime='-1500-03-01T12:00:00Z'),
+    dict(SANTIAGO, latitude=69.65, longitude=18.96),
+    dict(SANTIAGO, fields='bounds'),
+])
+def test_columns_decode_to_the_rows_days(query):
+    params = year_pipeline.parse_year_request(query)
+    rows = year_pipeline.run_year(params, _ignore, deadline_ms=0)
+    cols = year_pipeline.run_year(params, _ignore, deadline_ms=0, columns=True)
+    assert cols['days'] is None and cols['computed'] == rows['computed']
+    assert _decode(cols['columns'], cols['n_days']) == rows['days']
+
+
+def test_encode_days_round_trips_sparse_and_bce_values():
+    days = [
+        {'gregorian': '-1500-02-28', 'start_utc': '-1500-02-28T18:01:02Z', 'flag': True, 'mode': 'tropical'},
+        {'gregorian': '-1500-03-01', 'start_utc': '-1500-03-01T18:00:00Z', 'flag': None, 'mode': 'tropical',
+         'equinox': 'march', 'hits': [{'a': 1, 'b': 'x'}, {'a': 2, 'b': 'y'}]},
+        {'gregorian': '0000-12-31', 'start_utc': None, 'flag': False, 'mode': 'tropical', 'hits': []},
+    ]
+    columns = day_columns.encode_days(days)
+    assert columns['mode'] == {'t': 'const', 'v': 'tropical'}
+    assert columns['gregorian']['t'] == 'date' and columns['start_utc']['t'] == 'time'
+    assert columns['equinox']['i'] == [1] and columns['hits']['t'] == 'rows'
+    assert _decode(columns, len(days)) == days
+
+
+def test_route_columns_match_rows():
+    from app import app
+    client = app.test_client()
+    rows = client.post('/calcYear', json=SANTIAGO).get_json()
+    cols = client.post('/calcYear', json=dict(SANTIAGO, format='columns')).get_json()
+    assert cols['format'] == 'columns' and 'days' not in cols
+    assert _decode(cols['columns'], cols['n_days']) == rows['days']
@@ -0,0 +1,60 @@
+"""Deadlines: enrichment that does not fit is skipped and reported, the days stay whole."""
+import time
+
+import pytest
+
+import year_pipeline
+
+SANTIAGO = {'datetime': '2025-06-01T12:00:00Z', 'latitude': -33.45, 'longitude': -70.66}
+ENRICHMENT = ['phase_scan', 'perigee_scan', 'cardinal_points', 'eclipses', 'lunar_sign_mix', 'alignments']
+DAY_KEYS = ('start_utc', 'end_utc', 'gregorian', 'enoch_month', 'enoch_day', 'added_week')
+
+
+@pytest.fixture(scope='module')
+def client():
+    from app import app
+    return app.test_client()
+
+
+def _ignore(*args, **kwargs):
+    pass
+
+
+def test_expired_deadline_keeps_only_the_core_stages():
+    params = year_pipeline.parse_year_request(SANTIAGO)
+    reasons = []
+    year = year_pipeline.run_year(params, lambda code, msg, exc=None, **kw: reasons.append((code, kw)), deadline_ms=1)
+    full = year_pipeline.run_year(params, _ignore, deadline_ms=0)
+    assert year['skipped'] == ENRICHMENT and full['skipped'] == []
+    assert year['computed'] == ['bounds', 'moon']
+    assert reasons == [(f'deadline_{name}', {'informational': True}) for name in ENRICHMENT]
+    assert len(year['days']) == len(full['days']) == year['n_days']
+    for day, whole in zip(year['days'], full['days']):
+        assert {k: day[k] for k in DAY_KEYS} == {k: whole[k] for k in DAY_KEYS}
+
+
+def test_fits_drops_the_groups_of_a_late_stage():
+    year = {'skipped': [], 'fields': ('bounds', 'phases', 'supermoon', 'apsides'), 'deadline_ms': 100.0,
+            'deadline': time.perf_counter() + 0.05, 'estimate': {'phase_scan': {'cpu_ms': 80.0}}, 'speed': 1.0}
+    assert not year_pipeline._fits(year, 'phase_scan', ('phases', 'supermoon'), _ignore)
+    assert year['fields'] == ('bounds', 'apsides') and year['skipped'] == ['phase_scan']
+    assert not year_pipeline._fits(year, 'phase_scan', ('phases', 'supermoon'), _ignore)
+    assert year['skipped'] == ['phase_scan']
+    assert year_pipeline._fits(dict(year, deadline=None), 'perigee_scan', ('apsides',), _ignore)
+
+
+def test_deadline_is_capped_by_the_server(monkeypatch):
+    monkeypatch.setattr(year_pipeline, 'DEADLINE_MAX_MS', 5000.0)
+    assert year_pipeline.effective_deadline_ms({'deadline_ms': None}) == 5000.0
+    assert year_pipeline.effective_deadline_ms({'deadline_ms': 60000.0}) == 5000.0
+    assert year_pipeline.effective_deadline_ms({'deadline_ms': 800.0}) == 800.0
+
+
+def test_partial_response_lists_what_was_skipped(client):
+    r = client.get('/calcYear', query_string=dict(SANTIAGO, deadline_ms=1))
+    body = r.get_json()
+    assert r.status_code == 200 and body['ok']
+    assert body['partial'] is True and body['skipped'] == ENRICHMENT and body['deadline_ms'] == 1.0
+    assert body['quality'] != 'approx'      # skips are informational
+    assert 'deadline_alignments' in body['quality_reason_codes']
+    assert 'no-store' in r.headers['Cache-Control'] and 'ETag' not in r.headers
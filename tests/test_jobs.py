@@ -0,0 +1,119 @@
+"""Background jobs: submission, dedup, pricing, execution and result streaming."""
+import json
+import sqlite3
+import threading
+
+import pytest
+
+import jobs
+
+
+@pytest.fixture(autouse=True)
+def jobs_env(tmp_path, monkeypatch):
+    monkeypatch.setenv('JOBS_DIR', str(tmp_path))
+    dispatched = []
+    monkeypatch.setattr(jobs, '_dispatch', dispatched.append)     # run jobs in-process with jobs.execute
+    return dispatched
+
+
+@pytest.fixture(scope='module')
+def client():
+    from app import app
+    return app.test_client()
+
+
+YEAR_LENGTHS = {'first_year': 2024, 'last_year': 2026, 'latitude': 31.77, 'longitude': 35.21}
+
+
+def test_identical_submit_is_deduplicated(jobs_env):
+    row, dedup = jobs.submit('year_lengths', YEAR_LENGTHS)
+    again, dedup_again = jobs.submit('year_lengths', dict(YEAR_LENGTHS))
+    assert (dedup, dedup_again) == (False, True)
+    assert again['id'] == row['id'] and jobs_env == [row['id']]
+
+
+def test_concurrent_submits_insert_one_row():
+    results = []
+
+    def go():
+        results.append(jobs.submit('year_lengths', YEAR_LENGTHS)[0]['id'])
+
+    threads = [threading.Thread(target=go) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(set(results)) == 1
+    with jobs._db() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] == 1
+
+
+def test_unique_index_rejects_a_second_live_row():
+    row, _ = jobs.submit('year_lengths', YEAR_LENGTHS)
+    with jobs._db() as conn, pytest.raises(sqlite3.IntegrityError):
+        conn.execute("INSERT INTO jobs (id, kind, params, dedupe_key, status, created) VALUES (?, ?, ?, ?, ?, ?)",
+                     ('other', row['kind'], row['params'], row['dedupe_key'], jobs.QUEUED, 0.0))
+
+
+def test_failed_job_can_be_resubmitted():
+    row, _ = jobs.submit('year_lengths', YEAR_LENGTHS)
+    with jobs._db() as conn:
+        conn.execute("UPDATE jobs SET status = ? WHERE id = ?", (jobs.FAILED, row['id']))
+    again, dedup = jobs.submit('year_lengths', YEAR_LENGTHS)
+    assert not dedup and again['id'] != row['id']
+
+
+def test_alignment_step_is_clamped_to_what_the_scanners_run():
+    params = {'first_year': 2025, 'last_year': 2025, 'align_step': 0.25}
+    assert jobs._validate_alignments(params)['align_step_hours'] == 1.0
+    fine, _ = jobs.submit('alignments', params)
+    hourly, dedup = jobs.submit('alignments', {'first_year': 2025, 'last_year': 2025, 'align_step_hours': 1})
+    assert dedup and hourly['id'] == fine['id']
+
+
+def test_expensive_job_is_refused(client):
+    params = {'first_year': 1900, 'last_year': 2099, 'align_planets': 'all', 'align_step_hours': 1,
+              'align_aspects': 1, 'align_span_deg': 60}
+    with pytest.raises(jobs.JobError, match='too large'):
+        jobs.submit('alignments', params)
+    r = client.post('/jobs', json={'type': 'alignments', 'params': params})
+    assert r.status_code == 400 and 'too large' in r.get_json()['error']
+
+
+def test_full_queue_answers_429(client, monkeypatch):
+    monkeypatch.setattr(jobs, 'MAX_QUEUED', 2)
+    for year in (2001, 2002):
+        jobs.submit('year_lengths', dict(YEAR_LENGTHS, first_year=year, last_year=year))
+    r = client.post('/jobs', json={'type': 'year_lengths', 'params': dict(YEAR_LENGTHS, first_year=2003)})
+    assert r.status_code == 429 and r.get_json()['ok'] is False
+
+
+def test_execute_status_and_results(client):
+    row, _ = jobs.submit('year_lengths', YEAR_LENGTHS)
+    jobs.execute(row['id'])
+    status = client.get(f"/jobs/{row['id']}").get_json()['job']
+    assert status['status'] == jobs.DONE and status['rows'] == 3 and status['progress'] == 1.0
+    r = client.get(f"/jobs/{row['id']}/results")
+    lines = [json.loads(line) for line in r.get_data(as_text=True).splitlines()]
+    assert [line['gregorian_year'] for line in lines] == [2024, 2025, 2026]
+    assert all(line['days'] in (364, 371) for line in lines)
+    assert client.get('/jobs/nope').status_code == 404
+
+
+def test_follow_ends_when_a_queued_job_never_starts(monkeypatch):
+    monkeypatch.setattr(jobs, 'FOLLOW_IDLE_S', 0.2)
+    monkeypatch.setattr(jobs.time, 'sleep', lambda s: None)
+    row, _ = jobs.submit('year_lengths', YEAR_LENGTHS)
+    assert list(jobs._stream_results(row['id'], follow=True)) == []
+
+
+def test_follow_yields_lines_longer_than_a_read(monkeypatch):
+    monkeypatch.setattr(jobs, 'STREAM_CHUNK', 16)
+    monkeypatch.setattr(jobs, 'FOLLOW_MAX_S', 0.0)     # one pass
+    row, _ = jobs.submit('year_lengths', YEAR_LENGTHS)
+    with jobs._db() as conn:
+        conn.execute("UPDATE jobs SET status = ? WHERE id = ?", (jobs.RUNNING, row['id']))
+    long_line = json.dumps({'x': 'y' * 100})
+    with open(jobs._result_path(row['id']), 'w', encoding='utf-8') as f:
+        f.write(long_line + '\n{"partial": ')
+    assert ''.join(jobs._stream_results(row['id'], follow=True)) == long_line + '\n'
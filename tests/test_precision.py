@@ -0,0 +1,73 @@
+"""Precision tiers: settings per tier, the context variable, and their bounds in the scanners."""
+import pytest
+import swisseph as swe
+
+import year_pipeline
+import year_shards
+from utils import lunar_calc
+from utils import precision
+
+JAN = swe.julday(2025, 1, 1, 0.0)
+
+
+def _offsets_s(events, reference):
+    assert [e['type'] for e in events] == [e['type'] for e in reference]
+    return [abs(e['jd'] - r['jd']) * 86400.0 for e, r in zip(events, reference)]
+
+
+def test_aliases_and_context():
+    assert precision.normalize_precision(' Preview ') == precision.FAST
+    assert precision.normalize_precision('full') == precision.PRECISE
+    assert precision.normalize_precision('exact') is None
+    assert precision.current_precision() == precision.DEFAULT_PRECISION
+    with precision.use_precision('high'):
+        assert precision.current_precision() == precision.PRECISE
+        assert precision.settings() is precision.SETTINGS[precision.PRECISE]
+        assert precision.settings('fast') is precision.SETTINGS[precision.FAST]
+    assert precision.current_precision() == precision.DEFAULT_PRECISION
+
+
+def test_tiers_tighten_in_order():
+    fast, standard, precise = (precision.SETTINGS[t] for t in precision.TIERS)
+    assert fast['bound_s'] > standard['bound_s'] > precise['bound_s']
+    assert fast['phase_step_hours'] > standard['phase_step_hours'] > precise['phase_step_hours']
+    assert set(fast) == set(standard) == set(precise)
+
+
+def test_unknown_tier_is_a_request_error():
+    assert year_pipeline.parse_precision(None) is None
+    assert year_pipeline.parse_precision('preview') == precision.FAST
+    with pytest.raises(year_pipeline.RequestError, match='precision'):
+        year_pipeline.parse_precision('exact')
+
+
+@pytest.mark.parametrize('tier', [precision.FAST, precision.STANDARD])
+def test_phases_within_the_tier_bound(tier):
+    reference = lunar_calc.scan_phase_events_jd(JAN, JAN + 60, precision_tier=precision.PRECISE)
+    events = lunar_calc.scan_phase_events_jd(JAN, JAN + 60, precision_tier=tier)
+    assert max(_offsets_s(events, reference)) <= precision.SETTINGS[tier]['bound_s']
+
+
+def test_apsides_and_cardinal_points_within_the_fast_bound():
+    bound = precision.SETTINGS[precision.FAST]['bound_s']
+    reference = lunar_calc.scan_perigee_apogee_jd(JAN, JAN + 60, precision_tier=precision.PRECISE)
+    events = lunar_calc.scan_perigee_apogee_jd(JAN, JAN + 60, precision_tier=precision.FAST)
+    assert max(_offsets_s(events, reference)) <= bound
+    reference = lunar_calc.solar_cardinal_points_for_year(2025, precision.PRECISE)
+    events = lunar_calc.solar_cardinal_points_for_year(2025, precision.FAST)
+    assert max(_offsets_s(events, reference)) <= bound
+
+
+def test_scanners_and_shards_follow_the_context():
+    explicit = lunar_calc.scan_phase_events_jd(JAN, JAN + 30, precision_tier=precision.FAST)
+    with precision.use_precision(precision.FAST):
+        assert lunar_calc.scan_phase_events_jd(JAN, JAN + 30) == explicit
+        assert year_shards._context()[2] == precision.FAST
+
+
+def test_response_names_the_tier_it_ran():
+    from app import app
+    query = {'datetime': '2025-06-01T12:00:00Z', 'latitude': -33.45, 'longitude': -70.66, 'precision': 'preview'}
+    body = app.test_client().post('/calcYear', json=query).get_json()
+    assert body['ok'] and body['precision'] == precision.FAST
+    assert precision.current_precision() == precision.DEFAULT_PRECISION     # not leaked to this thread
@@ -0,0 +1,42 @@
+"""On-demand profiler: tolerant settings, header-only admin token."""
+import importlib
+
+import pytest
+from flask import Flask, jsonify
+
+import profiling
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv('PROFILE_ADMIN_TOKEN', 'secret')
+    monkeypatch.setenv('PROFILE_DIR', str(tmp_path))
+    app = Flask(__name__)
+
+    @app.route('/ping')
+    def ping():
+        return jsonify({'ok': True})
+
+    profiling.register_profiling(app)
+    return app.test_client()
+
+
+def test_bad_sample_interval_falls_back(monkeypatch):
+    monkeypatch.setenv('PROFILE_SAMPLE_MS', 'fast')
+    try:
+        assert importlib.reload(profiling).SAMPLE_INTERVAL_S == 0.005
+    finally:
+        monkeypatch.delenv('PROFILE_SAMPLE_MS')
+        importlib.reload(profiling)
+
+
+def test_header_token_profiles(client, tmp_path):
+    r = client.get('/ping', headers={'X-Profile': 'cprofile', 'X-Admin-Token': 'secret'})
+    profile_id = r.headers['X-Profile-Id']
+    assert r.get_json()['debug']['profile_id'] == profile_id
+    assert (tmp_path / f"{profile_id}.pstats").exists()
+
+
+def test_query_token_is_ignored(client, tmp_path):
+    r = client.get('/ping?profile=cprofile&admin_token=secret')
+    assert 'X-Profile-Id' not in r.headers and not list(tmp_path.iterdir())
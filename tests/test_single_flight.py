@@ -0,0 +1,101 @@
+"""Cross-process single flight: results only hit the disk when a worker is waiting for them."""
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import single_flight
+
+BACKEND = os.path.dirname(single_flight.__file__)
+
+CHILD = """
+import sys, time, json
+import single_flight
+def compute():
+    time.sleep(float(sys.argv[2]))
+    return {'value': 42}
+result, role = single_flight.do(sys.argv[1], compute)
+print(json.dumps([result, role]))
+"""
+
+pytestmark = pytest.mark.skipif(single_flight.fcntl is None, reason="cross-process coalescing needs fcntl")
+
+
+def _spawn(tmp_path, key, sleep_s):
+    env = dict(os.environ, SINGLE_FLIGHT='1', SINGLE_FLIGHT_DIR=str(tmp_path),
+               PYTHONPATH=os.pathsep.join([BACKEND, os.path.dirname(BACKEND)]))
+    return subprocess.Popen([sys.executable, '-c', CHILD, key, str(sleep_s)], env=env,
+                            stdout=subprocess.PIPE, text=True)
+
+
+def _roles(procs):
+    import json
+    return sorted(json.loads(p.communicate(timeout=60)[0])[1] for p in procs)
+
+
+def test_uncontended_leader_writes_no_result(tmp_path):
+    assert _roles([_spawn(tmp_path, 'k1', 0.0)]) == ['leader']
+    assert not list(tmp_path.glob('*.json'))
+
+
+def test_waiting_worker_gets_the_leaders_result(tmp_path):
+    leader = _spawn(tmp_path, 'k2', 2.0)
+    time.sleep(1.0)     # leader holds the lock by now
+    follower = _spawn(tmp_path, 'k2', 0.0)
+    assert _roles([leader, follower]) == ['leader', 'shared']
+    assert not list(tmp_path.glob('*.waiting'))
+
+
+def test_prune_removes_idle_locks(tmp_path, monkeypatch):
+    monkeypatch.setenv('SINGLE_FLIGHT_DIR', str(tmp_path))
+    old = time.time() - 2 * single_flight.RESULT_TTL_S
+    for name in ('a.lock', 'a.json', 'a.waiting', 'b.lock'):
+        (tmp_path / name).write_text('')
+        if name != 'b.lock':
+            os.utime(tmp_path / name, (old, old))
+    single_flight._prune(time.time() - single_flight.RESULT_TTL_S)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['b.lock']
+
+
+def test_prune_keeps_a_lock_in_use(tmp_path, monkeypatch):
+    monkeypatch.setenv('SINGLE_FLIGHT_DIR', str(tmp_path))
+    path = tmp_path / 'busy.lock'
+    path.write_text('')
+    old = time.time() - 2 * single_flight.RESULT_TTL_S
+    os.utime(path, (old, old))
+    fd = os.open(path, os.O_RDWR)
+    try:
+        single_flight.fcntl.flock(fd, single_flight.fcntl.LOCK_EX)
+        single_flight._prune(time.time() - single_flight.RESULT_TTL_S)
+        assert path.exists()
+    finally:
+        os.close(fd)
+
+
+def test_lock_pruned_between_open_and_flock_is_reopened(tmp_path, monkeypatch):
+    monkeypatch.setenv('SINGLE_FLIGHT_DIR', str(tmp_path))
+    path = str(tmp_path / 'k3.lock')
+    real_open = os.open
+    pruned = []
+
+    def open_then_prune(p, *args, **kwargs):
+        fd = real_open(p, *args, **kwargs)
+        if p == path and not pruned:
+            pruned.append(p)
+            single_flight._remove_idle_lock(p)      # the pruner wins the race once
+        return fd
+
+    monkeypatch.setattr(single_flight.os, 'open', open_then_prune)
+
+    def compute():
+        # the lock we run under is the one another worker would open now
+        probe = real_open(path, os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            return single_flight._try_lock(probe)
+        finally:
+            os.close(probe)
+
+    other_got_lock, role = single_flight._across_processes('k3', compute, None)
+    assert pruned and role == 'leader' and other_got_lock is False
@@ -0,0 +1,58 @@
+"""Polar sunset policies: polar days get a defined boundary, never JD 0 or an exception."""
+import pytest
+import swisseph as swe
+
+from utils import approx_calendar
+from utils import sunsets
+
+TROMSO = (69.65, 18.96)
+
+
+def _jd0(y, m, d):
+    return swe.julday(y, m, d, 0.0)
+
+
+@pytest.mark.parametrize('date, state', [
+    ((2025, 6, 21), sunsets.MIDNIGHT_SUN),
+    ((2025, 12, 21), sunsets.POLAR_NIGHT),
+    ((2025, 3, 21), sunsets.NORMAL),
+])
+def test_polar_state(date, state):
+    _jd, got = sunsets.sunset_jd(_jd0(*date), *TROMSO, sunsets.POLICY_NEAREST_LATITUDE)
+    assert got == state
+
+
+def test_nearest_latitude_keeps_days_whole_through_polar_night():
+    jd0s = [_jd0(2025, 11, 20) + k for k in range(60)]       # polar night ~Nov 28 .. Jan 14
+    out = [sunsets.sunset_jd(j, *TROMSO, sunsets.POLICY_NEAREST_LATITUDE) for j in jd0s]
+    assert {state for _jd, state in out} == {sunsets.NORMAL, sunsets.POLAR_NIGHT}
+    for j, (s, _state) in zip(jd0s, out):
+        assert j < s < j + 1.0
+    # every Enoch day stays ~24 h: the substitute latitude jumps by under an hour at the edges
+    lengths = [b[0] - a[0] for a, b in zip(out, out[1:])]
+    assert all(abs(length - 1.0) < 1.5 / 24 for length in lengths)
+
+
+def test_civil_midnight_ends_the_local_date():
+    jd0 = _jd0(2025, 12, 21)
+    jd, state = sunsets.sunset_jd(jd0, *TROMSO, sunsets.POLICY_CIVIL_MIDNIGHT)
+    assert state == sunsets.POLAR_NIGHT
+    assert jd == pytest.approx(sunsets.civil_midnight_jd(jd0, TROMSO[1]))
+    assert jd == pytest.approx(jd0 + 1.0 - TROMSO[1] / 360.0, abs=1e-6)
+
+
+def test_policy_context_and_aliases():
+    assert sunsets.normalize_policy('midnight') == sunsets.POLICY_CIVIL_MIDNIGHT
+    assert sunsets.normalize_policy('noon') is None
+    with sunsets.use_policy('civil_midnight'):
+        assert sunsets.current_policy() == sunsets.POLICY_CIVIL_MIDNIGHT
+    assert sunsets.current_policy() == sunsets.DEFAULT_POLICY
+
+
+@pytest.mark.parametrize('policy', sunsets.POLICIES)
+def test_approx_engine_follows_the_policy(policy):
+    jd0 = _jd0(2025, 12, 21)
+    hours, polar = approx_calendar.sunset_ut_hours([jd0], *TROMSO, policy)
+    assert int(polar[0]) == -1
+    precise, _ = sunsets.sunset_jd(jd0, *TROMSO, policy)
+    assert jd0 + float(hours[0]) / 24.0 == pytest.approx(precise, abs=15 / 1440)
@@ -0,0 +1,59 @@
+"""Sharded years: the pool gives the serial result, and its Swiss calls are counted for the request."""
+import pytest
+import swisseph as swe
+
+import year_pipeline
+import year_shards
+from utils import swe_profiler
+from utils import timing
+
+SANTIAGO = {'datetime': '2025-06-01T12:00', 'latitude': -33.45, 'longitude': -70.66, 'timezone': 'America/Santiago'}
+
+
+@pytest.fixture(scope='module')
+def pool():
+    saved = year_shards.MAX_WORKERS
+    year_shards.MAX_WORKERS = 2
+    swe_profiler.install()
+    yield 2
+    year_shards._reset_pool()
+    year_shards.MAX_WORKERS = saved
+
+
+def _ignore(*args, **kwargs):
+    pass
+
+
+def test_map_shards_matches_serial(pool):
+    jd0s = [swe.julday(2025, 3, 1, 0.0) + k for k in range(64)]
+    serial = year_shards.sunset_shard(jd0s, -33.45, -70.66)
+    assert year_shards.map_shards(year_shards.sunset_shard, jd0s, pool, lat=-33.45, lon=-70.66) == serial
+
+
+def test_worker_calls_are_merged_into_the_request(pool):
+    jds = [swe.julday(2031, 1, 1, 12.0) + k for k in range(64)]     # not in any cache yet
+    token = timing.begin()
+    try:
+        out = year_shards.map_shards(year_shards.sun_moon_shard, jds, pool)
+    finally:
+        rec = timing.end(token)
+    assert len(out) == len(jds) and None not in out
+    swiss = sum(n for name, n in rec.counters.items() if name.startswith('swe.'))
+    assert swiss >= len(jds)
+    assert rec.stages['workers'] > 0
+
+
+def test_merge_timing_adds_counters_and_worker_stages():
+    rec = timing.Timing()
+    for _ in range(2):
+        year_shards.merge_timing(rec, {'total': 0.5, 'stages': {'x': 0.25}, 'counters': {'swe.calc': 3}})
+    assert rec.counters == {'swe.calc': 6} and rec.stages == {'workers': 1.0, 'workers.x': 0.5}
+
+
+def test_sharded_year_matches_serial(pool):
+    params = year_pipeline.parse_year_request(dict(SANTIAGO, align_planets='seven', align_step_hours=6,
+                                                   align_aspects=1))
+    serial = year_pipeline.run_year(dict(params, workers=1), _ignore, deadline_ms=0)
+    sharded = year_pipeline.run_year(dict(params, workers=pool), _ignore, deadline_ms=0)
+    assert sharded['workers'] == pool
+    assert sharded['days'] == serial['days']
@@ -0,0 +1,10 @@
+"""Make the repo root and backend/ importable for scripts run as `python tools/<name>.py`."""
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BACKEND = os.path.join(ROOT, 'backend')
+
+for _p in (BACKEND, ROOT):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
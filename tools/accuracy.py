@@ -0,0 +1,351 @@
+"""
+Differential accuracy harness: precise reference path vs accelerated path.
+
+Every check draws random dates (and locations where relevant) from a seeded
+RNG, runs the reference and the fast implementation on the same input and
+collects the deviation per output field. A field passes when the chosen
+statistic (max, p99, rate, ...) is within its tolerance.
+
+    python tools/accuracy.py                           # all checks, table
+    python tools/accuracy.py --only phases --samples 200
+    python tools/accuracy.py --years 1800:2200 --seed 7
+    python tools/accuracy.py --tol sunset.seconds=60 --json
+
+Checks (reference → candidate):
+    delta_t    swe.deltat → utils.delta_t table
+    sunset     swe.rise_trans → approx_calendar.sunset_jd (NOAA)
+    phases     lunar_calc.scan_phase_events_jd → meeus_lunar.phase_events_jd
+    apsides    lunar_calc.scan_perigee_apogee_jd → meeus_lunar.perigee_apogee_events_jd
+    phase_angle  lunar_calc.sun_moon_state → meeus_lunar.phase_angle_jd
+    sign_mix   lunar_calc.lunar_sign_mix → lunar_calc.lunar_sign_mix_linear
+    enoch      enoch.calculate_enoch_date → approx_calendar.enoch_from_jd
+    moshier    Swiss files → Moshier tier (planet longitudes)
+
+Exit code is 1 when any field is over tolerance, so a fast mode should only be
+switched on once this is green for the year range it will serve. The default
+tolerances are tuned for the default --years range; wide ranges show known
+drift (NOAA sunsets ~10 min and Moshier outer planets ~10' by 3000 BCE) and
+need explicit --tol overrides.
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import _paths  # noqa: F401  (repo root + backend on sys.path)
+
+import swisseph as swe
+
+# field → (statistic, limit). Rates are fractions of samples (0..1).
+TOLERANCES = {
+    'delta_t.seconds': ('max', 0.5),
+    'sunset.seconds': ('p99', 120.0),
+    'sunset.missing': ('rate', 0.0),
+    'phases.minutes': ('max', 5.0),
+    'phases.unmatched': ('rate', 0.0),
+    'apsides.minutes': ('p95', 90.0),
+    'apsides.unmatched': ('rate', 0.0),
+    'phase_angle.degrees': ('max', 10.0),
+    'sign_mix.share_delta': ('p99', 0.05),
+    'sign_mix.primary_mismatch': ('rate', 0.02),
+    'enoch.day_mismatch': ('rate', 0.02),
+    'enoch.year_start_seconds': ('p95', 180.0),
+    'moshier.arcsec': ('max', 5.0),
+}
+
+PLANETS = (swe.SUN, swe.MOON, swe.MERCURY, swe.VENUS, swe.MARS, swe.JUPITER, swe.SATURN)
+
+
+def _random_jd(rng, years):
+    y = rng.randint(years[0], years[1])
+    return swe.julday(y, 1, 1, 0.0) + rng.uniform(0.0, 365.0)
+
+
+def _random_location(rng, max_lat):
+    return rng.uniform(-max_lat, max_lat), rng.uniform(-180.0, 180.0)
+
+
+def _jd_to_dt(jd):
+    y, mo, d, hour = swe.revjul(jd)
+    return datetime(int(y), int(mo), int(d), tzinfo=timezone.utc) + timedelta(hours=hour)
+
+
+def _datetime_years(years):
+    """lunar_sign_mix works on datetimes: clamp the range to years 1..9998."""
+    return max(1, years[0]), min(9998, max(1, years[1]))
+
+
+def _match_events(ref, fast, window_days=1.0):
+    """Pair events by type and nearest time; returns (deviations in minutes, unmatched flags)."""
+    minutes, unmatched = [], []
+    used = set()
+    for ev in ref:
+        best = None
+        for i, cand in enumerate(fast):
+            if cand['type'] != ev['type'] or i in used:
+                continue
+            d = abs(cand['jd'] - ev['jd'])
+            if d <= window_days and (best is None or d < best[1]):
+                best = (i, d)
+        if best is None:
+            unmatched.append(1)
+            continue
+        used.add(best[0])
+        minutes.append(best[1] * 1440.0)
+        unmatched.append(0)
+    unmatched.extend(1 for i in range(len(fast)) if i not in used)
+    return minutes, unmatched
+
+
+def check_delta_t(rng, samples, years, max_lat):
+    from utils import delta_t
+    dev = []
+    for _ in range(samples):
+        jd = _random_jd(rng, years)
+        dev.append(abs(delta_t.delta_t_days(jd) - swe.deltat(jd)) * 86400.0)
+    return {'seconds': dev}
+
+
+def check_sunset(rng, samples, years, max_lat):
+    from utils import approx_calendar
+    from utils.ephemeris import ephe_flag
+    dev, missing = [], []
+    for _ in range(samples):
+        lat, lon = _random_location(rng, max_lat)
+        jd0 = float(approx_calendar._local_day0(_random_jd(rng, years), lon))
+        fast = float(approx_calendar.sunset_jd(jd0, lat, lon))
+        # nearest true sunset: search from half a day before the estimate
+        try:
+            res, tret = swe.rise_trans(fast - 0.5, swe.SUN, 2, (lon, lat, 0), flags=ephe_flag())
+        except Exception:
+            res, tret = -1, None
+        if res != 0 or not tret or not tret[0]:
+            missing.append(1)
+            continue
+        missing.append(0)
+        dev.append(abs(tret[0] - fast) * 86400.0)
+    return {'seconds': dev, 'missing': missing}
+
+
+def check_phases(rng, samples, years, max_lat):
+    from utils import lunar_calc, meeus_lunar
+    dev, unmatched = [], []
+    for _ in range(max(1, samples // 10)):
+        start = _random_jd(rng, years)
+        end = start + 60.0
+        # events within a day of the window edges may legitimately fall on either side
+        inner = lambda evs: [e for e in evs if start + 1.0 <= e['jd'] <= end - 1.0]
+        ref = inner(lunar_calc.scan_phase_events_jd(start, end))
+        fast = inner(meeus_lunar.phase_events_jd(start, end))
+        m, u = _match_events(ref, fast)
+        dev.extend(m)
+        unmatched.extend(u)
+    return {'minutes': dev, 'unmatched': unmatched}
+
+
+def check_apsides(rng, samples, years, max_lat):
+    from utils import lunar_calc, meeus_lunar
+    dev, unmatched = [], []
+    for _ in range(max(1, samples // 10)):
+        start = _random_jd(rng, years)
+        end = start + 90.0
+        inner = lambda evs: [e for e in evs if start + 2.0 <= e['jd'] <= end - 2.0]
+        ref = inner(lunar_calc.scan_perigee_apogee_jd(start, end))
+        fast = inner(meeus_lunar.perigee_apogee_events_jd(start, end))
+        m, u = _match_events(ref, fast, window_days=2.0)
+        dev.extend(m)
+        unmatched.extend(u)
+    return {'minutes': dev, 'unmatched': unmatched}
+
+
+def check_phase_angle(rng, samples, years, max_lat):
+    from utils import lunar_calc, meeus_lunar
+    dev = []
+    for _ in range(samples):
+        jd = _random_jd(rng, years)
+        ref = lunar_calc.sun_moon_state(jd)[2]
+        fast, _illum = meeus_lunar.phase_angle_jd(jd)
+        dev.append(abs((float(fast) - ref + 180.0) % 360.0 - 180.0))
+    return {'degrees': dev}
+
+
+def check_sign_mix(rng, samples, years, max_lat):
+    from utils import lunar_calc
+    years = _datetime_years(years)
+    share, mismatch = [], []
+    for _ in range(samples):
+        start = _jd_to_dt(_random_jd(rng, years))
+        end = start + timedelta(hours=rng.uniform(23.0, 25.0))
+        ref = lunar_calc.lunar_sign_mix(start, end)
+        fast = lunar_calc.lunar_sign_mix_linear(start, end)
+        shares = {}
+        for mix, sgn in ((ref, 1.0), (fast, -1.0)):
+            for key in ('primary', 'secondary'):
+                sign = mix.get(f'{key}_sign')
+                if sign:
+                    shares[sign] = shares.get(sign, 0.0) + sgn * float(mix.get(f'{key}_pct') or 0.0)
+        share.append(max((abs(v) for v in shares.values()), default=0.0))
+        mismatch.append(int(ref.get('primary_sign') != fast.get('primary_sign')))
+    return {'share_delta': share, 'primary_mismatch': mismatch}
+
+
+def check_enoch(rng, samples, years, max_lat):
+    from utils import approx_calendar
+    from utils.enoch import calculate_enoch_date, find_enoch_year_start
+    day_mismatch, start_dev = [], []
+    for _ in range(samples):
+        lat, lon = _random_location(rng, max_lat)
+        jd = _random_jd(rng, years)
+        with contextlib.redirect_stdout(io.StringIO()):
+            ref = calculate_enoch_date(jd, lon, lat)
+            ref_start = find_enoch_year_start(jd, lon, lat)
+        fast = approx_calendar.enoch_from_jd(jd, lat, lon)
+        fast_start = float(approx_calendar.enoch_year_start_for_jd(jd, lat, lon))
+        same = (int(fast['enoch_year']) == ref['enoch_year']
+                and int(fast['enoch_day_of_year']) == ref['enoch_day_of_year'])
+        day_mismatch.append(0 if same else 1)
+        start_dev.append(abs(fast_start - ref_start) * 86400.0)
+    return {'day_mismatch': day_mismatch, 'year_start_seconds': start_dev}
+
+
+def check_moshier(rng, samples, years, max_lat):
+    from utils import ephemeris
+    from utils.delta_t import ut_to_tt
+    dev = []
+    swiss = ephemeris.TIER_FLAGS[ephemeris.TIER_SWISS]
+    moshier = ephemeris.TIER_FLAGS[ephemeris.TIER_MOSHIER]
+    for _ in range(samples):
+        jd = _random_jd(rng, years)
+        if not (ephemeris.swiss_files_cover(jd) and ephemeris.moshier_covers(jd)):
+            continue
+        jd_tt = ut_to_tt(jd)
+        for body in PLANETS:
+            a = swe.calc(jd_tt, body, swiss)[0][0]
+            b = swe.calc(jd_tt, body, moshier)[0][0]
+            dev.append(abs((b - a + 180.0) % 360.0 - 180.0) * 3600.0)
+    return {'arcsec': dev}
+
+
+CHECKS = {
+    'delta_t': check_delta_t,
+    'sunset': check_sunset,
+    'phases': check_phases,
+    'apsides': check_apsides,
+    'phase_angle': check_phase_angle,
+    'sign_mix': check_sign_mix,
+    'enoch': check_enoch,
+    'moshier': check_moshier,
+}
+
+
+def _percentile(sorted_vals, q):
+    if not sorted_vals:
+        return None
+    idx = min(len(sorted_vals) - 1, max(0, int(math.ceil(q / 100.0 * len(sorted_vals))) - 1))
+    return sorted_vals[idx]
+
+
+def summarize(values) -> dict:
+    vals = sorted(float(v) for v in values)
+    if not vals:
+        return {'n': 0}
+    return {
+        'n': len(vals),
+        'max': vals[-1],
+        'mean': sum(vals) / len(vals),
+        'rate': sum(1 for v in vals if v) / len(vals),
+        'p50': _percentile(vals, 50),
+        'p95': _percentile(vals, 95),
+        'p99': _percentile(vals, 99),
+    }
+
+
+def evaluate(field: str, stats: dict, tolerances: dict):
+    """Return (ok, stat_name, limit); fields without a tolerance are reported only."""
+    tol = tolerances.get(field)
+    if tol is None or not stats.get('n'):
+        return True, None, None
+    stat, limit = tol
+    return stats[stat] <= limit, stat, limit
+
+
+def _parse_years(text: str):
+    lo, _, hi = text.partition(':')
+    lo, hi = int(lo), int(hi or lo)
+    if lo > hi:
+        lo, hi = hi, lo
+    return lo, hi
+
+
+def _parse_tol(items, tolerances: dict) -> dict:
+    out = dict(tolerances)
+    for item in items or []:
+        field, _, value = item.partition('=')
+        stat, limit = out.get(field, ('max', None))
+        if ':' in value:
+            stat, value = value.split(':', 1)
+        out[field] = (stat, float(value))
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Compare accelerated paths against the precise reference.")
+    ap.add_argument('--only', action='append', choices=sorted(CHECKS), help="run only this check (repeatable)")
+    ap.add_argument('--samples', type=int, default=100, help="samples per check (event checks use samples/10 windows)")
+    ap.add_argument('--seed', type=int, default=1)
+    ap.add_argument('--years', default='1800:2200', help="Gregorian year range, e.g. -3000:3000")
+    ap.add_argument('--max-lat', type=float, default=60.0, help="largest |latitude| for random locations")
+    ap.add_argument('--tol', action='append', metavar='FIELD=[STAT:]LIMIT',
+                    help="override a tolerance, e.g. sunset.seconds=p95:60")
+    ap.add_argument('--json', action='store_true', help="print a JSON report")
+    args = ap.parse_args(argv)
+
+    years = _parse_years(args.years)
+    tolerances = _parse_tol(args.tol, TOLERANCES)
+    report = {'seed': args.seed, 'years': list(years), 'samples': args.samples, 'checks': {}}
+    failed = []
+    for name in (args.only or list(CHECKS)):
+        rng = random.Random(f"{args.seed}:{name}")
+        t0 = time.perf_counter()
+        try:
+            fields = CHECKS[name](rng, max(1, args.samples), years, args.max_lat)
+        except Exception as e:
+            failed.append(f"{name}: error {e}")
+            report['checks'][name] = {'error': str(e)}
+            if not args.json:
+                print(f"{name:<12} ERROR {e}", flush=True)
+            continue
+        entry = {'seconds': round(time.perf_counter() - t0, 2), 'fields': {}}
+        for field, values in fields.items():
+            key = f"{name}.{field}"
+            stats = summarize(values)
+            ok, stat, limit = evaluate(key, stats, tolerances)
+            entry['fields'][field] = dict(stats, ok=ok, stat=stat, limit=limit)
+            if not ok:
+                failed.append(f"{key}: {stat}={stats[stat]:.4g} > {limit:g}")
+            if not args.json:
+                if not stats.get('n'):
+                    print(f"{key:<28} n=0 (skipped)", flush=True)
+                    continue
+                verdict = 'PASS' if ok else 'FAIL'
+                tol_txt = f"{stat}<={limit:g}" if stat else 'report only'
+                print(f"{key:<28} n={stats['n']:<5} max={stats['max']:<10.4g} p50={stats['p50']:<10.4g} "
+                      f"p95={stats['p95']:<10.4g} p99={stats['p99']:<10.4g} rate={stats['rate']:<7.3f} "
+                      f"{verdict} ({tol_txt})", flush=True)
+        report['checks'][name] = entry
+
+    report['failed'] = failed
+    if args.json:
+        print(json.dumps(report, indent=2))
+    for f in failed:
+        print(f"[accuracy] {f}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""
+Benchmark suite for the calendar, chart and scanner hot paths.
+
+Fixed scenarios run in-process (Flask test client for the routes, direct calls
+for the scanners). Each one reports wall time (min and median over --repeat
+runs, caches cleared before every run) and Swiss Ephemeris call counts.
+
+    python tools/bench.py                         # table
+    python tools/bench.py --filter calc_year --repeat 5
+    python tools/bench.py --json -o bench.json    # machine-readable
+    python tools/bench.py --save-baseline tools/bench_baseline.json
+    python tools/bench.py --baseline tools/bench_baseline.json --tolerance 0.25
+
+With --baseline, scenarios slower than baseline × (1 + tolerance) or with more
+ephemeris calls than the baseline are flagged and the exit code is 1.
+Timings are machine-specific: regenerate the baseline on the machine you
+compare on; call counts are portable.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import _paths  # noqa: F401  (repo root + backend on sys.path)
+
+from utils import swe_profiler
+
+SANTIAGO = {'latitude': -33.45, 'longitude': -70.66, 'timezone': 'America/Santiago'}
+SINGAPORE = {'latitude': 1.35, 'longitude': 103.82, 'timezone': 'Asia/Singapore'}
+TROMSO = {'latitude': 69.65, 'longitude': 18.96, 'timezone': 'Europe/Oslo'}
+JERUSALEM = {'latitude': 31.77, 'longitude': 35.21, 'timezone': 'UTC'}
+
+# 2025 Enoch year span (Tuesday-sunset start in Santiago), used by scanner scenarios
+SPAN_START_JD = 2460754.4
+SPAN_END_JD = SPAN_START_JD + 364.0
+
+
+def _year(extra=None, **loc):
+    payload = {'datetime': '2025-06-01T12:00'}
+    payload.update(loc or SANTIAGO)
+    payload.update(extra or {})
+    return payload
+
+
+# name → (kind, payload or callable factory)
+SCENARIOS = {
+    'calc_year_tropical': ('post', '/calcYear', _year(**SINGAPORE)),
+    'calc_year_midlat': ('post', '/calcYear', _year(**SANTIAGO)),
+    'calc_year_subpolar': ('post', '/calcYear', _year(**TROMSO)),
+    'calc_year_bce': ('post', '/calcYear', _year({'datetime': '-002971-03-25T21:24:00Z'}, **JERUSALEM)),
+    'calc_year_approx': ('post', '/calcYear', _year({'approx': 1})),
+    'calc_year_fast': ('post', '/calcYear', _year({'precision': 'fast'})),
+    'calc_year_precise': ('post', '/calcYear', _year({'precision': 'precise'})),
+    'calc_year_align_seven_24h': ('post', '/calcYear', _year({'align_planets': 'seven', 'align_step_hours': 24})),
+    'calc_year_align_aspects_6h': ('post', '/calcYear', _year({'align_planets': 'seven', 'align_step_hours': 6, 'align_aspects': 1})),
+    'calc_year_align_aspects_1h': ('post', '/calcYear', _year({'align_planets': 'seven', 'align_step_hours': 1, 'align_aspects': 1})),
+    'calculate_single': ('post', '/calculate', {'datetime': '1990-01-01T10:00', **SANTIAGO}),
+    'scan_phase_events': ('call', 'scan_phase_events_jd', None),
+    'scan_perigee_apogee': ('call', 'scan_perigee_apogee_jd', None),
+    'scan_eclipses': ('call', 'scan_eclipses_global_jd', None),
+    'scan_alignments_24h': ('call', 'scan_alignments_simple_jd', {'step_hours': 24.0}),
+    'scan_pair_aspects_6h': ('call', 'scan_pair_aspects_jd', {'step_hours': 6.0, 'planet_mode': 'seven'}),
+    'solar_cardinal_points': ('call', 'solar_cardinal_points_for_year', None),
+    'lunar_sign_mix_year': ('call', 'lunar_sign_mix', None),
+}
+
+_client = None
+
+
+def _get_client():
+    global _client
+    if _client is None:
+        real_stdout = sys.stdout
+        sys.stdout = open(os.devnull, 'w')
+        try:
+            from app import app
+        finally:
+            sys.stdout = real_stdout
+        _client = app.test_client()
+    return _client
+
+
+def clear_caches():
+    """Reset memoization so every run measures cold work."""
+    import year_pipeline
+    from utils import lunar_calc, sunsets
+    for module in (lunar_calc, sunsets, year_pipeline):
+        for name in dir(module):
+            fn = getattr(module, name)
+            if callable(getattr(fn, 'cache_clear', None)):
+                fn.cache_clear()
+
+
+def _scanner_call(fn_name: str, kwargs):
+    from datetime import datetime, timedelta, timezone
+    from utils import lunar_calc
+    kwargs = dict(kwargs or {})
+    fn = getattr(lunar_calc, fn_name)
+    if fn_name == 'solar_cardinal_points_for_year':
+        return lambda: fn(2025)
+    if fn_name == 'lunar_sign_mix':
+        start = datetime(2025, 3, 19, 22, 0, tzinfo=timezone.utc)
+
+        def run():
+            for i in range(364):
+                fn(start + timedelta(days=i), start + timedelta(days=i + 1))
+        return run
+    return lambda: fn(SPAN_START_JD, SPAN_END_JD, **kwargs)
+
+
+def warm_up(names):
+    """One-time process costs (imports, ΔT table, app setup) stay out of the first scenario."""
+    from utils import delta_t
+    delta_t.delta_t_days(2451545.0)
+    if any(SCENARIOS[n][0] == 'post' for n in names):
+        _get_client()
+
+
+def run_scenario(name: str, repeat: int) -> dict:
+    kind, target, arg = SCENARIOS[name]
+    if kind == 'post':
+        client = _get_client()
+        run = lambda: client.post(target, json=arg)
+    else:
+        run = _scanner_call(target, arg)
+    times = []
+    calls = {}
+    status = None
+    devnull = open(os.devnull, 'w')
+    for i in range(repeat):
+        clear_caches()
+        real_stdout = sys.stdout
+        sys.stdout = devnull
+        try:
+            with swe_profiler.profile() as prof:
+                t0 = time.perf_counter()
+                res = run()
+                times.append(time.perf_counter() - t0)
+        finally:
+            sys.stdout = real_stdout
+        if kind == 'post':
+            status = res.status_code
+        if i == 0:
+            calls = {k: v['calls'] for k, v in prof.summary().items()}
+    devnull.close()
+    out = {
+        'name': name,
+        'min_ms': round(min(times) * 1000.0, 2),
+        'median_ms': round(statistics.median(times) * 1000.0, 2),
+        'swe_calls': sum(calls.values()),
+        'swe_calls_by_function': calls,
+    }
+    if status is not None:
+        out['status'] = status
+    return out
+
+
+def compare(results: list, baseline: dict, tolerance: float) -> list:
+    """Return a list of regression messages."""
+    base = {r['name']: r for r in baseline.get('results', [])}
+    problems = []
+    for r in results:
+        b = base.get(r['name'])
+        if not b:
+            continue
+        if r['min_ms'] > b['min_ms'] * (1.0 + tolerance):
+            problems.append(f"{r['name']}: {r['min_ms']:.1f} ms vs baseline {b['min_ms']:.1f} ms "
+                            f"(+{(r['min_ms'] / max(b['min_ms'], 1e-9) - 1) * 100:.0f}%)")
+        if r['swe_calls'] > b.get('swe_calls', r['swe_calls']):
+            problems.append(f"{r['name']}: {r['swe_calls']} ephemeris calls vs baseline {b['swe_calls']}")
+        if r.get('status') and r['status'] >= 500:
+            problems.append(f"{r['name']}: HTTP {r['status']}")
+    return problems
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark calendar/chart/scanner hot paths.")
+    ap.add_argument('--filter', action='append', help="run scenarios whose name contains this (repeatable)")
+    ap.add_argument('--list', action='store_true', help="list scenarios and exit")
+    ap.add_argument('--repeat', type=int, default=3)
+    ap.add_argument('--json', action='store_true', help="print JSON instead of a table")
+    ap.add_argument('-o', '--output', help="also write the JSON report to this file")
+    ap.add_argument('--save-baseline', metavar='FILE', help="write results as the new baseline")
+    ap.add_argument('--baseline', metavar='FILE', help="compare against a stored baseline")
+    ap.add_argument('--tolerance', type=float, default=0.20, help="allowed slowdown vs baseline (0.20 = 20%%)")
+    args = ap.parse_args(argv)
+
+    names = list(SCENARIOS)
+    if args.filter:
+        names = [n for n in names if any(f in n for f in args.filter)]
+    if args.list:
+        print('\n'.join(names))
+        return 0
+
+    swe_profiler.install()
+    warm_up(names)
+    results = []
+    for name in names:
+        r = run_scenario(name, max(1, args.repeat))
+        results.append(r)
+        if not args.json:
+            print(f"{name:<30} min={r['min_ms']:>10.1f} ms  median={r['median_ms']:>10.1f} ms  swe_calls={r['swe_calls']:>8}",
+                  flush=True)
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'repeat': args.repeat,
+        'results': results,
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as fh:
+                json.dump(report, fh, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as fh:
+            problems = compare(results, json.load(fh), args.tolerance)
+        for p in problems:
+            print(f"[regression] {p}", file=sys.stderr)
+        if problems:
+            return 1
+        print(f"[bench] no regressions vs {args.baseline}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Compare Swiss (.se1 files) and Moshier (analytic) ephemeris tiers.
+
+Each tier runs in a fresh subprocess so the peak RSS and the cold (first call)
+latencies are not polluted by the other tier's file cache.
+
+    python tools/bench_ephemeris_tiers.py
+    python tools/bench_ephemeris_tiers.py --calls 20000 --json
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+TIERS = ('swiss', 'moshier')
+
+
+def _timed(fn, n):
+    t0 = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - t0) / max(n, 1) * 1e6   # µs per call
+
+
+def run_tier(tier: str, calls: int, year_requests: int) -> dict:
+    """Benchmark one tier inside the current process."""
+    sys.path[:0] = [ROOT, os.path.join(ROOT, 'backend')]
+    import swisseph as swe
+    from utils import ephemeris
+    from utils.lunar_calc import _sun_moon_state_raw
+    from utils.planet_positions import calculate_planets
+
+    swe.set_ephe_path(str(ephemeris.EPHE_PATH))
+    out = {'tier': tier}
+    base_jd = 2460000.5
+    with ephemeris.use_tier(tier):
+        flag = ephemeris.ephe_flag()
+        t0 = time.perf_counter()
+        _sun_moon_state_raw(base_jd, flag)
+        out['first_call_ms'] = (time.perf_counter() - t0) * 1e3
+        out['sun_moon_us'] = _timed(lambda i: _sun_moon_state_raw(base_jd + i * 0.37, flag), calls)
+        out['sun_moon_bce_us'] = _timed(lambda i: _sun_moon_state_raw(base_jd - 1800000 + i * 0.37, flag), calls)
+        out['planets_chart_us'] = _timed(lambda i: calculate_planets(base_jd + i * 3.1, -33.45, -70.66), max(calls // 10, 1))
+        geopos = (-70.66, -33.45, 0)
+        out['sunset_us'] = _timed(lambda i: swe.rise_trans(base_jd + i, swe.SUN, 2, geopos, flags=flag), max(calls // 10, 1))
+        out['eclipse_search_us'] = _timed(lambda i: swe.sol_eclipse_when_glob(base_jd + i * 200, flag, 0), 20)
+
+    from app import app
+    client = app.test_client()
+    payload = {'datetime': '2025-06-01T12:00', 'latitude': -33.45, 'longitude': -70.66,
+               'timezone': 'America/Santiago', 'ephemeris': tier}
+    lat = []
+    for i in range(year_requests):
+        payload['datetime'] = f'{2000 + i}-06-01T12:00'
+        t0 = time.perf_counter()
+        r = client.post('/calcYear', json=payload)
+        lat.append((time.perf_counter() - t0) * 1e3)
+        out['calc_year_ephemeris'] = (r.get_json() or {}).get('ephemeris')
+    out['calc_year_ms'] = sorted(lat)[len(lat) // 2] if lat else None
+    out['max_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark Swiss vs Moshier ephemeris tiers.")
+    ap.add_argument('--calls', type=int, default=10000, help="Sun/Moon calls per measurement")
+    ap.add_argument('--years', type=int, default=3, help="/calcYear requests per tier (median reported)")
+    ap.add_argument('--json', action='store_true', help="print JSON instead of a table")
+    ap.add_argument('--tier', choices=TIERS, help=argparse.SUPPRESS)   # worker mode
+    args = ap.parse_args(argv)
+
+    if args.tier:
+        # Quiet the request logs of calc_year; only the JSON result goes to stdout
+        real_stdout = sys.stdout
+        sys.stdout = open(os.devnull, 'w')
+        res = run_tier(args.tier, args.calls, args.years)
+        sys.stdout = real_stdout
+        print(json.dumps(res))
+        return 0
+
+    results = []
+    for tier in TIERS:
+        cmd = [sys.executable, os.path.abspath(__file__), '--tier', tier,
+               '--calls', str(args.calls), '--years', str(args.years)]
+        proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(proc.stderr, file=sys.stderr)
+            return 1
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    keys = [k for k in results[0] if k != 'tier']
+    print(f"{'metric':<20}" + ''.join(f"{r['tier']:>14}" for r in results))
+    for k in keys:
+        cells = []
+        for r in results:
+            v = r.get(k)
+            cells.append(f"{v:>14.2f}" if isinstance(v, float) else f"{str(v):>14}")
+        print(f"{k:<20}" + ''.join(cells))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
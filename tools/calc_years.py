@@ -0,0 +1,85 @@
+"""
+Build precise Enoch years from the command line, one day per JSONL line (the
+same rows as the 'calendar' job of backend/jobs.py).
+
+    python tools/calc_years.py --lat 31.77 --lon 35.21 --first 2020 --last 2030 -o years.jsonl
+    python tools/calc_years.py --lat 69.65 --lon 18.96 --first 2025 --workers 4 --fields grid
+    python tools/calc_years.py --lat 31.77 --lon 35.21 --first 2025 --params '{"align_planets": "seven"}'
+
+--workers shards each year's day columns and alignment scans across a process
+pool (backend/year_shards.py); YEAR_WORKERS defaults to it here.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import _paths  # noqa: F401  (repo root + backend on sys.path)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Build precise Enoch years as JSONL (one day per line).")
+    ap.add_argument('--lat', type=float, required=True)
+    ap.add_argument('--lon', type=float, required=True)
+    ap.add_argument('--first', type=int, required=True, help="first Gregorian year (the Enoch year starting in it)")
+    ap.add_argument('--last', type=int, help="last Gregorian year (default: --first)")
+    ap.add_argument('--fields', help="fields/include groups, e.g. grid or bounds,moon,phases")
+    ap.add_argument('--precision', help="fast | standard | precise")
+    ap.add_argument('--polar-policy', help="nearest_latitude | civil_midnight")
+    ap.add_argument('--ephemeris', help="swiss | moshier | auto")
+    ap.add_argument('--workers', type=int, default=1, help="worker processes per year")
+    ap.add_argument('--params', help="extra /calcYear options as a JSON object")
+    ap.add_argument('-o', '--output', help="output file (default: stdout)")
+    args = ap.parse_args(argv)
+
+    # read by year_shards at import
+    os.environ.setdefault('YEAR_WORKERS', str(max(1, args.workers)))
+    import jobs
+    from reasons import ReasonCollector
+
+    params = json.loads(args.params) if args.params else {}
+    params.update(latitude=args.lat, longitude=args.lon, first_year=args.first,
+                  last_year=args.last if args.last is not None else args.first, workers=args.workers)
+    for key, value in (('fields', args.fields), ('precision', args.precision),
+                       ('polar_policy', args.polar_policy), ('ephemeris', args.ephemeris)):
+        if value is not None:
+            params[key] = value
+    validate, run = jobs.JOB_TYPES['calendar']
+    try:
+        params = validate(params)
+    except jobs.JobError as e:
+        print(f"[calc_years] {e}", file=sys.stderr)
+        return 2
+
+    reasons = ReasonCollector('calc_years')
+
+    def record_reason(code, msg, exc=None, informational=False):
+        reasons.record(code, msg, exc, informational=informational)
+
+    def progress(fraction, note=None):
+        print(f"[calc_years] {fraction * 100:5.1f}% {note or ''}", file=sys.stderr, flush=True)
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    started = time.perf_counter()
+    rows = 0
+    try:
+        # calc_year logs progress on stdout; keep it off the JSONL stream
+        real_stdout = sys.stdout
+        sys.stdout = sys.stderr
+        try:
+            for day in run(params, progress, record_reason):
+                out.write(json.dumps(day, ensure_ascii=False) + '\n')
+                rows += 1
+        finally:
+            sys.stdout = real_stdout
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"[calc_years] {rows} days in {time.perf_counter() - started:.1f} s"
+          + (f" reasons={reasons.summary()}" if reasons else ''), file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,285 @@
+"""
+HTTP load generator for /calcYear and /calculate.
+
+By default the app is started in-process on a threaded werkzeug server bound to
+127.0.0.1 (random port) and hit over real HTTP; pass --url to load an instance
+that is already running (gunicorn, docker, staging) instead.
+
+    python tools/loadtest.py                                  # 60 s, concurrency 4
+    python tools/loadtest.py --concurrency 8 --duration 120
+    python tools/loadtest.py --requests 200 --mix hot=1,calculate=1
+    python tools/loadtest.py --url http://127.0.0.1:5000 --json > load.json
+
+Payload mix (--mix kind=weight,...):
+    hot         /calcYear, popular cities, current year
+    random      /calcYear, random location and year 1900..2100
+    bce         /calcYear, random year 3000..500 BCE
+    approx      /calcYear with approx=1
+    alignments  /calcYear with seven-planet alignments + aspects at 1 h steps
+    calculate   /calculate, popular cities, random date
+
+Reports throughput, latency percentiles and error rate, overall and per kind.
+Exit code is 1 when the error rate exceeds --max-error-rate.
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+
+import _paths  # noqa: F401  (repo root + backend on sys.path)
+
+HOT_CITIES = [
+    {'latitude': -33.45, 'longitude': -70.66, 'timezone': 'America/Santiago'},
+    {'latitude': 31.77, 'longitude': 35.21, 'timezone': 'Asia/Jerusalem'},
+    {'latitude': 40.71, 'longitude': -74.01, 'timezone': 'America/New_York'},
+    {'latitude': 19.43, 'longitude': -99.13, 'timezone': 'America/Mexico_City'},
+    {'latitude': -23.55, 'longitude': -46.63, 'timezone': 'America/Sao_Paulo'},
+    {'latitude': 51.51, 'longitude': -0.13, 'timezone': 'Europe/London'},
+    {'latitude': 40.42, 'longitude': -3.70, 'timezone': 'Europe/Madrid'},
+]
+
+DEFAULT_MIX = 'hot=6,random=2,bce=1,approx=1,alignments=0.5,calculate=4'
+
+
+def _hot_year(rng):
+    payload = {'datetime': time.strftime('%Y-%m-%dT12:00')}
+    payload.update(rng.choice(HOT_CITIES))
+    return '/calcYear', payload
+
+
+def _random_year(rng):
+    return '/calcYear', {
+        'datetime': f"{rng.randint(1900, 2100):04d}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00",
+        'latitude': round(rng.uniform(-60.0, 60.0), 2),
+        'longitude': round(rng.uniform(-180.0, 180.0), 2),
+        'timezone': 'UTC',
+    }
+
+
+def _bce_year(rng):
+    return '/calcYear', {
+        'datetime': f"-{rng.randint(500, 3000):06d}-03-25T12:00:00Z",
+        'latitude': 31.77,
+        'longitude': 35.21,
+        'timezone': 'UTC',
+    }
+
+
+def _approx_year(rng):
+    path, payload = _hot_year(rng)
+    payload['approx'] = 1
+    return path, payload
+
+
+def _alignments_year(rng):
+    path, payload = _hot_year(rng)
+    payload.update({'align_planets': 'seven', 'align_step_hours': 1, 'align_aspects': 1})
+    return path, payload
+
+
+def _calculate(rng):
+    payload = {'datetime': f"{rng.randint(1940, 2020)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T"
+                           f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}"}
+    payload.update(rng.choice(HOT_CITIES))
+    return '/calculate', payload
+
+
+PAYLOADS = {
+    'hot': _hot_year,
+    'random': _random_year,
+    'bce': _bce_year,
+    'approx': _approx_year,
+    'alignments': _alignments_year,
+    'calculate': _calculate,
+}
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in (text or '').split(','):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in PAYLOADS:
+            raise ValueError(f"unknown payload kind '{name}' (choose from {', '.join(PAYLOADS)})")
+        mix[name] = float(weight or 1.0)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("empty payload mix")
+    return mix
+
+
+def start_local_server(host='127.0.0.1', port=0):
+    """Run the app on a threaded werkzeug server in a daemon thread; returns (base_url, server)."""
+    from werkzeug.serving import make_server
+    # synthetic traffic should not fill the slow-request capture file
+    os.environ.setdefault('SLOW_REQUEST_MS', '0')
+    from app import app
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    app.logger.setLevel(logging.ERROR)
+    server = make_server(host, port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='loadtest-server', daemon=True).start()
+    return f"http://{host}:{server.server_port}", server
+
+
+def _post(base_url: str, path: str, payload: dict, timeout: float):
+    data = json.dumps(payload).encode('utf-8')
+    req = urllib.request.Request(base_url + path, data=data, method='POST',
+                                 headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except Exception as e:
+        return type(e).__name__
+
+
+class LoadRun:
+    """Shared state for the worker threads: request budget, deadline and samples."""
+
+    def __init__(self, base_url, mix, concurrency, duration, max_requests, timeout, seed):
+        self.base_url = base_url
+        self.kinds = list(mix)
+        self.weights = [mix[k] for k in self.kinds]
+        self.concurrency = concurrency
+        self.duration = duration
+        self.max_requests = max_requests
+        self.timeout = timeout
+        self.seed = seed
+        self.samples = []          # (kind, status, seconds)
+        self._issued = 0
+        self._lock = threading.Lock()
+
+    def _take(self) -> bool:
+        with self._lock:
+            if self.max_requests and self._issued >= self.max_requests:
+                return False
+            self._issued += 1
+            return True
+
+    def _worker(self, idx: int, deadline: float):
+        rng = random.Random(f"{self.seed}:{idx}")
+        while time.perf_counter() < deadline and self._take():
+            kind = rng.choices(self.kinds, weights=self.weights)[0]
+            path, payload = PAYLOADS[kind](rng)
+            t0 = time.perf_counter()
+            status = _post(self.base_url, path, payload, self.timeout)
+            elapsed = time.perf_counter() - t0
+            with self._lock:
+                self.samples.append((kind, status, elapsed))
+
+    def run(self) -> float:
+        deadline = time.perf_counter() + (self.duration if self.duration else float('inf'))
+        threads = [threading.Thread(target=self._worker, args=(i, deadline), daemon=True)
+                   for i in range(self.concurrency)]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return time.perf_counter() - t0
+
+
+def _percentile(sorted_vals, q):
+    if not sorted_vals:
+        return None
+    idx = min(len(sorted_vals) - 1, max(0, int(math.ceil(q / 100.0 * len(sorted_vals))) - 1))
+    return sorted_vals[idx]
+
+
+def summarize(samples, wall_s: float) -> dict:
+    lat = sorted(s[2] for s in samples)
+    errors = sum(1 for s in samples if not (isinstance(s[1], int) and s[1] < 400))
+    ms = lambda v: round(v * 1000.0, 1) if v is not None else None
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+        'rps': round(len(samples) / wall_s, 2) if wall_s > 0 else 0.0,
+        'p50_ms': ms(_percentile(lat, 50)),
+        'p95_ms': ms(_percentile(lat, 95)),
+        'p99_ms': ms(_percentile(lat, 99)),
+        'max_ms': ms(lat[-1] if lat else None),
+        'status': {str(k): v for k, v in sorted(Counter(s[1] for s in samples).items(), key=lambda kv: str(kv[0]))},
+    }
+
+
+def _row(name, s):
+    return (f"{name:<12} n={s['requests']:<6} rps={s['rps']:<8} p50={s['p50_ms']}ms p95={s['p95_ms']}ms "
+            f"p99={s['p99_ms']}ms max={s['max_ms']}ms errors={s['errors']} ({s['error_rate'] * 100:.1f}%) "
+            f"status={s['status']}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Load-test /calcYear and /calculate.")
+    ap.add_argument('--url', help="base URL of a running instance (default: start the app in-process)")
+    ap.add_argument('--concurrency', '-c', type=int, default=4)
+    ap.add_argument('--duration', '-d', type=float, default=60.0, help="seconds (0 = until --requests)")
+    ap.add_argument('--requests', '-n', type=int, default=0, help="stop after N requests (0 = no limit)")
+    ap.add_argument('--mix', default=DEFAULT_MIX, help=f"payload weights (default {DEFAULT_MIX})")
+    ap.add_argument('--warmup', type=int, default=2, help="untimed requests per payload kind before the run")
+    ap.add_argument('--timeout', type=float, default=120.0, help="per-request timeout in seconds")
+    ap.add_argument('--seed', type=int, default=1)
+    ap.add_argument('--max-error-rate', type=float, default=0.01)
+    ap.add_argument('--json', action='store_true', help="print a JSON report")
+    args = ap.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        ap.error(str(e))
+    if not args.duration and not args.requests:
+        ap.error("need --duration or --requests")
+
+    server = None
+    base_url = (args.url or '').rstrip('/')
+    real_stdout = sys.stdout
+    if not base_url:
+        # calc_year prints progress for every request; keep the report readable
+        sys.stdout = open(os.devnull, 'w')
+        base_url, server = start_local_server()
+    try:
+        rng = random.Random(f"{args.seed}:warmup")
+        for kind in mix:
+            for _ in range(max(0, args.warmup)):
+                _post(base_url, *PAYLOADS[kind](rng), timeout=args.timeout)
+        run = LoadRun(base_url, mix, max(1, args.concurrency), args.duration, args.requests,
+                      args.timeout, args.seed)
+        wall = run.run()
+    finally:
+        if server is not None:
+            server.shutdown()
+            sys.stdout.close()
+            sys.stdout = real_stdout
+
+    report = {
+        'target': args.url or 'in-process',
+        'concurrency': args.concurrency,
+        'mix': mix,
+        'wall_s': round(wall, 2),
+        'overall': summarize(run.samples, wall),
+        'by_kind': {k: summarize([s for s in run.samples if s[0] == k], wall) for k in mix},
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"target={report['target']} concurrency={args.concurrency} wall={report['wall_s']}s")
+        print(_row('overall', report['overall']))
+        for kind, s in report['by_kind'].items():
+            if s['requests']:
+                print(_row(kind, s))
+    return 1 if report['overall']['error_rate'] > args.max_error_rate else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+Replay requests captured by backend/slow_capture.py against the app in-process
+(Flask test client, no network).
+
+    python tools/replay_slow.py /tmp/astral-slow.jsonl
+    python tools/replay_slow.py capture.jsonl --path /calcYear --limit 20 --jobs 2
+    python tools/replay_slow.py capture.jsonl --profile profiles/   # one .pstats per case
+    python tools/replay_slow.py capture.jsonl --json > replay.json
+
+For every case it prints the captured duration next to the replayed one and the
+slowest stages from the Server-Timing header.
+"""
+import argparse
+import cProfile
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+import _paths  # noqa: F401  (repo root + backend on sys.path)
+
+_client = None
+
+
+def load_cases(paths, route=None, limit=None):
+    cases = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as fh:
+            for line_no, line in enumerate(fh, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    print(f"[replay] {path}:{line_no}: invalid JSON, skipped", file=sys.stderr)
+                    continue
+                if route and entry.get('path') != route:
+                    continue
+                entry['_source'] = f"{os.path.basename(path)}:{line_no}"
+                cases.append(entry)
+    if limit:
+        cases = cases[:limit]
+    return cases
+
+
+def _get_client():
+    global _client
+    if _client is None:
+        # calc_year prints progress on stdout; keep replay output readable
+        real_stdout = sys.stdout
+        sys.stdout = open(os.devnull, 'w')
+        try:
+            from app import app
+        finally:
+            sys.stdout = real_stdout
+        _client = app.test_client()
+    return _client
+
+
+def _parse_server_timing(value: str) -> dict:
+    out = {}
+    for part in (value or '').split(','):
+        name, _, dur = part.strip().partition(';dur=')
+        if name and dur:
+            try:
+                out[name] = float(dur)
+            except ValueError:
+                pass
+    return out
+
+
+def replay_case(args):
+    """Replay one case; returns a result dict (runs in worker processes too)."""
+    entry, profile_dir, repeat = args
+    client = _get_client()
+    method = (entry.get('method') or 'POST').upper()
+    query = dict(entry.get('query') or {})
+    results = []
+    prof = cProfile.Profile() if profile_dir else None
+    devnull = open(os.devnull, 'w')
+    for _ in range(max(1, repeat)):
+        real_stdout = sys.stdout
+        sys.stdout = devnull
+        t0 = time.perf_counter()
+        try:
+            if prof:
+                prof.enable()
+            resp = client.open(entry['path'], method=method, query_string=query,
+                               json=entry.get('payload') if method != 'GET' else None)
+        finally:
+            if prof:
+                prof.disable()
+            sys.stdout = real_stdout
+        results.append(((time.perf_counter() - t0) * 1000.0, resp))
+    devnull.close()
+    best_ms, resp = min(results, key=lambda r: r[0])
+    out = {
+        'source': entry.get('_source'),
+        'path': entry['path'],
+        'captured_ms': entry.get('duration_ms'),
+        'replay_ms': round(best_ms, 1),
+        'status': resp.status_code,
+        'captured_status': entry.get('status'),
+        'stages_ms': _parse_server_timing(resp.headers.get('Server-Timing')),
+    }
+    if prof:
+        os.makedirs(profile_dir, exist_ok=True)
+        name = (entry.get('_source') or 'case').replace(':', '_').replace(os.sep, '_')
+        out['profile'] = os.path.join(profile_dir, f"{name}.pstats")
+        prof.dump_stats(out['profile'])
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Replay captured slow requests in-process.")
+    ap.add_argument('captures', nargs='+', help="JSONL capture file(s)")
+    ap.add_argument('--path', help="only replay this route (e.g. /calcYear)")
+    ap.add_argument('--limit', type=int, help="replay at most N cases")
+    ap.add_argument('--repeat', type=int, default=1, help="runs per case (best time reported)")
+    ap.add_argument('--jobs', type=int, default=1, help="worker processes")
+    ap.add_argument('--profile', metavar='DIR', help="write a cProfile .pstats per case to DIR")
+    ap.add_argument('--json', action='store_true', help="print results as JSON")
+    args = ap.parse_args(argv)
+
+    cases = load_cases(args.captures, args.path, args.limit)
+    if not cases:
+        print("[replay] no cases", file=sys.stderr)
+        return 1
+    work = [(c, args.profile, args.repeat) for c in cases]
+    if args.jobs > 1:
+        with Pool(processes=args.jobs) as pool:
+            results = pool.map(replay_case, work)
+    else:
+        results = [replay_case(w) for w in work]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            top = sorted(r['stages_ms'].items(), key=lambda kv: -kv[1])
+            stages = ' '.join(f"{k}={v:.0f}" for k, v in top[:5])
+            print(f"{r['source']:<28} {r['path']:<12} status={r['status']} "
+                  f"captured={r['captured_ms']}ms replay={r['replay_ms']}ms  {stages}")
+    failed = sum(1 for r in results if r['status'] >= 500)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,276 @@
+"""
+Vectorized approximate Enoch calendar engine (NumPy, no Swiss ephemeris files).
+
+Array versions of the approximate helpers used by calc_year: NOAA sunsets,
+lunar phase (Meeus quarter instants), Enoch year starts (Tuesday sunset nearest the Meeus
+mean March equinox) and day-of-year → month/day mapping. Calendar conversions are
+done with integer arithmetic on Julian Day Numbers (proleptic Gregorian, same
+convention as swe.julday/swe.revjul defaults), so a whole span of days is
+handled with a handful of array operations instead of per-day julday/revjul
+round trips and day-of-week loops.
+
+    from utils.approx_calendar import approx_calendar_span
+    cols = approx_calendar_span(-3000, 2100, 31.77, 35.21)   # ~1.9M days
+
+CLI (CSV to stdout):
+    python -m utils.approx_calendar -3000 -2990 --lat 31.77 --lon 35.21
+"""
+import argparse
+import csv
+import sys
+
+import numpy as np
+
+from utils import meeus_lunar
+from utils import sunsets
+from utils.delta_t import tt_to_ut
+
+MONTHS = np.array([30, 30, 31, 30, 30, 31, 30, 30, 31, 30, 30, 31])
+MONTH_STARTS = np.concatenate(([0], np.cumsum(MONTHS)[:-1]))  # day index where each month begins
+REFERENCE_GREG_YEAR = 2025
+REFERENCE_ENOCH_YEAR = 5996
+WEDNESDAY = 2                    # JDN % 7: 0 = Monday (same as swe.day_of_week)
+
+# Shift used to keep integer calendar arithmetic on positive numbers for BCE dates
+_CYCLE_DAYS = 146097 * 40   # 40 Gregorian cycles = 16000 years
+_CYCLE_YEARS = 16000
+
+
+def _arr(x):
+    return np.asarray(x, dtype=float)
+
+
+def ymd_to_jd0(y, m, d):
+    """JD at 0h UT for proleptic Gregorian dates (arrays or scalars)."""
+    y = np.asarray(y, dtype=np.int64) + _CYCLE_YEARS
+    m = np.asarray(m, dtype=np.int64)
+    d = np.asarray(d, dtype=np.int64)
+    a = (14 - m) // 12
+    yy = y + 4800 - a
+    mm = m + 12 * a - 3
+    jdn = d + (153 * mm + 2) // 5 + 365 * yy + yy // 4 - yy // 100 + yy // 400 - 32045
+    return (jdn - _CYCLE_DAYS) - 0.5
+
+
+def jd_to_ymd(jd):
+    """Proleptic Gregorian (year, month, day) arrays of the UT civil date containing each JD."""
+    jdn = np.floor(_arr(jd) + 0.5).astype(np.int64) + _CYCLE_DAYS
+    f = jdn + 1401 + (((4 * jdn + 274277) // 146097) * 3) // 4 - 38
+    e = 4 * f + 3
+    g = (e % 1461) // 4
+    h = 5 * g + 2
+    day = (h % 153) // 5 + 1
+    month = ((h // 153 + 2) % 12) + 1
+    year = e // 1461 - 4716 + (14 - month) // 12
+    return year - _CYCLE_YEARS, month, day
+
+
+def day_of_week(jd):
+    """Day-of-week index of the UT civil date (0 = Monday), like swe.day_of_week."""
+    return np.floor(_arr(jd) + 0.5).astype(np.int64) % 7
+
+
+def sunset_ut_hours(jd0, lat, lon, polar_policy=None):
+    """
+    NOAA-like sunset for the local date starting at jd0 (0h UT), as hours after jd0.
+    Unlike the scalar helper, the result is not wrapped into 0..24 UT, so far-west
+    longitudes keep their sunset on the right local date. Returns (hours, polar) where
+    polar is 0 on normal days, 1 for midnight sun and -1 for polar night; those days
+    follow the sunsets polar policy (nearest latitude where the Sun sets, or local
+    civil midnight).
+    """
+    jd0 = _arr(jd0)
+    lat = _arr(lat)
+    lon = _arr(lon)
+    y, _m, _d = jd_to_ymd(jd0)
+    n = jd0 - ymd_to_jd0(y, 1, 1) + 1
+    lng_hour = lon / 15.0
+    t = n + ((18 - lng_hour) / 24.0)
+    M = (0.9856 * t) - 3.289
+    L = M + 1.916 * np.sin(np.radians(M)) + 0.020 * np.sin(np.radians(2 * M)) + 282.634
+    L = np.mod(L, 360.0)
+    RA = np.mod(np.degrees(np.arctan(0.91764 * np.tan(np.radians(L)))), 360.0)
+    RA = (RA + (np.floor(L / 90) * 90 - np.floor(RA / 90) * 90)) / 15.0
+    sin_dec = 0.39782 * np.sin(np.radians(L))
+    cos_dec = np.cos(np.arcsin(sin_dec))
+
+    def cos_hour_angle(phi):
+        return (np.cos(np.radians(90.833)) - sin_dec * np.sin(np.radians(phi))) / (cos_dec * np.cos(np.radians(phi)))
+
+    cos_h = cos_hour_angle(lat)
+    polar = np.where(cos_h < -1, 1, np.where(cos_h > 1, -1, 0)).astype(np.int8)
+    policy = sunsets.normalize_policy(polar_policy) or sunsets.current_policy()
+    if polar.any() and policy == sunsets.POLICY_NEAREST_LATITUDE:
+        dec = np.degrees(np.arcsin(sin_dec))
+        same = (lat >= 0) == (dec >= 0)
+        limit = np.where(same, 90.0 + sunsets.H0_DEG, 90.0 - sunsets.H0_DEG) - np.abs(dec)
+        lat_sub = np.where(polar, np.copysign(limit - sunsets.MARGIN_DEG, lat), lat)
+        cos_h = cos_hour_angle(lat_sub)
+    H = np.degrees(np.arccos(np.clip(cos_h, -1.0, 1.0))) / 15.0
+    local_t = np.mod(H + RA - (0.06571 * t) - 6.622, 24.0)
+    ut = local_t - lng_hour
+    if policy == sunsets.POLICY_CIVIL_MIDNIGHT:
+        ut = np.where(polar, 24.0 - lng_hour, ut)
+    return ut, polar
+
+
+def sunset_jd(jd0, lat, lon, polar_policy=None):
+    """Sunset JD (UT) for the local date starting at each jd0."""
+    jd0 = _arr(jd0)
+    hours, _polar = sunset_ut_hours(jd0, lat, lon, polar_policy)
+    return jd0 + hours / 24.0
+
+
+def lunar_phase(jd):
+    """Phase angle and illuminated fraction interpolated between Meeus quarter instants."""
+    return meeus_lunar.phase_angle_jd(_arr(jd))
+
+
+def march_equinox_jd(year):
+    """
+    Mean March equinox (UT JD) from Meeus ch. 27 without the periodic terms:
+    within ~30 min for -1000..3000, and it follows the real equinox as it drifts
+    through the proleptic Gregorian calendar instead of a fixed 20-Mar date.
+    """
+    year = np.asarray(year, dtype=float)
+    y = year / 1000.0
+    early = 1721139.29189 + 365242.13740 * y + 0.06134 * y**2 + 0.00111 * y**3 - 0.00071 * y**4
+    y = (year - 2000.0) / 1000.0
+    late = 2451623.80984 + 365242.37404 * y + 0.05169 * y**2 - 0.00411 * y**3 - 0.00057 * y**4
+    return tt_to_ut(np.where(year < 1000, early, late))
+
+
+def enoch_year_start_for_greg_year(year, lat, lon):
+    """
+    Start boundary (Tuesday sunset) of the Enoch year anchored on the March equinox
+    of each Gregorian year. Mirrors enoch.find_enoch_year_start: take the Wednesdays
+    (local LMT date) on either side of the equinox and keep the Tuesday sunset
+    before them that lies closest to the equinox.
+    """
+    year = np.asarray(year, dtype=np.int64)
+    anchor = march_equinox_jd(year)
+    day0 = _local_day0(anchor, lon)                # 0h UT of the equinox's local date
+    dow = day_of_week(day0)
+    wed_before = day0 - np.mod(dow - WEDNESDAY, 7)
+    wed_after = day0 + np.mod(WEDNESDAY - dow, 7)
+    s_before = sunset_jd(wed_before - 1.0, lat, lon)
+    s_after = sunset_jd(wed_after - 1.0, lat, lon)
+    use_before = np.abs(s_before - anchor) < np.abs(s_after - anchor)
+    return np.where(use_before, s_before, s_after)
+
+
+def enoch_year_start_for_jd(jd, lat, lon):
+    """Start boundary JD of the Enoch year containing each JD."""
+    jd = _arr(jd)
+    y, _m, _d = jd_to_ymd(jd)
+    start = enoch_year_start_for_greg_year(y, lat, lon)
+    prev = enoch_year_start_for_greg_year(y - 1, lat, lon)
+    return np.where(jd < start, prev, start)
+
+
+def enoch_year_number(start_jd):
+    """Enoch year from the Gregorian year of its start boundary (2025 → 5996)."""
+    y, _m, _d = jd_to_ymd(start_jd)
+    return REFERENCE_ENOCH_YEAR + (y - REFERENCE_GREG_YEAR)
+
+
+def enoch_month_day(day_of_year):
+    """Month/day for 1-based day-of-year arrays; the added week extends month 12 (32..38)."""
+    idx = np.asarray(day_of_year, dtype=np.int64) - 1
+    m_idx = np.searchsorted(MONTH_STARTS, idx, side='right') - 1
+    return m_idx + 1, idx - MONTH_STARTS[m_idx] + 1
+
+
+def enoch_from_jd(jd, lat, lon):
+    """Vectorized approximate Enoch mapping; returns a dict of arrays."""
+    jd = _arr(jd)
+    start = enoch_year_start_for_jd(jd, lat, lon)
+    doy = np.floor(jd - start).astype(np.int64) + 1
+    month, day = enoch_month_day(doy)
+    return {
+        'enoch_year': enoch_year_number(start),
+        'enoch_month': month,
+        'enoch_day': day,
+        'enoch_day_of_year': doy,
+        'added_week': doy > 364,
+    }
+
+
+def _local_day0(jd, lon):
+    """0h UT of the local (LMT) civil date containing each JD."""
+    return np.floor(_arr(jd) + _arr(lon) / 360.0 + 0.5) - 0.5
+
+
+def _iso_date(y, m, d) -> str:
+    return f"{int(y):04d}-{int(m):02d}-{int(d):02d}" if y >= 0 else f"{int(y)}-{int(m):02d}-{int(d):02d}"
+
+
+def iso_utc(jd) -> list:
+    """ISO-like UTC strings (extended years allowed) for an array of JDs, whole seconds."""
+    jd = _arr(jd)
+    secs = np.round((jd + 0.5 - np.floor(jd + 0.5)) * 86400.0).astype(np.int64)
+    day_jd = np.floor(jd + 0.5) - 0.5 + (secs // 86400)
+    secs = secs % 86400
+    y, m, d = jd_to_ymd(day_jd)
+    hh, rem = np.divmod(secs, 3600)
+    mi, ss = np.divmod(rem, 60)
+    return [f"{_iso_date(*ymd)}T{h:02d}:{n:02d}:{s:02d}Z"
+            for ymd, h, n, s in zip(zip(y.tolist(), m.tolist(), d.tolist()), hh.tolist(), mi.tolist(), ss.tolist())]
+
+
+def approx_calendar_span(first_greg_year: int, last_greg_year: int, lat: float, lon: float) -> dict:
+    """
+    Columns for every Enoch day of the years starting in [first_greg_year, last_greg_year].
+    Year lengths (364/371) come from consecutive start boundaries.
+    """
+    years = np.arange(int(first_greg_year), int(last_greg_year) + 2)
+    starts = enoch_year_start_for_greg_year(years, lat, lon)
+    lengths = np.rint(np.diff(starts)).astype(np.int64)
+    starts = starts[:-1]
+    total = int(lengths.sum())
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    year_idx = np.repeat(np.arange(len(starts)), lengths)
+    doy = np.arange(total) - offsets[year_idx] + 1
+    greg0 = _local_day0(starts, lon)[year_idx] + doy
+    end = sunset_jd(greg0, lat, lon)
+    start = sunset_jd(greg0 - 1.0, lat, lon)
+    phase, illum = lunar_phase(greg0 + 0.5)
+    month, day = enoch_month_day(doy)
+    return {
+        'enoch_year': (REFERENCE_ENOCH_YEAR + years[:-1] - REFERENCE_GREG_YEAR)[year_idx],
+        'enoch_month': month,
+        'enoch_day': day,
+        'day_of_year': doy,
+        'added_week': doy > 364,
+        'jd0': greg0,
+        'start_jd': start,
+        'end_jd': end,
+        'moon_phase_angle_deg': phase,
+        'moon_illum': illum,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Approximate Enoch calendar for a span of Gregorian years (CSV).")
+    ap.add_argument("first_year", type=int)
+    ap.add_argument("last_year", type=int)
+    ap.add_argument("--lat", type=float, required=True)
+    ap.add_argument("--lon", type=float, required=True)
+    args = ap.parse_args(argv)
+    cols = approx_calendar_span(args.first_year, args.last_year, args.lat, args.lon)
+    y, m, d = jd_to_ymd(cols['jd0'])
+    start_iso = iso_utc(cols['start_jd'])
+    end_iso = iso_utc(cols['end_jd'])
+    w = csv.writer(sys.stdout)
+    w.writerow(['gregorian', 'enoch_year', 'enoch_month', 'enoch_day', 'day_of_year', 'added_week',
+                'start_utc', 'end_utc', 'moon_phase_angle_deg', 'moon_illum'])
+    for i in range(len(cols['jd0'])):
+        w.writerow([_iso_date(int(y[i]), int(m[i]), int(d[i])), int(cols['enoch_year'][i]), int(cols['enoch_month'][i]),
+                    int(cols['enoch_day'][i]), int(cols['day_of_year'][i]), bool(cols['added_week'][i]),
+                    start_iso[i], end_iso[i], round(float(cols['moon_phase_angle_deg'][i]), 3),
+                    round(float(cols['moon_illum'][i]), 6)])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
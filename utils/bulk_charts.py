@@ -0,0 +1,310 @@
+"""
+Bulk natal-chart engine.
+
+Reads birth records (CSV or JSONL with datetime, timezone, latitude, longitude and
+an optional id), computes planets + ASC/MC/houses for each one and streams the
+results to JSONL, CSV or Parquet. Work is sharded across a process pool; each
+worker sets the ephemeris path once and reuses it for every chart.
+
+Library use:
+    from utils.bulk_charts import iter_records, run_bulk
+    for res in run_bulk(iter_records("members.csv"), workers=4):
+        ...
+
+CLI use (from the repo root):
+    python -m utils.bulk_charts members.csv -o charts.jsonl --workers 4
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+import pytz
+import swisseph as swe
+
+from utils.datetime_local import localize_datetime
+from utils.jd_time_utils import parse_iso_to_jd
+from utils.planet_positions import calculate_planets
+from utils.asc_mc_houses import calculate_asc_mc_and_houses
+
+EPHE_PATH = Path(__file__).resolve().parent.parent / "sweph" / "ephe"
+
+PLANET_NAMES = ["Sun", "Moon", "Mercury", "Venus", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune", "Pluto"]
+
+# Accepted column aliases for each input field
+FIELD_ALIASES = {
+    "datetime": ("datetime", "date", "birth_datetime"),
+    "timezone": ("timezone", "tz"),
+    "latitude": ("latitude", "lat"),
+    "longitude": ("longitude", "lon", "lng"),
+    "id": ("id", "member_id", "record_id"),
+}
+
+
+def _pick(rec: dict, field: str):
+    for key in FIELD_ALIASES[field]:
+        val = rec.get(key)
+        if val is not None and val != "":
+            return val
+    return None
+
+
+def iter_records(path, fmt: str = None):
+    """Yield (row_number, dict) for each input record. Format is guessed from the extension."""
+    path = str(path)
+    if fmt is None:
+        fmt = "jsonl" if path.endswith((".jsonl", ".ndjson", ".json")) else "csv"
+    stream = sys.stdin if path == "-" else open(path, "r", encoding="utf-8", newline="")
+    try:
+        if fmt == "jsonl":
+            for i, line in enumerate(stream, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield i, json.loads(line)
+                except Exception as e:
+                    # Keep the row so the worker reports it instead of aborting the run
+                    yield i, {"_parse_error": f"invalid JSON: {e}"}
+        else:
+            # Row 1 is the header
+            for i, row in enumerate(csv.DictReader(stream), start=2):
+                yield i, row
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def record_to_jd(rec: dict):
+    """Return (jd_ut, latitude, longitude) for one record; raises ValueError when malformed."""
+    if rec.get("_parse_error"):
+        raise ValueError(rec["_parse_error"])
+    date_str = _pick(rec, "datetime")
+    if not date_str:
+        raise ValueError("missing datetime")
+    try:
+        latitude = float(_pick(rec, "latitude"))
+        longitude = float(_pick(rec, "longitude"))
+    except (TypeError, ValueError):
+        raise ValueError("missing or invalid latitude/longitude")
+    if not (-90.0 <= latitude <= 90.0) or not (-180.0 <= longitude <= 180.0):
+        raise ValueError("latitude/longitude out of range")
+    tz_str = _pick(rec, "timezone") or "UTC"
+    try:
+        dt = localize_datetime(str(date_str), tz_str)
+        utc_dt = dt.astimezone(pytz.utc)
+        jd = swe.julday(
+            utc_dt.year, utc_dt.month, utc_dt.day,
+            utc_dt.hour + utc_dt.minute / 60 + utc_dt.second / 3600 + utc_dt.microsecond / 3600000000
+        )
+    except pytz.UnknownTimeZoneError:
+        raise ValueError(f"unknown timezone: {tz_str}")
+    except Exception:
+        # Extended ISO (BCE or explicit offset), same fallback as /calculate
+        try:
+            jd = parse_iso_to_jd(str(date_str))
+        except Exception:
+            raise ValueError(f"unparseable datetime: {date_str}")
+    return jd, latitude, longitude
+
+
+def compute_chart(row: int, rec: dict) -> dict:
+    """Compute one chart. Never raises: malformed rows come back with an 'error' key."""
+    out = {"row": row, "id": _pick(rec, "id")}
+    try:
+        jd, latitude, longitude = record_to_jd(rec)
+        out["julian_day"] = jd
+        out["planets"] = calculate_planets(jd, latitude, longitude)
+        out["houses_data"] = calculate_asc_mc_and_houses(jd, latitude, longitude)
+    except Exception as e:
+        out["error"] = str(e)
+    return out
+
+
+def _init_worker(ephe_path: str):
+    """Per-process ephemeris state: set the path once, every chart in this worker reuses it."""
+    swe.set_ephe_path(ephe_path)
+
+
+def _compute_chunk(chunk):
+    return [compute_chart(row, rec) for row, rec in chunk]
+
+
+def _chunks(records, size: int):
+    buf = []
+    for item in records:
+        buf.append(item)
+        if len(buf) >= size:
+            yield buf
+            buf = []
+    if buf:
+        yield buf
+
+
+def run_bulk(records, workers: int = None, chunk_size: int = 256, ephe_path: str = None):
+    """
+    Compute charts for an iterable of (row, record) pairs, yielding results in input order.
+    workers=1 runs in-process (handy for tests and profiling).
+    """
+    ephe_path = str(ephe_path or EPHE_PATH)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        _init_worker(ephe_path)
+        for chunk in _chunks(records, chunk_size):
+            yield from _compute_chunk(chunk)
+        return
+    with Pool(processes=workers, initializer=_init_worker, initargs=(ephe_path,)) as pool:
+        for results in pool.imap(_compute_chunk, _chunks(records, chunk_size)):
+            yield from results
+
+
+# --- Output writers ---
+
+def flatten_chart(res: dict) -> dict:
+    """Flatten a chart result into one column per value (used by the CSV/Parquet writers)."""
+    flat = {"row": res.get("row"), "id": res.get("id"), "julian_day": res.get("julian_day")}
+    planets = res.get("planets") or {}
+    for name in PLANET_NAMES:
+        p = planets.get(name) or {}
+        flat[f"{name.lower()}_lon"] = p.get("longitude")
+        flat[f"{name.lower()}_lat"] = p.get("latitude")
+        flat[f"{name.lower()}_dist"] = p.get("distance")
+    houses = res.get("houses_data") or {}
+    flat["asc_deg"] = (houses.get("ascendant") or {}).get("degree")
+    flat["mc_deg"] = (houses.get("midheaven") or {}).get("degree")
+    cusps = {h.get("house"): h.get("degree") for h in (houses.get("houses") or [])}
+    for i in range(1, 13):
+        flat[f"house_{i}_deg"] = cusps.get(i)
+    flat["error"] = res.get("error") or houses.get("error")
+    return flat
+
+
+class JsonlWriter:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, res: dict):
+        self.stream.write(json.dumps(res, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self.stream.flush()
+
+
+class CsvWriter:
+    def __init__(self, stream):
+        self.stream = stream
+        self.writer = None
+
+    def write(self, res: dict):
+        flat = flatten_chart(res)
+        if self.writer is None:
+            self.writer = csv.DictWriter(self.stream, fieldnames=list(flat.keys()))
+            self.writer.writeheader()
+        self.writer.writerow(flat)
+
+    def close(self):
+        self.stream.flush()
+
+
+class ParquetWriter:
+    """Columnar output; buffers rows and flushes one row group per batch (requires pyarrow)."""
+
+    def __init__(self, path: str, batch_size: int = 10000):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("parquet output requires pyarrow (pip install pyarrow)")
+        self.pa = pa
+        self.pq = pq
+        self.path = path
+        self.batch_size = batch_size
+        self.rows = []
+        self.writer = None
+
+    def write(self, res: dict):
+        self.rows.append(flatten_chart(res))
+        if len(self.rows) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if not self.rows:
+            return
+        cols = {k: [r[k] for r in self.rows] for k in self.rows[0].keys()}
+        cols["id"] = [None if v is None else str(v) for v in cols["id"]]
+        table = self.pa.table(cols)
+        if self.writer is None:
+            self.writer = self.pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table.cast(self.writer.schema))
+        self.rows = []
+
+    def close(self):
+        self._flush()
+        if self.writer is not None:
+            self.writer.close()
+
+
+def _open_writer(output: str, fmt: str):
+    if fmt == "parquet":
+        if output == "-":
+            raise RuntimeError("parquet output needs a file path")
+        return ParquetWriter(output), None
+    stream = sys.stdout if output == "-" else open(output, "w", encoding="utf-8", newline="")
+    writer = CsvWriter(stream) if fmt == "csv" else JsonlWriter(stream)
+    return writer, (None if stream is sys.stdout else stream)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Compute natal charts in bulk from CSV/JSONL birth records.")
+    ap.add_argument("input", help="CSV or JSONL file with datetime, timezone, latitude, longitude[, id] ('-' = stdin)")
+    ap.add_argument("-o", "--output", default="-", help="output path ('-' = stdout)")
+    ap.add_argument("--input-format", choices=("csv", "jsonl"), default=None)
+    ap.add_argument("--format", choices=("jsonl", "csv", "parquet"), default=None,
+                    help="output format (default: from output extension, else jsonl)")
+    ap.add_argument("--errors", default=None, help="write malformed rows to this JSONL file instead of the main output")
+    ap.add_argument("--workers", type=int, default=None, help="process count (default: CPU count)")
+    ap.add_argument("--chunk-size", type=int, default=256)
+    ap.add_argument("--progress-every", type=int, default=5000, help="rows between progress lines on stderr (0 = off)")
+    args = ap.parse_args(argv)
+
+    fmt = args.format
+    if fmt is None:
+        ext = os.path.splitext(args.output)[1].lower()
+        fmt = {".csv": "csv", ".parquet": "parquet"}.get(ext, "jsonl")
+
+    writer, stream = _open_writer(args.output, fmt)
+    err_stream = open(args.errors, "w", encoding="utf-8") if args.errors else None
+    done = failed = 0
+    t0 = time.perf_counter()
+    try:
+        records = iter_records(args.input, args.input_format)
+        for res in run_bulk(records, workers=args.workers, chunk_size=args.chunk_size):
+            done += 1
+            if res.get("error"):
+                failed += 1
+                print(f"[bulk_charts] row {res.get('row')}: {res['error']}", file=sys.stderr)
+                if err_stream:
+                    err_stream.write(json.dumps(res, ensure_ascii=False) + "\n")
+                    continue
+            writer.write(res)
+            if args.progress_every and done % args.progress_every == 0:
+                rate = done / max(time.perf_counter() - t0, 1e-9)
+                print(f"[bulk_charts] {done} rows ({failed} failed) {rate:.0f} charts/s", file=sys.stderr, flush=True)
+    finally:
+        writer.close()
+        if stream:
+            stream.close()
+        if err_stream:
+            err_stream.close()
+    elapsed = time.perf_counter() - t0
+    print(f"[bulk_charts] done: {done} rows, {failed} failed, {elapsed:.2f}s ({done / max(elapsed, 1e-9):.0f} charts/s)",
+          file=sys.stderr)
+    return 1 if done and failed == done else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
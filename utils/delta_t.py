@@ -0,0 +1,76 @@
+"""
+ΔT (TT − UT) service backed by a precomputed table.
+
+The table samples swe.deltat every quarter year from −5500 to +5500 (the span of
+the bundled .se1 files, −5400 … +5400, plus a century each side) and is built
+once per process on first use.
+Lookups are linear interpolation: a couple of float ops per scalar, and a single
+numpy.interp call for arrays. Outside the table range we defer to swe.deltat.
+
+Every UT→TT conversion in the project (planet positions, Enoch equinox search,
+lunar scanners) goes through ut_to_tt so all modules agree on the time scale.
+"""
+import math
+import swisseph as swe
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; scalar lookups do not need it
+    np = None
+
+TABLE_START_YEAR = -5500
+TABLE_END_YEAR = 5500
+TABLE_STEP_DAYS = 365.25 / 4.0
+
+_table = None       # list of ΔT values in days
+_table_np = None    # same as numpy array (when numpy is available)
+_grid_np = None
+_jd0 = None
+_n = 0
+
+
+def _build_table():
+    global _table, _table_np, _grid_np, _jd0, _n
+    jd0 = swe.julday(TABLE_START_YEAR, 1, 1, 0.0)
+    jd1 = swe.julday(TABLE_END_YEAR, 1, 1, 0.0)
+    n = int(math.ceil((jd1 - jd0) / TABLE_STEP_DAYS)) + 1
+    table = [swe.deltat(jd0 + i * TABLE_STEP_DAYS) for i in range(n)]
+    _jd0, _n, _table = jd0, n, table
+    if np is not None:
+        _table_np = np.asarray(table, dtype=float)
+        _grid_np = np.arange(n, dtype=float)
+
+
+def delta_t_days(jd_ut):
+    """ΔT in days for a UT Julian Day (float) or an array of them (numpy)."""
+    if _table is None:
+        _build_table()
+    if np is not None and isinstance(jd_ut, np.ndarray):
+        x = (jd_ut - _jd0) / TABLE_STEP_DAYS
+        out = np.interp(x, _grid_np, _table_np)
+        outside = (x < 0) | (x > _n - 1)
+        if outside.any():
+            out[outside] = [swe.deltat(float(j)) for j in jd_ut[outside]]
+        return out
+    x = (jd_ut - _jd0) / TABLE_STEP_DAYS
+    i = int(x)
+    if x < 0 or i >= _n - 1:
+        return swe.deltat(jd_ut)
+    lo = _table[i]
+    return lo + (_table[i + 1] - lo) * (x - i)
+
+
+def delta_t_seconds(jd_ut):
+    """ΔT in seconds (scalar or numpy array)."""
+    return delta_t_days(jd_ut) * 86400.0
+
+
+def ut_to_tt(jd_ut):
+    """Convert a UT Julian Day (scalar or numpy array) to TT."""
+    return jd_ut + delta_t_days(jd_ut)
+
+
+def tt_to_ut(jd_tt):
+    """Inverse of ut_to_tt; one fixed-point step is enough since ΔT varies slowly."""
+    jd_ut = jd_tt - delta_t_days(jd_tt)
+    return jd_tt - delta_t_days(jd_ut)
@@ -1,5 +1,6 @@
 import swisseph as swe
 from utils.jd_time_utils import jd_to_tt
+from utils.ephemeris import ephe_flag
 #from datetime import timedelta, datetime
 import pytz
 from .debug import *
@@ -75,7 +76,7 @@ def _find_longitude_crossing_for_year(year:int, target_longitude:float, longitud
     m, d = start_hint
     jd_start = swe.julday(year, m, d)
     planet = swe.SUN
-    flags = swe.FLG_SWIEPH | swe.FLG_TOPOCTR
+    flags = ephe_flag() | swe.FLG_TOPOCTR
     max_iterations = 240
     for _ in range(max_iterations):
         jd_tt = jd_to_tt(jd_start)
@@ -157,7 +158,7 @@ def find_enoch_year_start(target_date,longitude=REFERENCE_LONGITUDE,latitude=REF
     # Miércoles anterior → usar el atardecer del MARTES previo (inicio del miércoles enojiano)
     yb, mb, db, _ = swe.revjul(jd_before + tz_off)
     ut0_before = swe.julday(int(yb), int(mb), int(db), 0.0) - tz_off
-    ret1, sunset_data_before = swe.rise_trans(ut0_before - 1.0, swe.SUN, 2, geopos)
+    ret1, sunset_data_before = swe.rise_trans(ut0_before - 1.0, swe.SUN, 2, geopos, flags=ephe_flag())
     sunset_before_jd = sunset_data_before[0]
     #debug_any(sunset_data_before,"sunset_data_before")
     #debug_jd(sunset_before_jd,"sunset_before_jd")
@@ -165,7 +166,7 @@ def find_enoch_year_start(target_date,longitude=REFERENCE_LONGITUDE,latitude=REF
     # Miércoles siguiente → usar el atardecer del MARTES previo (inicio del miércoles enojiano)
     ya, ma, da, _ = swe.revjul(jd_after + tz_off)
     ut0_after = swe.julday(int(ya), int(ma), int(da), 0.0) - tz_off
-    ret2, sunset_data_after = swe.rise_trans(ut0_after - 1.0, swe.SUN, 2, geopos)
+    ret2, sunset_data_after = swe.rise_trans(ut0_after - 1.0, swe.SUN, 2, geopos, flags=ephe_flag())
     sunset_after_jd = sunset_data_after[0]
     #debug_jd(sunset_after_jd,"sunset_after_jd")
     # 5. Comparar cuál sunset está más cerca del equinoccio
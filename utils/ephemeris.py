@@ -0,0 +1,144 @@
+"""
+Ephemeris tier shared by every Swiss Ephemeris call (calc, rise_trans, eclipse search).
+
+Tiers:
+    swiss    FLG_SWIEPH, reads the bundled .se1 files in sweph/ephe (default)
+    moshier  FLG_MOSEPH, analytic theory compiled into the library: no file
+             access, valid for the Moon roughly 3000 BCE .. 3000 CE
+
+The tier is held in a context variable so each request can pick its own without
+touching the others; the process default comes from EPHE_TIER (swiss, moshier
+or auto). With auto, Swiss is used where the .se1 files cover the date and
+Moshier elsewhere, which is what slim containers without sweph/ need.
+
+Note: the bundled set has no semo_18.se1, so for 1800..2399 the library already
+computes the Moon with Moshier even in the swiss tier (coverage below is judged
+by the planet files).
+
+    from utils.ephemeris import ephe_flag
+    swe.calc(jd_tt, swe.MOON, ephe_flag())
+"""
+import contextvars
+import os
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+
+import swisseph as swe
+
+EPHE_PATH = Path(__file__).resolve().parent.parent / "sweph" / "ephe"
+
+TIER_SWISS = 'swiss'
+TIER_MOSHIER = 'moshier'
+TIER_AUTO = 'auto'
+
+TIER_FLAGS = {
+    TIER_SWISS: swe.FLG_SWIEPH,
+    TIER_MOSHIER: swe.FLG_MOSEPH,
+}
+
+# Aliases accepted from env/request parameters
+_ALIASES = {
+    'swiss': TIER_SWISS, 'swieph': TIER_SWISS, 'se1': TIER_SWISS, 'files': TIER_SWISS,
+    'moshier': TIER_MOSHIER, 'moseph': TIER_MOSHIER, 'analytic': TIER_MOSHIER,
+    'auto': TIER_AUTO, '': TIER_AUTO,
+}
+
+# Moshier's Moon range as reported by the library (JD TT); planets cover the same span
+MOSHIER_JD_RANGE = (625000.5, 2818000.5)
+
+# Each .se1 file covers 600 years: sepl_18 = 1800..2399, seplm06 = -600..-1
+_FILE_SPAN_YEARS = 600
+
+_tier_var = contextvars.ContextVar('ephemeris_tier', default=None)
+
+
+def normalize_tier(value):
+    """Canonical tier name for a user/env value, or None when unknown."""
+    if value is None:
+        return TIER_AUTO
+    return _ALIASES.get(str(value).strip().lower())
+
+
+DEFAULT_TIER = normalize_tier(os.environ.get('EPHE_TIER')) or TIER_AUTO
+
+
+def current_tier() -> str:
+    """Tier in effect for the current request (auto resolves to swiss here)."""
+    tier = _tier_var.get() or DEFAULT_TIER
+    return TIER_SWISS if tier == TIER_AUTO else tier
+
+
+def ephe_flag() -> int:
+    """Swiss Ephemeris source flag for the current tier (FLG_SWIEPH or FLG_MOSEPH)."""
+    return TIER_FLAGS[current_tier()]
+
+
+def set_tier(tier: str):
+    """Select a tier for the current context; returns a token for reset_tier."""
+    return _tier_var.set(tier)
+
+
+def reset_tier(token):
+    _tier_var.reset(token)
+
+
+@contextmanager
+def use_tier(tier: str):
+    token = _tier_var.set(tier)
+    try:
+        yield
+    finally:
+        _tier_var.reset(token)
+
+
+@lru_cache(maxsize=1)
+def _file_blocks() -> frozenset:
+    """Start years of the 600-year blocks covered by a planet file (sepl*.se1)."""
+    try:
+        names = set(os.listdir(EPHE_PATH))
+    except OSError:
+        return frozenset()
+    blocks = set()
+    for name in names:
+        if not (name.startswith('sepl') and name.endswith('.se1')):
+            continue
+        tag = name[4:-4]            # '_18' or 'm06'
+        try:
+            start = int(tag[1:]) * 100
+        except ValueError:
+            continue
+        if tag[0] == 'm':
+            start = -start
+        elif tag[0] != '_':
+            continue
+        blocks.add(start)
+    return frozenset(blocks)
+
+
+def swiss_files_cover(jd_ut: float) -> bool:
+    """True when the bundled .se1 files contain the given date."""
+    y = swe.revjul(jd_ut)[0]
+    return (int(y) // _FILE_SPAN_YEARS) * _FILE_SPAN_YEARS in _file_blocks()
+
+
+def moshier_covers(jd_ut: float) -> bool:
+    return MOSHIER_JD_RANGE[0] <= jd_ut <= MOSHIER_JD_RANGE[1]
+
+
+def resolve_tier(requested, start_jd: float, end_jd: float = None):
+    """
+    Tier to use for a span of dates: the requested one when it covers the span,
+    otherwise the other tier, otherwise None (caller must approximate).
+    """
+    end_jd = start_jd if end_jd is None else end_jd
+    req = normalize_tier(requested) or DEFAULT_TIER
+    if req == TIER_AUTO:
+        req = DEFAULT_TIER if DEFAULT_TIER != TIER_AUTO else TIER_SWISS
+    swiss_ok = swiss_files_cover(start_jd) and swiss_files_cover(end_jd)
+    moshier_ok = moshier_covers(start_jd) and moshier_covers(end_jd)
+    order = (TIER_MOSHIER, TIER_SWISS) if req == TIER_MOSHIER else (TIER_SWISS, TIER_MOSHIER)
+    for tier in order:
+        if (tier == TIER_SWISS and swiss_ok) or (tier == TIER_MOSHIER and moshier_ok):
+            return tier
+    return None
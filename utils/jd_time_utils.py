@@ -1,10 +1,36 @@
 
+import re
 import swisseph as swe
+from utils.delta_t import ut_to_tt
 
 def jd_to_tt(jd_utc):
     """
     Convierte Julian Day UTC a Julian Day TT (Tiempo Terrestre),
-    sumando Delta T en días.
+    sumando Delta T en días (tabla precalculada, ver utils/delta_t.py).
     """
-    delta_t_seconds = swe.deltat(jd_utc)
-    return jd_utc + delta_t_seconds / 86400
+    return ut_to_tt(jd_utc)
+
+
+# Support: YYYY-MM-DDTHH:MM[:SS[.us]](Z|±HH:MM), years may be negative (BCE)
+_ISO_RE = re.compile(r"^([+-]?\d{1,6})-(\d{2})-(\d{2})T(\d{2}):(\d{2})(?::(\d{2})(?:\.(\d{1,6}))?)?(Z|[+-]\d{2}:\d{2})?$")
+
+def parse_iso_to_jd(date_str: str) -> float:
+    """
+    Parse extended ISO8601 like -002971-03-25T21:24:00Z or with offset and return UT JD.
+    The only copy of this parser: /calculate, /calcYear, jobs and the bulk CLI all use it.
+    """
+    m = _ISO_RE.match(date_str)
+    if not m:
+        raise ValueError("unsupported ISO format")
+    y = int(m.group(1)); mo = int(m.group(2)); d = int(m.group(3))
+    hh = int(m.group(4)); mi = int(m.group(5)); ss = int(m.group(6) or 0)
+    micros = int((m.group(7) or '0').ljust(6, '0'))
+    tzpart = m.group(8) or 'Z'
+    frac = hh + mi/60.0 + ss/3600.0 + micros/3600000000.0
+    jd_local = swe.julday(y, mo, d, frac)
+    if tzpart == 'Z':
+        return jd_local
+    sign = 1 if tzpart[0] == '+' else -1
+    th = int(tzpart[1:3]); tm = int(tzpart[4:6])
+    # Local time = UTC + offset ⇒ UTC = local - offset
+    return jd_local - sign * (th*3600 + tm*60) / 86400.0
@@ -3,6 +3,9 @@ import math
 from functools import lru_cache
 import pytz
 import swisseph as swe
+from utils.delta_t import ut_to_tt
+from utils.ephemeris import ephe_flag
+from utils import precision
 
 AU_KM = 149597870.7
 
@@ -15,9 +18,9 @@ def _wrap180(x: float) -> float:
     return x
 
 def _to_tt(jd_ut):
-    # Swiss Ephemeris expects TT when using swe.calc with FLG_SWIEPH
-    # Approx: TT ~= UT + 69 seconds / 86400 (not critical for daily phase)
-    return jd_ut + (69.0/86400.0)
+    # Swiss Ephemeris expects TT when using swe.calc (both SWIEPH and MOSEPH tiers).
+    # Table-backed ΔT shared with the rest of the project (hours in BCE years).
+    return ut_to_tt(jd_ut)
 
 def _round_jd(jd: float) -> float:
     """Round JD to avoid exploding cache keys; 1e-6 days ~0.0864s."""
@@ -26,9 +29,9 @@ def _round_jd(jd: float) -> float:
     except Exception:
         return float(jd)
 
-def _sun_moon_state_raw(jd_ut):
+def _sun_moon_state_raw(jd_ut, flags=None):
     jd_tt = _to_tt(jd_ut)
-    flags = swe.FLG_SWIEPH
+    flags = ephe_flag() if flags is None else flags
     mres = swe.calc(jd_tt, swe.MOON, flags)[0]
     sres = swe.calc(jd_tt, swe.SUN, flags)[0]
     lon_moon = mres[0]
@@ -39,12 +42,12 @@ def _sun_moon_state_raw(jd_ut):
     return lon_sun, lon_moon, phase, illum, dist_moon_km
 
 @lru_cache(maxsize=200_000)
-def _sun_moon_state_cached(jd_ut_rounded: float):
-    return _sun_moon_state_raw(jd_ut_rounded)
+def _sun_moon_state_cached(jd_ut_rounded: float, flags: int):
+    return _sun_moon_state_raw(jd_ut_rounded, flags)
 
 def sun_moon_state(jd_ut):
-    """Cached Sun/Moon state keyed by rounded JD to cut Swiss calls."""
-    return _sun_moon_state_cached(_round_jd(jd_ut))
+    """Cached Sun/Moon state keyed by rounded JD and ephemeris tier to cut Swiss calls."""
+    return _sun_moon_state_cached(_round_jd(jd_ut), ephe_flag())
 
 def jd_utc(dt_utc: datetime) -> float:
     if dt_utc.tzinfo is None:
@@ -92,8 +95,8 @@ def scan_phase_events(start: datetime, end: datetime, step_hours=6):
                 # detect sign change
                 if v_prev == 0:
                     events.append({'type': name, 'time': t_prev})
-                elif val == 0 or (v_prev < 0 and val > 0) or (v_prev > 0 and val < 0):
-                    # refine in [t_prev, t]
+                elif abs(v_prev) < 90 and abs(val) < 90 and (val == 0 or (v_prev < 0) != (val < 0)):
+                    # refine in [t_prev, t] (the +-180 wrap on the far side is not a crossing)
                     root = refine_root_for_phase(t_prev, t, tgt)
                     events.append({'type': name, 'time': root})
             prev_vals[name] = (t, val)
@@ -278,11 +281,11 @@ ZODIAC_TROPICAL = [
 
 # --- Solar cardinal points (equinoxes/solstices) ---
 def _to_tt_jd(jd_ut: float) -> float:
-    return jd_ut + (69.0/86400.0)
+    return ut_to_tt(jd_ut)
 
 def _sun_ecliptic_longitude_deg(jd_ut: float) -> float:
     jd_tt = _to_tt_jd(jd_ut)
-    flags = swe.FLG_SWIEPH
+    flags = ephe_flag()
     lon = swe.calc(jd_tt, swe.SUN, flags)[0][0]
     return _norm360(lon)
 
@@ -308,22 +311,24 @@ def _refine_longitude_crossing(t0_utc: datetime, t1_utc: datetime, target_deg: f
             a, fa = mid, fm
     return a + (b - a) / 2
 
-def solar_cardinal_points_for_year(year: int) -> list:
+def solar_cardinal_points_for_year(year: int, precision_tier: str = None) -> list:
     """
     Return list of {'type': 'equinox'|'solstice', 'season': 'march'|'june'|'september'|'december', 'jd': float, 'iso': str}
     for the given proleptic Gregorian year using Swiss Ephemeris. Works for BCE years by avoiding datetime().
+    Scan step and tolerances follow the precision tier (utils.precision).
     """
+    cfg = precision.settings(precision_tier)
     def _sun_lon_deg_ut(jd_ut: float) -> float:
         try:
             jd_tt = _to_tt_jd(jd_ut)
-            return _norm360(swe.calc(jd_tt, swe.SUN, swe.FLG_SWIEPH)[0][0])
+            return _norm360(swe.calc(jd_tt, swe.SUN, ephe_flag())[0][0])
         except Exception:
             return 0.0
 
     def _wrap180(x: float) -> float:
         return ((x + 180.0) % 360.0) - 180.0
 
-    def _refine_jd(a: float, b: float, target_deg: float, iters: int = 40) -> float:
+    def _refine_jd(a: float, b: float, target_deg: float, iters: int = cfg['cardinal_max_iter']) -> float:
         fa = _wrap180(_sun_lon_deg_ut(a) - target_deg)
         fb = _wrap180(_sun_lon_deg_ut(b) - target_deg)
         if fa * fb > 0:
@@ -333,7 +338,7 @@ def solar_cardinal_points_for_year(year: int) -> list:
         for _ in range(iters):
             mid = 0.5 * (lo + hi)
             vmid = _wrap180(_sun_lon_deg_ut(mid) - target_deg)
-            if abs(vmid) < 1e-6 or abs(hi - lo) < 1e-7:
+            if abs(vmid) < cfg['cardinal_tol_deg'] or abs(hi - lo) < cfg['cardinal_bracket_days']:
                 return mid
             if vlo * vmid <= 0:
                 hi, vhi = mid, vmid
@@ -371,7 +376,7 @@ def solar_cardinal_points_for_year(year: int) -> list:
         try:
             start = jd_year0 + day_est - 5.0
             end = start + 25.0
-            step = 0.5  # days
+            step = cfg['cardinal_step_days']
             prev_jd = start
             prev_v = _wrap180(_sun_lon_deg_ut(prev_jd) - target_deg)
             bracket = None
@@ -409,7 +414,7 @@ def scan_eclipses_global(start: datetime, end: datetime) -> list:
             jd = jd_start
             while jd < jd_end:
                 # flags: 0 forward
-                r = swe.sol_eclipse_when_glob(jd, swe.FLG_SWIEPH, 0)
+                r = swe.sol_eclipse_when_glob(jd, ephe_flag(), 0)
                 if isinstance(r, tuple) and len(r) >= 2:
                     retflag = r[0] if len(r) > 0 else 0
                     tret = r[1]
@@ -442,7 +447,7 @@ def scan_eclipses_global(start: datetime, end: datetime) -> list:
         try:
             jd = jd_start
             while jd < jd_end:
-                r = swe.lun_eclipse_when(jd, swe.FLG_SWIEPH, 0)
+                r = swe.lun_eclipse_when(jd, ephe_flag(), 0)
                 if isinstance(r, tuple) and len(r) >= 2:
                     retflag = r[0] if len(r) > 0 else 0
                     tret = r[1]
@@ -476,9 +481,8 @@ def scan_eclipses_global(start: datetime, end: datetime) -> list:
 
 # --- Simple planetary alignment detector ---
 @lru_cache(maxsize=200_000)
-def _planet_longitudes_deg_jd_cached(jd_key: float, ids_key: tuple):
+def _planet_longitudes_deg_jd_cached(jd_key: float, ids_key: tuple, flags: int):
     jd_tt = _to_tt(jd_key)
-    flags = swe.FLG_SWIEPH
     longs = {}
     for pid in ids_key:
         try:
@@ -493,7 +497,7 @@ def _planet_longitudes_deg(dt_utc: datetime, ids: list = None) -> dict:
     if ids is None:
         ids = [swe.MERCURY, swe.VENUS, swe.MARS, swe.JUPITER, swe.SATURN]
     ids_key = tuple(ids)
-    return _planet_longitudes_deg_jd_cached(_round_jd(jd), ids_key)
+    return _planet_longitudes_deg_jd_cached(_round_jd(jd), ids_key, ephe_flag())
 
 def scan_alignments_simple(
     start: datetime,
@@ -810,7 +814,7 @@ def _jd_to_iso_utc(jd: float) -> str:
     y_str = (f"{int(y):04d}" if int(y) >= 0 else f"{int(y)}")
     return f"{y_str}-{int(mo):02d}-{int(d):02d}T{hh:02d}:{mi:02d}:{ss:02d}Z"
 
-def _refine_phase_root_jd(jd0: float, jd1: float, target_deg: float, max_iter: int = 30) -> float:
+def _refine_phase_root_jd(jd0: float, jd1: float, target_deg: float, max_iter: int = 30, tol_deg: float = 1e-4) -> float:
     def f(jd):
         return _wrap180(sun_moon_state(jd)[2] - target_deg)
     a, b = jd0, jd1
@@ -824,7 +828,7 @@ def _refine_phase_root_jd(jd0: float, jd1: float, target_deg: float, max_iter: i
     for _ in range(max_iter):
         mid = 0.5*(a + b)
         fm = f(mid)
-        if abs(fm) < 1e-4:
+        if abs(fm) < tol_deg:
             return mid
         if fa*fm <= 0:
             b, fb = mid, fm
@@ -832,8 +836,11 @@ def _refine_phase_root_jd(jd0: float, jd1: float, target_deg: float, max_iter: i
             a, fa = mid, fm
     return 0.5*(a + b)
 
-def scan_phase_events_jd(start_jd: float, end_jd: float, step_hours: float = 8.0):
-    """Return list of lunar phase events between two JDs."""
+def scan_phase_events_jd(start_jd: float, end_jd: float, step_hours: float = None, precision_tier: str = None):
+    """Return list of lunar phase events between two JDs (step/tolerance from the precision tier)."""
+    cfg = precision.settings(precision_tier)
+    if step_hours is None:
+        step_hours = cfg['phase_step_hours']
     events = []
     targets = [(0.0, 'new'), (90.0, 'first_quarter'), (180.0, 'full'), (270.0, 'last_quarter')]
     step_days = max(1.0, float(step_hours)) / 24.0
@@ -847,8 +854,9 @@ def scan_phase_events_jd(start_jd: float, end_jd: float, step_hours: float = 8.0
                 jd_prev, v_prev = prev_vals[name]
                 if v_prev == 0:
                     events.append({'type': name, 'jd': jd_prev, 'iso': _jd_to_iso_utc(jd_prev)})
-                elif val == 0 or (v_prev < 0 and val > 0) or (v_prev > 0 and val < 0):
-                    root = _refine_phase_root_jd(jd_prev, jd, tgt)
+                elif abs(v_prev) < 90 and abs(val) < 90 and (val == 0 or (v_prev < 0) != (val < 0)):
+                    # the +-180 wrap on the far side of the target is not a crossing
+                    root = _refine_phase_root_jd(jd_prev, jd, tgt, cfg['phase_max_iter'], cfg['phase_tol_deg'])
                     events.append({'type': name, 'jd': root, 'iso': _jd_to_iso_utc(root)})
             prev_vals[name] = (jd, val)
         jd += step_days
@@ -877,7 +885,10 @@ def _refine_extremum_jd(jd0: float, jd1: float, mode='min', iters: int = 20):
     mid = 0.5*(a + b)
     return mid, dist_at(mid)
 
-def scan_perigee_apogee_jd(start_jd: float, end_jd: float, step_hours: float = 8.0):
+def scan_perigee_apogee_jd(start_jd: float, end_jd: float, step_hours: float = None, precision_tier: str = None):
+    cfg = precision.settings(precision_tier)
+    if step_hours is None:
+        step_hours = cfg['apsis_step_hours']
     step_days = max(1.0, float(step_hours)) / 24.0
     samples = []
     jd = start_jd
@@ -891,13 +902,102 @@ def scan_perigee_apogee_jd(start_jd: float, end_jd: float, step_hours: float = 8
         jd_mid, d_mid = samples[i]
         jd_next, d_next = samples[i+1]
         if d_mid < d_prev and d_mid < d_next:
-            jb, db = _refine_extremum_jd(jd_prev, jd_next, mode='min')
+            jb, db = _refine_extremum_jd(jd_prev, jd_next, mode='min', iters=cfg['apsis_iters'])
             events.append({'type': 'perigee', 'jd': jb, 'distance_km': db, 'iso': _jd_to_iso_utc(jb)})
         if d_mid > d_prev and d_mid > d_next:
-            jb, db = _refine_extremum_jd(jd_prev, jd_next, mode='max')
+            jb, db = _refine_extremum_jd(jd_prev, jd_next, mode='max', iters=cfg['apsis_iters'])
             events.append({'type': 'apogee', 'jd': jb, 'distance_km': db, 'iso': _jd_to_iso_utc(jb)})
     return events
 
+def refine_sign_cusp_jd(jd0: float, jd1: float, target_deg: float, max_iter: int = None, precision_tier: str = None) -> float:
+    """JD version of refine_sign_cusp (no datetime range limits); stops at the tier's bracket (60 s standard)."""
+    cfg = precision.settings(precision_tier)
+    if max_iter is None:
+        max_iter = cfg['cusp_max_iter']
+    tol_deg = cfg['cusp_tol_deg']
+    bracket = cfg['cusp_bracket_s'] / 86400.0
+    target = target_deg % 360.0
+
+    def f(jd):
+        return _wrap180(_norm360(sun_moon_state(jd)[1]) - target)
+
+    a, b = jd0, jd1
+    fa, fb = f(a), f(b)
+    if fa == 0:
+        return a
+    if fb == 0:
+        return b
+    if fa * fb > 0:
+        return a if abs(fa) < abs(fb) else b
+    for _ in range(max_iter):
+        mid = 0.5 * (a + b)
+        fm = f(mid)
+        if abs(fm) < tol_deg or (b - a) <= bracket:
+            return mid
+        if fa * fm <= 0:
+            b, fb = mid, fm
+        else:
+            a, fa = mid, fm
+    return 0.5 * (a + b)
+
+def lunar_sign_mix_jd(start_jd: float, end_jd: float, mode: str = 'tropical', lon_start: float = None, lon_end: float = None,
+                      precision_tier: str = None):
+    """
+    JD version of lunar_sign_mix. Longitudes at the bounds can be passed in when the
+    caller already sampled them (adjacent days share a boundary). Adds 'cusps':
+    [(cusp_deg, jd), ...] for the crossings that were refined.
+    """
+    if start_jd is None or end_jd is None:
+        return {}
+    if lon_start is None:
+        lon_start = sun_moon_state(start_jd)[1]
+    lon_start = _norm360(lon_start)
+    total = end_jd - start_jd
+    if total <= 0:
+        sign = lunar_sign_from_longitude(lon_start, mode)
+        return {'primary_sign': sign, 'primary_pct': 1.0, 'secondary_sign': None, 'secondary_pct': 0.0,
+                'segments': [{'sign': sign, 'seconds': 0.0, 'share': 1.0}], 'cusps': []}
+    if lon_end is None:
+        lon_end = sun_moon_state(end_jd)[1]
+    lon_end = _norm360(lon_end)
+    while lon_end < lon_start - 1e-6:
+        lon_end += 360.0
+
+    idx = int(math.floor(lon_start / 30.0)) % 12
+    seg_start = start_jd
+    shares = {}
+    cusps = []
+    next_cusp = math.floor(lon_start / 30.0) * 30.0 + 30.0
+    while next_cusp < lon_end - 1e-6:
+        cross = refine_sign_cusp_jd(seg_start, end_jd, next_cusp, precision_tier=precision_tier)
+        if cross <= seg_start:
+            cross = min(end_jd, seg_start + 1.0 / 86400.0)
+        sign = ZODIAC_TROPICAL[idx]
+        shares[sign] = shares.get(sign, 0.0) + (cross - seg_start)
+        cusps.append((next_cusp % 360.0, cross))
+        seg_start = cross
+        idx = (idx + 1) % 12
+        next_cusp += 30.0
+    sign = ZODIAC_TROPICAL[idx]
+    shares[sign] = shares.get(sign, 0.0) + max(end_jd - seg_start, 0.0)
+
+    segments = [{'sign': k, 'seconds': v * 86400.0, 'share': v / total} for k, v in shares.items() if v > 0]
+    segments.sort(key=lambda x: x['share'], reverse=True)
+    if not segments:
+        sign = lunar_sign_from_longitude(lon_start, mode)
+        return {'primary_sign': sign, 'primary_pct': 1.0, 'secondary_sign': None, 'secondary_pct': 0.0,
+                'segments': [], 'cusps': cusps}
+    primary = segments[0]
+    secondary = segments[1] if len(segments) > 1 else None
+    return {
+        'primary_sign': primary['sign'],
+        'primary_pct': primary['share'],
+        'secondary_sign': secondary['sign'] if secondary else None,
+        'secondary_pct': secondary['share'] if secondary else 0.0,
+        'segments': segments,
+        'cusps': cusps,
+    }
+
 def scan_eclipses_global_jd(start_jd: float, end_jd: float) -> list:
     """Eclipse search using JDs; returns events with jd and iso."""
     events = []
@@ -905,7 +1005,7 @@ def scan_eclipses_global_jd(start_jd: float, end_jd: float) -> list:
         jd = start_jd
         # Solar
         while jd < end_jd:
-            r = swe.sol_eclipse_when_glob(jd, swe.FLG_SWIEPH, 0)
+            r = swe.sol_eclipse_when_glob(jd, ephe_flag(), 0)
             if not (isinstance(r, tuple) and len(r) >= 2):
                 break
             retflag = r[0] if len(r) > 0 else 0
@@ -931,7 +1031,7 @@ def scan_eclipses_global_jd(start_jd: float, end_jd: float) -> list:
         # Lunar
         jd = start_jd
         while jd < end_jd:
-            r = swe.lun_eclipse_when(jd, swe.FLG_SWIEPH, 0)
+            r = swe.lun_eclipse_when(jd, ephe_flag(), 0)
             if not (isinstance(r, tuple) and len(r) >= 2):
                 break
             retflag = r[0] if len(r) > 0 else 0
@@ -959,7 +1059,7 @@ def scan_eclipses_global_jd(start_jd: float, end_jd: float) -> list:
 
 def _planet_longitudes_deg_jd(jd_ut: float, ids: list) -> dict:
     jd_tt = _to_tt(jd_ut)
-    flags = swe.FLG_SWIEPH
+    flags = ephe_flag()
     longs = {}
     for pid in ids:
         try:
@@ -0,0 +1,231 @@
+"""
+Lunar phases and perigee/apogee from Meeus' periodic-term series
+(Astronomical Algorithms, ch. 49 and 50). No ephemeris files are read.
+
+Every function accepts a float or a numpy array (when numpy is installed) and
+returns the same kind, so a whole span of lunations is a few array operations.
+Instants come out in TT from the series and are converted to UT with the shared
+ΔT table.
+
+Accuracy vs Swiss Ephemeris: phases within ~0.2 min around 1900–2100 and a few
+minutes by 3000 BCE; perigee/apogee within ~1 hour (series truncated to the
+leading terms).
+"""
+import math
+
+try:
+    import numpy as np
+except ImportError:  # scalar use works without numpy
+    np = None
+
+from utils.delta_t import tt_to_ut
+
+SYNODIC_MONTH = 29.530588861
+ANOMALISTIC_MONTH = 27.55454989
+PHASE_EPOCH_JDE = 2451550.09766    # mean new moon, k = 0 (2000-01-06)
+PHASE_NAMES = ('new', 'first_quarter', 'full', 'last_quarter')
+
+# (coefficient, power of E, multipliers of (M, M', F, Ω))
+_NEW_TERMS = (
+    (-0.40720, 0, (0, 1, 0, 0)), (0.17241, 1, (1, 0, 0, 0)), (0.01608, 0, (0, 2, 0, 0)),
+    (0.01039, 0, (0, 0, 2, 0)), (0.00739, 1, (-1, 1, 0, 0)), (-0.00514, 1, (1, 1, 0, 0)),
+    (0.00208, 2, (2, 0, 0, 0)), (-0.00111, 0, (0, 1, -2, 0)), (-0.00057, 0, (0, 1, 2, 0)),
+    (0.00056, 1, (1, 2, 0, 0)), (-0.00042, 0, (0, 3, 0, 0)), (0.00042, 1, (1, 0, 2, 0)),
+    (0.00038, 1, (1, 0, -2, 0)), (-0.00024, 1, (-1, 2, 0, 0)), (-0.00017, 0, (0, 0, 0, 1)),
+    (-0.00007, 0, (2, 1, 0, 0)), (0.00004, 0, (0, 2, -2, 0)), (0.00004, 0, (3, 0, 0, 0)),
+    (0.00003, 0, (1, 1, -2, 0)), (0.00003, 0, (0, 2, 2, 0)), (-0.00003, 0, (1, 1, 2, 0)),
+    (0.00003, 0, (-1, 1, 2, 0)), (-0.00002, 0, (-1, 1, -2, 0)), (-0.00002, 0, (1, 3, 0, 0)),
+    (0.00002, 0, (0, 4, 0, 0)),
+)
+_FULL_TERMS = (
+    (-0.40614, 0, (0, 1, 0, 0)), (0.17302, 1, (1, 0, 0, 0)), (0.01614, 0, (0, 2, 0, 0)),
+    (0.01043, 0, (0, 0, 2, 0)), (0.00734, 1, (-1, 1, 0, 0)), (-0.00515, 1, (1, 1, 0, 0)),
+    (0.00209, 2, (2, 0, 0, 0)),
+) + _NEW_TERMS[7:]
+_QUARTER_TERMS = (
+    (-0.62801, 0, (0, 1, 0, 0)), (0.17172, 1, (1, 0, 0, 0)), (-0.01183, 1, (1, 1, 0, 0)),
+    (0.00862, 0, (0, 2, 0, 0)), (0.00804, 0, (0, 0, 2, 0)), (0.00454, 1, (-1, 1, 0, 0)),
+    (0.00204, 2, (2, 0, 0, 0)), (-0.00180, 0, (0, 1, -2, 0)), (-0.00070, 0, (0, 1, 2, 0)),
+    (-0.00040, 0, (0, 3, 0, 0)), (-0.00034, 1, (-1, 2, 0, 0)), (0.00032, 1, (1, 0, 2, 0)),
+    (0.00032, 1, (1, 0, -2, 0)), (-0.00028, 2, (2, 1, 0, 0)), (0.00027, 1, (1, 2, 0, 0)),
+    (-0.00017, 0, (0, 0, 0, 1)), (-0.00005, 0, (-1, 1, -2, 0)), (0.00004, 0, (0, 2, 2, 0)),
+    (-0.00004, 0, (1, 1, 2, 0)), (0.00004, 0, (-2, 1, 0, 0)), (0.00003, 0, (1, 1, -2, 0)),
+    (0.00003, 0, (3, 0, 0, 0)), (0.00002, 0, (0, 2, -2, 0)), (0.00002, 0, (-1, 1, 2, 0)),
+    (-0.00002, 0, (1, 3, 0, 0)),
+)
+# Planetary arguments A1..A14: (constant, rate per k, coefficient)
+_PLANETARY = (
+    (299.77, 0.107408, 0.000325), (251.88, 0.016321, 0.000165), (251.83, 26.651886, 0.000164),
+    (349.42, 36.412478, 0.000126), (84.66, 18.206239, 0.000110), (141.74, 53.303771, 0.000062),
+    (207.14, 2.453732, 0.000060), (154.84, 7.306860, 0.000056), (34.52, 27.261239, 0.000047),
+    (207.19, 0.121824, 0.000042), (291.34, 1.844379, 0.000040), (161.72, 24.198154, 0.000037),
+    (239.56, 25.513099, 0.000035), (331.55, 3.592518, 0.000023),
+)
+
+# Perigee/apogee leading terms (Meeus table 50.A): (coefficient, T-rate, multipliers of (D, M, F))
+_PERIGEE_TERMS = (
+    (-1.6769, 0.0, (2, 0, 0)), (0.4589, 0.0, (4, 0, 0)), (-0.1856, 0.0, (6, 0, 0)),
+    (0.0883, 0.0, (8, 0, 0)), (-0.0773, 0.00019, (2, -1, 0)), (0.0502, -0.00013, (0, 1, 0)),
+    (-0.0460, 0.0, (10, 0, 0)), (0.0422, -0.00011, (4, -1, 0)), (-0.0256, 0.0, (6, -1, 0)),
+    (0.0253, 0.0, (12, 0, 0)), (0.0237, 0.0, (1, 0, 0)), (0.0162, 0.0, (8, -1, 0)),
+    (-0.0145, 0.0, (14, 0, 0)), (0.0129, 0.0, (0, 0, 2)), (-0.0112, 0.0, (3, 0, 0)),
+    (-0.0104, 0.0, (10, -1, 0)), (0.0086, 0.0, (16, 0, 0)), (0.0069, 0.0, (12, -1, 0)),
+    (0.0066, 0.0, (5, 0, 0)), (-0.0053, 0.0, (2, 0, 2)),
+)
+_APOGEE_TERMS = (
+    (0.4392, 0.0, (2, 0, 0)), (0.0684, 0.0, (4, 0, 0)), (0.0456, -0.00011, (0, 1, 0)),
+    (0.0426, -0.00011, (2, -1, 0)), (0.0212, 0.0, (0, 0, 2)), (-0.0189, 0.0, (1, 0, 0)),
+    (0.0144, 0.0, (6, 0, 0)), (0.0113, 0.0, (4, -1, 0)), (0.0047, 0.0, (2, 0, 2)),
+    (0.0036, 0.0, (1, 1, 0)), (0.0035, 0.0, (8, 0, 0)), (0.0034, 0.0, (6, -1, 0)),
+    (-0.0034, 0.0, (2, 0, -2)), (0.0022, 0.0, (2, -2, 0)), (-0.0017, 0.0, (3, 0, 0)),
+    (0.0013, 0.0, (4, 0, 2)),
+)
+
+
+def _xp(x):
+    """numpy for arrays, math for plain floats."""
+    if np is not None and isinstance(x, np.ndarray):
+        return np
+    return math
+
+
+def _asarray_if_list(x):
+    if np is not None and isinstance(x, (list, tuple)):
+        return np.asarray(x, dtype=float)
+    return x
+
+
+def phase_jde(k, quarter: int):
+    """
+    JDE (TT) of the lunar phase for lunation k (integer; 0 = Jan 2000 new moon).
+    quarter: 0 new, 1 first quarter, 2 full, 3 last quarter.
+    """
+    k = _asarray_if_list(k)
+    xp = _xp(k)
+    k = k + quarter * 0.25
+    T = k / 1236.85
+    T2 = T * T
+    jde = (PHASE_EPOCH_JDE + SYNODIC_MONTH * k + 0.00015437 * T2 - 0.000000150 * T2 * T
+           + 0.00000000073 * T2 * T2)
+    E = 1 - 0.002516 * T - 0.0000074 * T2
+    M = xp.radians(2.5534 + 29.10535670 * k - 0.0000014 * T2 - 0.00000011 * T2 * T)
+    Mp = xp.radians(201.5643 + 385.81693528 * k + 0.0107582 * T2 + 0.00001238 * T2 * T
+                    - 0.000000058 * T2 * T2)
+    F = xp.radians(160.7108 + 390.67050284 * k - 0.0016118 * T2 - 0.00000227 * T2 * T
+                   + 0.000000011 * T2 * T2)
+    Om = xp.radians(124.7746 - 1.56375588 * k + 0.0020672 * T2 + 0.00000215 * T2 * T)
+    terms = _QUARTER_TERMS if quarter in (1, 3) else (_FULL_TERMS if quarter == 2 else _NEW_TERMS)
+    corr = 0.0
+    for coef, e_pow, (cm, cmp_, cf, co) in terms:
+        c = coef * (E ** e_pow if e_pow else 1.0)
+        corr = corr + c * xp.sin(cm * M + cmp_ * Mp + cf * F + co * Om)
+    if quarter in (1, 3):
+        W = (0.00306 - 0.00038 * E * xp.cos(M) + 0.00026 * xp.cos(Mp) - 0.00002 * xp.cos(Mp - M)
+             + 0.00002 * xp.cos(Mp + M) + 0.00002 * xp.cos(2 * F))
+        corr = corr + (W if quarter == 1 else -W)
+    for i, (a0, rate, coef) in enumerate(_PLANETARY):
+        arg = a0 + rate * k
+        if i == 0:
+            arg = arg - 0.009173 * T2
+        corr = corr + coef * xp.sin(xp.radians(arg))
+    return jde + corr
+
+
+def phase_jd_ut(k, quarter: int):
+    """Phase instant in UT (JD)."""
+    return tt_to_ut(phase_jde(k, quarter))
+
+
+def _lunation_range(start_jd: float, end_jd: float):
+    k0 = int(math.floor((start_jd - PHASE_EPOCH_JDE) / SYNODIC_MONTH)) - 1
+    k1 = int(math.ceil((end_jd - PHASE_EPOCH_JDE) / SYNODIC_MONTH)) + 1
+    return k0, k1
+
+
+def _iso(jd_val: float) -> str:
+    from utils.lunar_calc import _jd_to_iso_utc
+    return _jd_to_iso_utc(jd_val)
+
+
+def phase_events_jd(start_jd: float, end_jd: float) -> list:
+    """
+    Phase events between two UT JDs, same shape as lunar_calc.scan_phase_events_jd:
+    [{'type': 'new'|'first_quarter'|'full'|'last_quarter', 'jd': float, 'iso': str}, ...]
+    """
+    k0, k1 = _lunation_range(start_jd, end_jd)
+    ks = list(range(k0, k1 + 1))
+    if np is not None:
+        ks = np.asarray(ks, dtype=float)
+    events = []
+    for q, name in enumerate(PHASE_NAMES):
+        times = phase_jd_ut(ks, q)
+        for t in (times.tolist() if np is not None else [phase_jd_ut(k, q) for k in ks]):
+            if start_jd <= t <= end_jd:
+                events.append({'type': name, 'jd': t, 'iso': _iso(t)})
+    events.sort(key=lambda e: e['jd'])
+    return events
+
+
+def phase_angle_jd(jd):
+    """
+    Sun–Moon elongation (deg, 0=new, 180=full) interpolated linearly between the
+    true quarter instants that bracket jd, plus the illuminated fraction.
+    Much closer than a mean synodic month (a few degrees instead of up to ~15°).
+    """
+    jd = _asarray_if_list(jd)
+    xp = _xp(jd)
+    kf = xp.floor((jd - PHASE_EPOCH_JDE) / SYNODIC_MONTH)
+    # Quarter instants for lunations k-1..k+1 in chronological order (12 per sample)
+    instants = []
+    for dk in (-1, 0, 1):
+        for q in range(4):
+            instants.append(phase_jd_ut(kf + dk, q))
+    if xp is math:
+        idx = max(i for i, t in enumerate(instants[:-1]) if t <= jd) if instants[0] <= jd else 0
+        t0, t1 = instants[idx], instants[idx + 1]
+        angle = (90.0 * (idx % 4) + 90.0 * (jd - t0) / (t1 - t0)) % 360.0
+        return angle, 0.5 * (1.0 - math.cos(math.radians(angle)))
+    grid = np.stack(instants, axis=-1)
+    idx = np.clip((grid <= jd[..., None]).sum(axis=-1) - 1, 0, 10)
+    t0 = np.take_along_axis(grid, idx[..., None], axis=-1)[..., 0]
+    t1 = np.take_along_axis(grid, idx[..., None] + 1, axis=-1)[..., 0]
+    angle = np.mod(90.0 * (idx % 4) + 90.0 * (jd - t0) / (t1 - t0), 360.0)
+    return angle, 0.5 * (1.0 - np.cos(np.radians(angle)))
+
+
+def perigee_apogee_jde(k, apogee: bool):
+    """JDE (TT) of lunar perigee (integer k) or apogee (k + 0.5 is applied here)."""
+    k = _asarray_if_list(k)
+    xp = _xp(k)
+    if apogee:
+        k = k + 0.5
+    T = k / 1325.55
+    T2 = T * T
+    jde = 2451534.6698 + ANOMALISTIC_MONTH * k - 0.0006691 * T2 - 0.000001098 * T2 * T + 0.0000000052 * T2 * T2
+    D = xp.radians(171.9179 + 335.9106046 * k - 0.0100383 * T2 - 0.00001156 * T2 * T + 0.000000055 * T2 * T2)
+    M = xp.radians(347.3477 + 27.1577721 * k - 0.0008130 * T2 - 0.0000010 * T2 * T)
+    F = xp.radians(316.6109 + 364.5287911 * k - 0.0125053 * T2 - 0.0000148 * T2 * T)
+    corr = 0.0
+    for coef, t_rate, (cd, cm, cf) in (_APOGEE_TERMS if apogee else _PERIGEE_TERMS):
+        corr = corr + (coef + t_rate * T) * xp.sin(cd * D + cm * M + cf * F)
+    return jde + corr
+
+
+def perigee_apogee_events_jd(start_jd: float, end_jd: float) -> list:
+    """
+    Perigee/apogee events between two UT JDs, same shape as scan_perigee_apogee_jd
+    (distance_km is None: the series used here only gives the instant).
+    """
+    k0 = int(math.floor((start_jd - 2451534.6698) / ANOMALISTIC_MONTH)) - 1
+    k1 = int(math.ceil((end_jd - 2451534.6698) / ANOMALISTIC_MONTH)) + 1
+    ks = list(range(k0, k1 + 1))
+    if np is not None:
+        ks = np.asarray(ks, dtype=float)
+    events = []
+    for name, apogee in (('perigee', False), ('apogee', True)):
+        times = tt_to_ut(perigee_apogee_jde(ks, apogee))
+        for t in (times.tolist() if np is not None else [tt_to_ut(perigee_apogee_jde(k, apogee)) for k in ks]):
+            if start_jd <= t <= end_jd:
+                events.append({'type': name, 'jd': t, 'distance_km': None, 'iso': _iso(t)})
+    events.sort(key=lambda e: e['jd'])
+    return events
@@ -1,10 +1,11 @@
 from utils.jd_time_utils import jd_to_tt
+from utils.ephemeris import ephe_flag
 import swisseph as swe
 from utils.debug import debug_any, is_debug_verbose
 
 def calculate_planets(jd, latitude, longitude):
     swe.set_topo(longitude, latitude, 0)
-    flags = swe.FLG_SWIEPH #| swe.FLG_TOPOCTR
+    flags = ephe_flag() #| swe.FLG_TOPOCTR
 
     planets = {
         "Sun": swe.SUN,
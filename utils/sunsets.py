@@ -0,0 +1,212 @@
+"""
+Sunset provider with explicit polar handling.
+
+swe.rise_trans returns -2 (and a zero JD) when the Sun does not set or rise on
+the requested day, which used to leak JD 0 (-4713-11-24) into day bounds, and
+Astral raises per day. Here polar days are detected up front from the solar
+declination, and their boundary comes from a documented policy instead of an
+exception per day:
+
+    nearest_latitude  (default) sunset computed at the closest latitude toward
+                      the equator where the Sun does set that day, same longitude;
+                      times stay continuous across the polar interval
+    civil_midnight    local mean midnight (LMT, from longitude) ending the date
+
+The policy comes from the request (polar_policy) or SUNSET_POLAR_POLICY and is
+held in a context variable, like the ephemeris tier.
+
+    from utils import sunsets
+    jd_set, state = sunsets.sunset_jd(jd0, lat, lon)   # state: normal | midnight_sun | polar_night
+"""
+import contextvars
+import math
+import os
+from contextlib import contextmanager
+from functools import lru_cache
+
+import swisseph as swe
+
+from utils.ephemeris import ephe_flag
+
+H0_DEG = -0.833          # apparent altitude of the Sun's centre at sunset (refraction + semidiameter)
+MARGIN_DEG = 1.0         # around the polar limit the low-precision declination is not trusted
+SUBSTITUTE_STEP_DEG = 1.0
+HORIZON_REFRACTION_DEG = 0.6099     # rise_trans default atmosphere (1013.25 hPa, 0 °C)
+SUN_SEMIDIAMETER_AU_DEG = 959.63 / 3600.0
+FAST_METHOD_MAX_LAT = 65.0  # rise_trans uses its fast method up to here for the Sun
+
+NORMAL = 'normal'
+MIDNIGHT_SUN = 'midnight_sun'
+POLAR_NIGHT = 'polar_night'
+
+POLICY_NEAREST_LATITUDE = 'nearest_latitude'
+POLICY_CIVIL_MIDNIGHT = 'civil_midnight'
+POLICIES = (POLICY_NEAREST_LATITUDE, POLICY_CIVIL_MIDNIGHT)
+
+_ALIASES = {
+    'nearest_latitude': POLICY_NEAREST_LATITUDE, 'nearest': POLICY_NEAREST_LATITUDE, 'latitude': POLICY_NEAREST_LATITUDE,
+    'civil_midnight': POLICY_CIVIL_MIDNIGHT, 'midnight': POLICY_CIVIL_MIDNIGHT,
+}
+
+_policy_var = contextvars.ContextVar('sunset_polar_policy', default=None)
+
+
+def normalize_policy(value):
+    """Canonical policy name, or None when empty/unknown."""
+    if value is None:
+        return None
+    return _ALIASES.get(str(value).strip().lower())
+
+
+DEFAULT_POLICY = normalize_policy(os.environ.get('SUNSET_POLAR_POLICY')) or POLICY_NEAREST_LATITUDE
+
+
+def current_policy() -> str:
+    return _policy_var.get() or DEFAULT_POLICY
+
+
+def set_policy(policy):
+    """Select a policy for the current context; returns a token for reset_policy."""
+    return _policy_var.set(normalize_policy(policy))
+
+
+def reset_policy(token):
+    _policy_var.reset(token)
+
+
+@contextmanager
+def use_policy(policy):
+    token = _policy_var.set(normalize_policy(policy))
+    try:
+        yield
+    finally:
+        _policy_var.reset(token)
+
+
+def solar_declination_deg(jd_ut: float) -> float:
+    """Low-precision apparent declination (~0.01° near J2000, < 1° over ±5000 years)."""
+    n = jd_ut - 2451545.0
+    t = n / 36525.0
+    g = math.radians(357.528 + 0.9856003 * n)
+    lam = math.radians(280.460 + 0.9856474 * n + 1.915 * math.sin(g) + 0.020 * math.sin(2 * g))
+    eps = math.radians(23.439291 - 0.0130042 * t)
+    return math.degrees(math.asin(math.sin(eps) * math.sin(lam)))
+
+
+def polar_limit_deg(dec_deg: float, same_hemisphere: bool) -> float:
+    """Largest |latitude| where the Sun still crosses H0 for this declination."""
+    if same_hemisphere:
+        return 90.0 + H0_DEG - abs(dec_deg)     # above it: midnight sun
+    return 90.0 - H0_DEG - abs(dec_deg)         # above it: polar night
+
+
+def polar_state(jd_ut: float, lat: float):
+    """NORMAL / MIDNIGHT_SUN / POLAR_NIGHT from declination; None inside the uncertain band."""
+    dec = solar_declination_deg(jd_ut)
+    same = (lat >= 0) == (dec >= 0)
+    limit = polar_limit_deg(dec, same)
+    if abs(lat) < limit - MARGIN_DEG:
+        return NORMAL
+    if abs(lat) > limit + MARGIN_DEG:
+        return MIDNIGHT_SUN if same else POLAR_NIGHT
+    return None
+
+
+def _sunset_altitude_deg(jd_ut: float, lat: float, lon: float, flags: int) -> float:
+    """
+    Geometric altitude of the Sun's centre above the point where rise_trans puts
+    sunset (upper limb on the refracted horizon); zero at sunset.
+    """
+    ra, dec, dist = swe.calc_ut(jd_ut, swe.SUN, flags | swe.FLG_EQUATORIAL)[0][:3]
+    ha = math.radians(swe.sidtime(jd_ut) * 15.0 + lon - ra)
+    phi, d = math.radians(lat), math.radians(dec)
+    alt = math.degrees(math.asin(math.sin(phi) * math.sin(d) + math.cos(phi) * math.cos(d) * math.cos(ha)))
+    return alt + HORIZON_REFRACTION_DEG + SUN_SEMIDIAMETER_AU_DEG / dist
+
+
+def _sunset_secant(jd0: float, lat: float, lon: float, flags: int):
+    """
+    Next sunset after jd0 by a secant search on the altitude, started from the
+    analytic hour angle. Above 65° rise_trans switches to a stepping search that
+    costs ~2 ms per call; this needs 3-5 ephemeris calls. None when it does not
+    converge on a descending crossing within the day (caller uses rise_trans).
+    """
+    dec = math.radians(solar_declination_deg(jd0 + 0.5 - lon / 360.0))
+    phi = math.radians(lat)
+    cos_h = (math.sin(math.radians(H0_DEG)) - math.sin(phi) * math.sin(dec)) / (math.cos(phi) * math.cos(dec))
+    if not -1.0 < cos_h < 1.0:
+        return None
+    t1 = jd0 + 0.5 - lon / 360.0 + math.degrees(math.acos(cos_h)) / 360.0
+    t1 = guess = jd0 + (t1 - jd0) % 1.0      # first one after jd0, like rise_trans
+    if not 0.05 < guess - jd0 < 0.95:
+        return None     # too close to jd0 to tell which day's sunset comes first
+    t0 = t1 - 0.01
+    f0 = _sunset_altitude_deg(t0, lat, lon, flags)
+    f1 = _sunset_altitude_deg(t1, lat, lon, flags)
+    for _ in range(8):
+        if f1 == f0:
+            return None
+        t0, f0, t1 = t1, f1, t1 - f1 * (t1 - t0) / (f1 - f0)
+        f1 = _sunset_altitude_deg(t1, lat, lon, flags)
+        if abs(t1 - t0) < 0.5 / 86400.0:
+            # a descending crossing (sunset, not sunrise) near the estimate, after jd0
+            descending = _sunset_altitude_deg(t1 - 0.005, lat, lon, flags) > 0.0
+            if descending and jd0 <= t1 < jd0 + 1.0 and abs(t1 - guess) < 0.25:
+                return t1
+            return None
+    return None
+
+
+def _rise_trans_set(jd0: float, lat: float, lon: float, flags: int):
+    """Next sunset after jd0, or None when there is none within the day (res -2)."""
+    if abs(lat) > FAST_METHOD_MAX_LAT:
+        try:
+            jd_set = _sunset_secant(jd0, lat, lon, flags)
+        except Exception:
+            jd_set = None
+        if jd_set is not None:
+            return jd_set
+    try:
+        res, tret = swe.rise_trans(jd0, swe.SUN, swe.CALC_SET, (lon, lat, 0), flags=flags)
+    except Exception:
+        return None
+    if res != 0 or not tret or not tret[0] or tret[0] - jd0 > 1.5:
+        return None
+    return tret[0]
+
+
+def civil_midnight_jd(jd0: float, lon: float) -> float:
+    """Local mean midnight (LMT) that ends the civil date starting at jd0 (0h UT)."""
+    return jd0 + 1.0 - lon / 360.0
+
+
+@lru_cache(maxsize=100_000)
+def _sunset_cached(jd0: float, lat: float, lon: float, flags: int, policy: str):
+    noon = jd0 + 0.5 - lon / 360.0
+    state = polar_state(noon, lat)
+    if state != MIDNIGHT_SUN and state != POLAR_NIGHT:
+        jd_set = _rise_trans_set(jd0, lat, lon, flags)
+        if jd_set is not None:
+            return jd_set, NORMAL
+        # uncertain band (or an edge the estimate missed): rise_trans found no sunset
+        dec = solar_declination_deg(noon)
+        state = MIDNIGHT_SUN if (lat >= 0) == (dec >= 0) else POLAR_NIGHT
+    if policy == POLICY_NEAREST_LATITUDE:
+        dec = solar_declination_deg(noon)
+        sub = polar_limit_deg(dec, state == MIDNIGHT_SUN) - MARGIN_DEG
+        sign = 1.0 if lat >= 0 else -1.0
+        for _ in range(4):
+            jd_set = _rise_trans_set(jd0, sign * sub, lon, flags)
+            if jd_set is not None:
+                return jd_set, state
+            sub -= SUBSTITUTE_STEP_DEG
+    return civil_midnight_jd(jd0, lon), state
+
+
+def sunset_jd(jd0: float, lat: float, lon: float, policy: str = None):
+    """
+    (sunset JD UT, state) for the civil date starting at jd0 (0h UT): the first
+    sunset after jd0 like swe.rise_trans, never raising and never returning 0.
+    """
+    policy = normalize_policy(policy) or current_policy()
+    return _sunset_cached(round(float(jd0), 6), float(lat), float(lon), ephe_flag(), policy)
@@ -0,0 +1,134 @@
+"""
+Swiss Ephemeris call accounting.
+
+install() wraps the swisseph functions the project calls (once per process;
+callers keep using `swe.calc(...)`). Each wrapped call:
+  - bumps the per-request counter in utils.timing (cheap, always on)
+  - when a profile session is active, also records calls, total time, the JD
+    range seen and which function made the call.
+
+Sessions are opt-in and scoped with a context variable, so they work the same
+inside a Flask request and in a plain script or test:
+
+    from utils import swe_profiler
+    swe_profiler.install()
+    with swe_profiler.profile() as prof:
+        calculate_planets(jd, lat, lon)
+    prof.summary()   # {'swe.calc': {'calls': 10, 'ms': 0.3, 'jd_min': ..., 'callers': {...}}, ...}
+"""
+import contextvars
+import functools
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+import swisseph as swe
+
+from utils import timing
+
+# Functions whose first argument is a JD (UT or TT)
+FUNCTIONS = ('calc', 'calc_ut', 'rise_trans', 'sol_eclipse_when_glob', 'lun_eclipse_when', 'houses')
+
+_session = contextvars.ContextVar('swe_profile', default=None)
+
+
+def env_enabled() -> bool:
+    """Profile every request when SWE_PROFILE is truthy."""
+    return str(os.environ.get('SWE_PROFILE', '')).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+class Profile:
+    def __init__(self):
+        self.stats = {}   # name → [calls, seconds, jd_min, jd_max, {caller: calls}]
+
+    def record(self, name: str, jd, seconds: float, caller: str):
+        st = self.stats.get(name)
+        if st is None:
+            st = self.stats[name] = [0, 0.0, None, None, {}]
+        st[0] += 1
+        st[1] += seconds
+        if isinstance(jd, (int, float)):
+            if st[2] is None or jd < st[2]:
+                st[2] = jd
+            if st[3] is None or jd > st[3]:
+                st[3] = jd
+        st[4][caller] = st[4].get(caller, 0) + 1
+
+    def total_calls(self) -> int:
+        return sum(st[0] for st in self.stats.values())
+
+    def summary(self) -> dict:
+        out = {}
+        for name, (calls, secs, jd_min, jd_max, callers) in sorted(self.stats.items()):
+            out[name] = {
+                'calls': calls,
+                'ms': round(secs * 1000.0, 3),
+                'jd_min': jd_min,
+                'jd_max': jd_max,
+                'callers': dict(sorted(callers.items(), key=lambda kv: -kv[1])),
+            }
+        return out
+
+    def log_line(self) -> str:
+        parts = [f"{name}={st[0]}/{st[1] * 1000.0:.1f}ms" for name, st in sorted(self.stats.items())]
+        return f"[swe_profile] calls={self.total_calls()} " + ' '.join(parts)
+
+
+def current():
+    return _session.get()
+
+
+def start():
+    """Open a session for the current context; returns (profile, token)."""
+    prof = Profile()
+    return prof, _session.set(prof)
+
+
+def stop(token):
+    _session.reset(token)
+
+
+@contextmanager
+def profile():
+    prof, token = start()
+    try:
+        yield prof
+    finally:
+        _session.reset(token)
+
+
+def _wrap(fn, name: str):
+    key = 'swe.' + name
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        timing.count(key)
+        prof = _session.get()
+        if prof is None:
+            return fn(*args, **kwargs)
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            f = sys._getframe(1)
+            caller = f"{f.f_globals.get('__name__', '?')}.{f.f_code.co_name}"
+            prof.record(key, args[0] if args else None, time.perf_counter() - t0, caller)
+    wrapper._swe_original = fn
+    return wrapper
+
+
+def install():
+    """Wrap FUNCTIONS on the swisseph module (idempotent)."""
+    for name in FUNCTIONS:
+        fn = getattr(swe, name, None)
+        if fn is None or hasattr(fn, '_swe_original'):
+            continue
+        setattr(swe, name, _wrap(fn, name))
+
+
+def uninstall():
+    for name in FUNCTIONS:
+        fn = getattr(swe, name, None)
+        if fn is not None and hasattr(fn, '_swe_original'):
+            setattr(swe, name, fn._swe_original)
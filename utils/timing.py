@@ -0,0 +1,75 @@
+"""
+Per-request stage timers and counters.
+
+A request opens a Timing record with begin(); code on the hot path then wraps
+its stages with `with stage('sunsets'):` and bumps counters with count().
+Both are no-ops (one context-variable lookup) when no record is active, so the
+library functions can be called from scripts without any setup.
+
+    token = begin()
+    with stage('phase_scan'):
+        ...
+    rec = end(token)      # {'stages': {'phase_scan': 0.012}, 'counters': {...}}
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+
+_current = contextvars.ContextVar('request_timing', default=None)
+
+
+class Timing:
+    __slots__ = ('started', 'stages', 'counters')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}      # stage name → seconds (accumulated over repeated entries)
+        self.counters = {}    # counter name → int
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def as_dict(self) -> dict:
+        return {'total': self.elapsed(), 'stages': dict(self.stages), 'counters': dict(self.counters)}
+
+
+def begin() -> contextvars.Token:
+    return _current.set(Timing())
+
+
+def end(token):
+    """Close the record opened by begin() and return it."""
+    rec = _current.get()
+    _current.reset(token)
+    return rec
+
+
+def current():
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str):
+    rec = _current.get()
+    if rec is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        rec.stages[name] = rec.stages.get(name, 0.0) + (time.perf_counter() - t0)
+
+
+def count(name: str, n: int = 1):
+    rec = _current.get()
+    if rec is not None:
+        rec.counters[name] = rec.counters.get(name, 0) + n
+
+
+def server_timing_header(rec: Timing) -> str:
+    """Server-Timing header value: total first, then stages by descending duration (ms)."""
+    parts = [f"total;dur={rec.elapsed() * 1000.0:.1f}"]
+    for name, secs in sorted(rec.stages.items(), key=lambda kv: -kv[1]):
+        parts.append(f"{name};dur={secs * 1000.0:.1f}")
+    return ', '.join(parts)